@@ -0,0 +1,220 @@
+"""Local stub of every upstream API, replaying recorded fixtures.
+
+Serves the fixtures written by services.recorder (HTTP_RECORD_DIR) for all
+seven upstreams from one port. The first path segment selects the upstream
+host, so http://127.0.0.1:8765/ws.audioscrobbler.com/2.0/?method=... replays
+what https://ws.audioscrobbler.com/2.0/?method=... returned. Absolute upstream
+URLs in replayed bodies (e.g. Graph API `paging.next`) are rewritten to point
+back at the stub. `--env` prints the *_BASE_URL overrides that aim each client
+at it.
+
+Fault injection for benchmarks and failure-mode tests: `--latency`/`--jitter`
+add a per-request delay, `--error-rate` answers that fraction with 503 and
+`--throttle-rate` with 429 + Retry-After. `--seed` makes the faults
+reproducible. Requests without an exact fixture fall back to any fixture for
+the same method and path unless `--strict`. HEAD always answers 200 (circuit
+breaker probes).
+
+Record:  HTTP_RECORD_DIR=data/fixtures DATA_STORE_DIR=/tmp/empty streamlit run app.py
+Replay:  python -m benchmarks.stub_server [--fixtures data/fixtures] [--port 8765]
+         [--latency 80 --jitter 40 --error-rate 0.05 --throttle-rate 0.02] [--env]
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+from services import recorder
+
+DEFAULT_FIXTURES = Path(__file__).parent.parent / "data" / "fixtures"
+
+# Client override -> real base URL (the stub URL is http://HOST:PORT/ + the part after https://)
+UPSTREAMS = {
+    "SONGSTATS_BASE_URL": "https://songstats.p.rapidapi.com/artists",
+    "SPOTIFY_API_URL": "https://api.spotify.com/v1/",
+    "SPOTIFY_TOKEN_URL": "https://accounts.spotify.com/api/token",
+    "INSTAGRAM_GRAPH_URL": "https://graph.facebook.com/v19.0",
+    "YOUTUBE_BASE_URL": "https://www.googleapis.com/youtube/v3",
+    "LASTFM_BASE_URL": "https://ws.audioscrobbler.com/2.0/",
+    "MUSICBRAINZ_BASE_URL": "https://musicbrainz.org/ws/2",
+    "ODESLI_BASE_URL": "https://api.song.link/v1-alpha.1/links",
+}
+
+
+@dataclass
+class Faults:
+    latency: float = 0.0  # mean added delay, seconds
+    jitter: float = 0.0  # uniform +/- spread around latency, seconds
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: int = 1
+    strict: bool = False
+    seed: int | None = None
+    rng: random.Random = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.rng = random.Random(self.seed)
+
+
+class _Replay:
+    """Fixture index plus counters, shared by all handler threads."""
+
+    def __init__(self, fixtures: dict[str, dict[str, Any]], faults: Faults) -> None:
+        self.exact = fixtures
+        self.loose: dict[tuple[str, str, str], dict[str, Any]] = {}
+        for fixture in fixtures.values():
+            req = fixture["request"]
+            self.loose.setdefault((req["method"], req["host"], req["path"]), fixture)
+        self.hosts = {f["request"]["host"] for f in fixtures.values()}
+        self.faults = faults
+        self.lock = threading.Lock()
+        self.counts: Counter[str] = Counter()
+
+    def count(self, outcome: str) -> None:
+        with self.lock:
+            self.counts[outcome] += 1
+
+    def roll(self) -> tuple[float, float]:
+        """(delay, draw) for one request; the RNG isn't thread-safe, so draw under the lock."""
+        f = self.faults
+        with self.lock:
+            delay = max(0.0, f.latency + f.rng.uniform(-f.jitter, f.jitter))
+            return delay, f.rng.random()
+
+    def find(self, method: str, host: str, path: str, params: list[tuple[str, str]]) -> dict[str, Any] | None:
+        fixture = self.exact.get(recorder.request_key(method, host, path, params))
+        if fixture is None and not self.faults.strict:
+            fixture = self.loose.get((method, host, path))
+        return fixture
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    replay: _Replay
+
+    def _send(self, status: int, body: bytes = b"", headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status: int, message: str, headers: dict[str, str] | None = None) -> None:
+        body = json.dumps({"error": {"message": message, "code": status}}).encode()
+        self._send(status, body, {"Content-Type": "application/json", **(headers or {})})
+
+    def _handle(self) -> None:
+        replay = self.replay
+        parts = urlsplit(self.path)
+        host, _, rest = parts.path.lstrip("/").partition("/")
+        path = "/" + rest
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode()
+            if "x-www-form-urlencoded" in self.headers.get("Content-Type", ""):
+                params += parse_qsl(body, keep_blank_values=True)
+
+        delay, draw = replay.roll()
+        time.sleep(delay)
+        if self.command == "HEAD":
+            replay.count("head")
+            return self._send(200)
+        faults = replay.faults
+        if draw < faults.throttle_rate:
+            replay.count("429")
+            return self._error(429, "Rate limit exceeded (injected)", {"Retry-After": str(faults.retry_after)})
+        if draw < faults.throttle_rate + faults.error_rate:
+            replay.count("503")
+            return self._error(503, "Service unavailable (injected)")
+
+        fixture = replay.find(self.command, host, path, params)
+        if fixture is None:
+            replay.count("missing")
+            return self._error(404, f"No fixture for {self.command} {host}{path}")
+        replay.count("replayed")
+        resp = fixture["response"]
+        if "body_b64" in resp:
+            payload = base64.b64decode(resp["body_b64"])
+        else:
+            text = resp["body"]
+            stub = f"http://{self.headers.get('Host')}/"
+            for upstream in replay.hosts:
+                text = text.replace(f"https://{upstream}/", f"{stub}{upstream}/")
+                text = text.replace(f"https:\\/\\/{upstream}\\/", f"{stub}{upstream}/".replace("/", "\\/"))
+            payload = text.encode()
+        self._send(resp["status"], payload, resp["headers"])
+
+    do_GET = do_POST = do_HEAD = _handle
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def serve(fixtures_dir: str | Path = DEFAULT_FIXTURES, host: str = "127.0.0.1", port: int = 0,
+          faults: Faults | None = None) -> ThreadingHTTPServer:
+    """Start the stub on a daemon thread (port 0 = any free port) and return the server.
+
+    The server's `replay.counts` tallies replayed/missing/429/503/head responses.
+    """
+    replay = _Replay(recorder.load(fixtures_dir), faults or Faults())
+    handler = type("Handler", (_Handler,), {"replay": replay})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.replay = replay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def env_overrides(server: ThreadingHTTPServer) -> dict[str, str]:
+    """*_BASE_URL settings that point every client at `server`."""
+    host, port = server.server_address[:2]
+    return {name: url.replace("https://", f"http://{host}:{port}/", 1) for name, url in UPSTREAMS.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded upstream API fixtures locally.")
+    parser.add_argument("--fixtures", default=str(DEFAULT_FIXTURES), help="HTTP_RECORD_DIR used when recording")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="mean added latency, ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- latency spread, ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on injected 429s")
+    parser.add_argument("--strict", action="store_true", help="only replay exact request matches")
+    parser.add_argument("--seed", type=int, help="seed for reproducible faults and latency")
+    parser.add_argument("--env", action="store_true", help="print export lines for the client overrides")
+    args = parser.parse_args()
+
+    faults = Faults(latency=args.latency / 1000, jitter=args.jitter / 1000, error_rate=args.error_rate,
+                    throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+                    strict=args.strict, seed=args.seed)
+    server = serve(args.fixtures, args.host, args.port, faults)
+    print(f"Replaying {len(server.replay.exact)} fixtures on http://{args.host}:{args.port}/")
+    if args.env:
+        for name, url in env_overrides(server).items():
+            print(f"export {name}={url}")
+    try:
+        while True:
+            time.sleep(60)
+            print(dict(server.replay.counts))
+    except KeyboardInterrupt:
+        print(dict(server.replay.counts))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,121 +1,535 @@
 """Centralized data loaders — imported by all pages.
 
 Each loader tries the live API service first, then falls back to static CSV/JSON.
+Static CSVs are read through the columnar snapshot store (services.snapshot_store).
 """
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Callable
 
 import pandas as pd
 import streamlit as st
 
+from services.config import get_secret
+from services.rate_cards import RateCardTable
+from services.snapshot_store import SCHEMAS, load_dataset
+
+logger = logging.getLogger(__name__)
+
 DATA_DIR = Path(__file__).parent / "data"
 
 
+# ---------------------------------------------------------------------------
+# File fingerprints — static loaders are keyed on them, so replacing a CSV in
+# data/ reloads only that dataset; every other cache entry stays warm.
+# ---------------------------------------------------------------------------
+
+_content_hashes: dict[tuple[str, int, int], str] = {}
+_loader_stats: dict[str, dict] = {}
+_stats_lock = threading.Lock()
+
+
+def file_fingerprint(filename: str) -> tuple:
+    """Fingerprint of a file in data/: (mtime_ns, size).
+
+    With DATA_FINGERPRINT_HASH set, a BLAKE2 content hash is used instead (computed
+    once per mtime/size), so touching a file without changing it does not reload.
+    """
+    stat = (DATA_DIR / filename).stat()
+    if not get_secret("DATA_FINGERPRINT_HASH"):
+        return stat.st_mtime_ns, stat.st_size
+
+    key = (filename, stat.st_mtime_ns, stat.st_size)
+    digest = _content_hashes.get(key)
+    if digest is None:
+        digest = hashlib.blake2b((DATA_DIR / filename).read_bytes(), digest_size=16).hexdigest()
+        _content_hashes[key] = digest
+    return (digest,)
+
+
+def _note_reload(name: str, fingerprint: tuple, seconds: float) -> None:
+    with _stats_lock:
+        stats = _loader_stats.setdefault(name, {
+            "dataset": name, "loads": 0, "invalidations": 0,
+            "fingerprint": None, "last_load_ms": 0.0, "last_loaded_at": 0.0,
+        })
+        if stats["fingerprint"] is not None and stats["fingerprint"] != fingerprint:
+            stats["invalidations"] += 1
+            logger.info("Dataset %s changed on disk, reloaded in %.1f ms", name, seconds * 1000)
+        stats["loads"] += 1
+        stats["fingerprint"] = fingerprint
+        stats["last_load_ms"] = round(seconds * 1000, 2)
+        stats["last_loaded_at"] = time.time()
+
+
+def get_loader_stats() -> list[dict]:
+    """Per-dataset load counts, invalidations and last reload timing (for monitoring)."""
+    with _stats_lock:
+        return [dict(s) for s in _loader_stats.values()]
+
+
+@st.cache_data(max_entries=2 * len(SCHEMAS))
+def _load_snapshot(name: str, fingerprint: tuple) -> pd.DataFrame:
+    start = time.perf_counter()
+    df = load_dataset(name)
+    _note_reload(name, fingerprint, time.perf_counter() - start)
+    return df
+
+
+def _load_static(name: str) -> pd.DataFrame:
+    return _load_snapshot(name, file_fingerprint(SCHEMAS[name].source))
+
+
 # ---------------------------------------------------------------------------
 # Static file loaders (always available, used as fallback)
 # ---------------------------------------------------------------------------
 
-@st.cache_data
 def load_songs_all() -> pd.DataFrame:
-    df = pd.read_csv(DATA_DIR / "jakke_songs_all.csv")
-    df["release_date"] = pd.to_datetime(df["release_date"], format="mixed", errors="coerce")
-    return df
+    return _load_static("songs_all")
 
 
-@st.cache_data
 def load_songs_recent() -> pd.DataFrame:
-    return pd.read_csv(DATA_DIR / "jakke_top_songs_recent.csv")
+    return _load_static("songs_recent")
 
 
-@st.cache_data
 def load_catalog() -> pd.DataFrame:
-    return pd.read_csv(DATA_DIR / "musicteam_catalog.csv")
+    return _load_static("catalog")
 
 
-@st.cache_data
 def load_music_collaborators() -> pd.DataFrame:
-    return pd.read_csv(DATA_DIR / "music_collaborators.csv")
+    return _load_static("music_collaborators")
+
+
+@st.cache_resource(max_entries=2)
+def _rate_card_table(fingerprint: tuple) -> RateCardTable:
+    return RateCardTable.from_frame(_load_static("rate_cards"))
+
+
+def load_rate_cards() -> RateCardTable:
+    return _rate_card_table(file_fingerprint(SCHEMAS["rate_cards"].source))
+
+
+@st.cache_data(max_entries=2)
+def _rights_ledger(fingerprint: tuple) -> tuple[pd.DataFrame, str]:
+    from services.rights_ledger import valid_part
+
+    return valid_part(_load_static("rights_ledger"))
+
+
+def load_rights_ledger() -> pd.DataFrame:
+    """The rights ledger without any recordings that fail validation; those
+    tracks count as not covered, and load_unified_catalog reports why."""
+    return _rights_ledger(file_fingerprint(SCHEMAS["rights_ledger"].source))[0]
 
 
 # ---------------------------------------------------------------------------
-# Instagram — API or static fallback
+# API-backed datasets — served from the background refresher, never blocking a
+# rerun on upstream HTTP. Until the first live refresh lands (or when the API is
+# not configured) the static JSON is served.
 # ---------------------------------------------------------------------------
 
-@st.cache_data
-def load_ig_insights() -> dict:
-    try:
-        from services.instagram_client import is_available, get_insights_30d
-        if is_available():
-            data = get_insights_30d()
-            if data and data.get("_source") == "api":
-                return data
-    except Exception:
-        pass
-    with open(DATA_DIR / "instagram_jakke_insights_30d.json") as f:
+def _load_json(filename: str) -> dict:
+    with open(DATA_DIR / filename) as f:
         return json.load(f)
 
 
-@st.cache_data
+@st.cache_resource
+def _api_refresher():
+    from services.refresher import BackgroundRefresher
+    from services import (
+        http_cache, instagram_client, instagram_insights, instagram_sync, lastfm_bulk, songstats_client,
+        youtube_sync,
+    )
+
+    refresher = BackgroundRefresher()
+    refresher.register("songstats_jakke", songstats_client.fetch_jakke_stats,
+                       lambda: _load_json("songstats_jakke.json"), interval=3600)
+    refresher.register("songstats_enjune", songstats_client.fetch_enjune_stats,
+                       lambda: _load_json("songstats_enjune.json"), interval=3600)
+    refresher.register("ig_insights", instagram_client.fetch_insights_30d,
+                       lambda: _load_json("instagram_jakke_insights_30d.json"), interval=3600)
+    # Value is the sync summary; the posts themselves land in STORE_DIR/instagram.db
+    refresher.register("ig_media", instagram_sync.sync_media, dict, interval=3600)
+    refresher.register("ig_post_insights", instagram_insights.fetch_pending, dict, interval=3600)
+    # Per-track Last.fm stats go to the metrics store (read by load_lastfm_track_stats)
+    refresher.register("lastfm_tracks", lastfm_bulk.refresh_catalog, dict, interval=6 * 3600)
+    # Incremental uploads/stats sync into STORE_DIR/youtube.db (read by get_recent_videos)
+    refresher.register("yt_videos", youtube_sync.sync_default_channel, dict, interval=3600)
+    # Keep the shared response cache bounded: drop entries nothing has refreshed in MAX_AGE
+    refresher.register("http_cache_purge", lambda: {"removed": http_cache.purge(http_cache.MAX_AGE)}, dict,
+                       interval=24 * 3600)
+    return refresher
+
+
+def _serve(name: str) -> dict:
+    """Last good value of an API-backed dataset, tagged with `_refreshed_at`
+    (unix seconds of the live fetch, or None when serving static data)."""
+    value, refreshed_at = _api_refresher().get(name)
+    return {**value, "_refreshed_at": refreshed_at}
+
+
+# ---------------------------------------------------------------------------
+# Instagram — API or static fallback. The historical views are recomputed from
+# the synced posts (services.instagram_sync) once a sync has stored any.
+# ---------------------------------------------------------------------------
+
+def load_ig_insights() -> dict:
+    return _serve("ig_insights")
+
+
+@st.cache_data(max_entries=2)
+def _ig_aggregates(fingerprint: tuple) -> dict[str, pd.DataFrame]:
+    from services import instagram_sync
+    return instagram_sync.aggregates(instagram_sync.load_posts())
+
+
+def _load_ig(name: str) -> pd.DataFrame:
+    from services import instagram_sync
+
+    _api_refresher()  # make sure the media sync is scheduled
+    fingerprint = instagram_sync.fingerprint()
+    if fingerprint[0]:
+        return _ig_aggregates(fingerprint)[name]
+    return _load_static(name)
+
+
+@st.cache_data(max_entries=2)
+def _ig_post_insights(fingerprint: tuple) -> pd.DataFrame:
+    from services import instagram_insights
+    return instagram_insights.load_post_insights()
+
+
+def load_ig_post_insights() -> pd.DataFrame:
+    """Synced posts with per-post reach/saves/shares/plays; empty until fetched."""
+    from services import instagram_insights
+
+    _api_refresher()
+    return _ig_post_insights(instagram_insights.fingerprint())
+
+
 def load_ig_yearly() -> pd.DataFrame:
-    return pd.read_csv(DATA_DIR / "ig_yearly_stats.csv")
+    return _load_ig("ig_yearly")
 
 
-@st.cache_data
 def load_ig_monthly() -> pd.DataFrame:
-    df = pd.read_csv(DATA_DIR / "ig_monthly_stats.csv")
-    df["month"] = pd.to_datetime(df["month"])
-    return df
+    return _load_ig("ig_monthly")
 
 
-@st.cache_data
 def load_ig_top_posts() -> pd.DataFrame:
-    df = pd.read_csv(DATA_DIR / "ig_top_posts.csv")
-    df["date"] = pd.to_datetime(df["date"])
-    return df
+    return _load_ig("ig_top_posts")
 
 
-@st.cache_data
 def load_ig_collaborators() -> pd.DataFrame:
-    return pd.read_csv(DATA_DIR / "ig_collaborators.csv")
+    return _load_static("ig_collaborators")
 
 
-@st.cache_data
 def load_ig_content_type() -> pd.DataFrame:
-    return pd.read_csv(DATA_DIR / "ig_content_type_performance.csv")
+    return _load_ig("ig_content_type")
 
 
-@st.cache_data
 def load_ig_day_of_week() -> pd.DataFrame:
-    return pd.read_csv(DATA_DIR / "ig_day_of_week.csv")
+    return _load_ig("ig_day_of_week")
 
 
 # ---------------------------------------------------------------------------
 # Songstats — API or static fallback
 # ---------------------------------------------------------------------------
 
-@st.cache_data
 def load_songstats_jakke() -> dict:
-    try:
-        from services.songstats_client import get_jakke_stats
-        data = get_jakke_stats()
-        if data and data.get("_source") == "api":
-            return data
-    except Exception:
-        pass
-    with open(DATA_DIR / "songstats_jakke.json") as f:
-        return json.load(f)
+    return _serve("songstats_jakke")
 
 
-@st.cache_data
 def load_songstats_enjune() -> dict:
+    return _serve("songstats_enjune")
+
+
+# ---------------------------------------------------------------------------
+# Unified catalog — materialized view shared by Catalog, Revenue and Dashboard
+# ---------------------------------------------------------------------------
+
+# Bump when the view's columns or derivation change
+UNIFIED_CATALOG_VERSION = 4
+
+
+@st.cache_resource
+def _musicbrainz_enrichment():
+    """Start the catalog-wide MusicBrainz enrichment once per process (it resumes
+    where any earlier run stopped). Disable with MUSICBRAINZ_AUTO_ENRICH=0."""
+    from services import musicbrainz_enrich
+
+    if get_secret("MUSICBRAINZ_AUTO_ENRICH", "1") == "0":
+        return None
+    return musicbrainz_enrich.start_background()
+
+
+def load_unified_catalog() -> pd.DataFrame:
+    """Songs joined with catalog metadata, revenue estimates, splits, popularity and
+    playlist status — one row per song.
+
+    The view is rebuilt only when an input changes: the songs CSV, the MusicTeam
+    catalog, the Songstats popularity/playlist payloads, the rights ledger or the
+    MusicBrainz enrichment results (which fill missing ISRCs and release dates).
+    """
+    from services import musicbrainz_enrich
+
+    _musicbrainz_enrichment()
+
+    ss = load_songstats_jakke()
+    enjune = load_songstats_enjune()
+    track_pop = {**enjune.get("track_popularity", {}), **ss.get("track_popularity", {})}
+    unified = _build_unified_catalog(
+        UNIFIED_CATALOG_VERSION,
+        file_fingerprint("jakke_songs_all.csv"),
+        file_fingerprint("musicteam_catalog.csv"),
+        tuple(sorted(track_pop.items())),
+        tuple(sorted(ss.get("currently_playlisted", []))),
+        file_fingerprint(SCHEMAS["rights_ledger"].source),
+        musicbrainz_enrich.fingerprint(),
+    )
+    _odesli_resolver().enqueue(unified["ISRC"])
+    ledger_error = _rights_ledger(file_fingerprint(SCHEMAS["rights_ledger"].source))[1]
+    if ledger_error:
+        st.error(f"{ledger_error}. Those tracks are shown as not covered until data/rights_ledger.csv is fixed.")
+    return unified
+
+
+@st.cache_data(max_entries=4)
+def _build_unified_catalog(
+    version: int,
+    songs_fingerprint: tuple,
+    catalog_fingerprint: tuple,
+    track_popularity: tuple[tuple[str, int], ...],
+    playlisted: tuple[str, ...],
+    ledger_fingerprint: tuple,
+    enrichment_fingerprint: tuple,
+) -> pd.DataFrame:
+    from services.musicbrainz_enrich import load_results
+    from services.revenue_estimator import estimate_revenue_batch
+    from services.rights_ledger import match_recordings, party_share
+
+    songs = load_dataset("songs_all")
+    catalog_raw = load_dataset("catalog")
+
+    recordings = catalog_raw[catalog_raw["Type"] == "Recording"]
+    recordings = recordings.rename(columns={"Title": "song", "Artist/Project": "project"})
+
+    unified = songs.merge(
+        recordings[["song", "project", "Writers", "ISRC", "ISWC", "Dolby Atmos"]],
+        on="song", how="left",
+    )
+    unified["Writers"] = unified["Writers"].fillna("—")
+    unified["ISRC"] = unified["ISRC"].fillna("—")
+    unified["ISWC"] = unified["ISWC"].fillna("—")
+    unified["Dolby Atmos"] = unified["Dolby Atmos"].fillna("No")
+    unified["project"] = unified["project"].fillna(unified["artist"].astype(str))
+    unified["collaborators"] = unified["collaborators"].fillna("—")
+
+    # Fill gaps from MusicBrainz; the *_from_mb flags let the Health tab say so
+    mb = load_results()
+    mb_key = mb["title"] + "\x1f" + mb["artist"]
+    key = unified["song"] + "\x1f" + unified["artist"].astype(str)
+    mb_isrc = key.map(dict(zip(mb_key, mb["isrc"])))
+    mb_date = key.map(dict(zip(mb_key, pd.to_datetime(mb["release_date"], format="mixed", errors="coerce"))))
+    unified["isrc_from_mb"] = (unified["ISRC"] == "—") & mb_isrc.notna()
+    unified.loc[unified["isrc_from_mb"], "ISRC"] = mb_isrc
+    unified["date_from_mb"] = unified["release_date"].isna() & mb_date.notna()
+    unified.loc[unified["date_from_mb"], "release_date"] = mb_date
+
+    # Revenue per track (Spotify streams → estimated cross-platform total)
+    unified["est_total_streams"] = (unified["streams"].fillna(0) / 0.60).astype(int)
+    unified["est_revenue"] = estimate_revenue_batch(unified["est_total_streams"]).estimated_revenue
+
+    # Jake's share from the rights ledger; tracks it doesn't cover stay NaN
+    ledger = load_rights_ledger()
+    unified["rights_known"] = match_recordings(unified, ledger).notna()
+    unified["jake_split"] = party_share(unified, ledger)
+    unified["jake_revenue"] = unified["est_revenue"] * unified["jake_split"]
+
+    # Songstats popularity and playlist status
+    unified["ss_popularity"] = unified["song"].map(dict(track_popularity)).fillna(0).astype(int)
+    unified["Playlisted"] = unified["song"].isin(playlisted).map({True: "Yes", False: ""})
+    return unified
+
+
+# ---------------------------------------------------------------------------
+# "Listen on" links — resolved in bulk in the background, read locally
+# ---------------------------------------------------------------------------
+
+@st.cache_resource
+def _odesli_resolver():
+    from services.odesli_resolver import BulkResolver
+
+    resolver = BulkResolver()
+    resolver.start()
+    return resolver
+
+
+def load_track_links(isrc: str) -> dict[str, str] | None:
+    """Platform links for a track by ISRC (no network call); None until resolved."""
+    from services.odesli_resolver import get_links
+    return get_links(isrc)
+
+
+# ---------------------------------------------------------------------------
+# Spotify discography — crawled in batches offline, diffed against the catalog
+# ---------------------------------------------------------------------------
+
+@st.cache_data(ttl=300)
+def load_missing_releases() -> pd.DataFrame:
+    """Releases found by the Spotify crawler (services.spotify_crawler) that are
+    not in jakke_songs_all.csv. Empty until the crawler has run."""
+    from services import spotify_crawler
+
+    catalog = load_catalog()
+    return spotify_crawler.missing_from_catalog(
+        spotify_crawler.load_tracks(), load_songs_all(), set(catalog["ISRC"].dropna()),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Metric history — local time-series store, filled by every successful fetch
+# ---------------------------------------------------------------------------
+
+@st.cache_data(ttl=300)
+def load_metric_history(artist: str, source: str, metric: str, days: int = 365) -> pd.DataFrame:
+    """Daily history of one metric (last sample per day) over the past `days`."""
+    from datetime import datetime, timedelta, timezone
+    from services.metrics_store import history
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    return history(artist, source, metric, start=start, bucket=timedelta(days=1))
+
+
+@st.cache_data(ttl=300)
+def load_lastfm_track_stats() -> pd.DataFrame:
+    """Latest Last.fm listeners/playcount per catalog track: artist, entity (song
+    title), listeners, playcount. Empty until the background job has run."""
+    from services.metrics_store import latest_by_entity
+
+    _api_refresher()
+    stats = latest_by_entity("lastfm")
+    if stats.empty:
+        return pd.DataFrame(columns=["artist", "entity", "listeners", "playcount"])
+    return stats
+
+
+@st.cache_data(ttl=300)
+def load_royalty_actuals() -> pd.DataFrame:
+    """Imported distributor statement totals: isrc, platform, territory, month,
+    streams, revenue. Empty until a statement has been imported (services.royalty_import)."""
+    from services.royalty_import import actuals
+
+    return actuals(("isrc", "platform", "territory", "month"))
+
+
+@st.cache_data(ttl=300)
+def load_metric_delta(artist: str, source: str, metric: str, days: int = 7) -> float | None:
+    """Change in a metric over the past `days`, or None without enough history."""
+    from datetime import timedelta
+    from services.metrics_store import delta
+    return delta(artist, source, metric, timedelta(days=days))
+
+
+# ---------------------------------------------------------------------------
+# Page-level prefetch — a page declares the datasets it needs and they resolve
+# concurrently, so cold latency is the slowest source rather than the sum.
+# ---------------------------------------------------------------------------
+
+def _youtube_channel() -> dict | None:
+    from services.youtube_client import get_channel_stats, is_available
+    return get_channel_stats() if is_available() else None
+
+
+def _youtube_recent() -> list[dict]:
+    from services.youtube_client import get_recent_videos, is_available
+
+    _api_refresher()  # make sure the channel sync is scheduled
+    return get_recent_videos(limit=5) if is_available() else []
+
+
+def _lastfm_jakke() -> dict | None:
+    from services.lastfm_client import get_artist_info, is_available
+    return get_artist_info("Jakke") if is_available() else None
+
+
+def _lastfm_similar() -> list[dict]:
+    from services.lastfm_client import get_similar_artists, is_available
+    return get_similar_artists("Jakke", limit=8) if is_available() else []
+
+
+DATASETS: dict[str, Callable[[], Any]] = {
+    "songs_all": load_songs_all,
+    "songs_recent": load_songs_recent,
+    "catalog": load_catalog,
+    "music_collaborators": load_music_collaborators,
+    "unified_catalog": load_unified_catalog,
+    "ig_insights": load_ig_insights,
+    "ig_yearly": load_ig_yearly,
+    "ig_monthly": load_ig_monthly,
+    "ig_top_posts": load_ig_top_posts,
+    "ig_collaborators": load_ig_collaborators,
+    "ig_content_type": load_ig_content_type,
+    "ig_day_of_week": load_ig_day_of_week,
+    "songstats_jakke": load_songstats_jakke,
+    "songstats_enjune": load_songstats_enjune,
+    "youtube_channel": _youtube_channel,
+    "youtube_recent": _youtube_recent,
+    "lastfm_jakke": _lastfm_jakke,
+    "lastfm_similar": _lastfm_similar,
+}
+
+PREFETCH_WORKERS = 8
+_prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+_prefetch_timings: dict[str, float] = {}
+
+
+def prefetch(*names: str) -> dict[str, Any]:
+    """Resolve the named DATASETS concurrently on a bounded, shared thread pool.
+
+    Returns {name: value}. Loader exceptions propagate as if called directly.
+    Per-dataset wall times are logged and available from get_prefetch_timings().
+    """
     try:
-        from services.songstats_client import get_enjune_stats
-        data = get_enjune_stats()
-        if data and data.get("_source") == "api":
-            return data
-    except Exception:
-        pass
-    with open(DATA_DIR / "songstats_enjune.json") as f:
-        return json.load(f)
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except ImportError:
+        add_script_run_ctx, ctx = None, None
+
+    def run(name: str) -> tuple[Any, float]:
+        # Workers share the caller's script context so st.cache_* behaves as inline
+        thread = threading.current_thread()
+        if ctx is not None:
+            add_script_run_ctx(thread, ctx)
+        start = time.perf_counter()
+        try:
+            return DATASETS[name](), time.perf_counter() - start
+        finally:
+            if ctx is not None:
+                add_script_run_ctx(thread, None)
+
+    start = time.perf_counter()
+    futures = {name: _prefetch_pool.submit(run, name) for name in names}
+    results: dict[str, Any] = {}
+    timings: dict[str, float] = {}
+    for name, future in futures.items():
+        results[name], timings[name] = future.result()
+
+    with _stats_lock:
+        _prefetch_timings.update(timings)
+    logger.debug(
+        "Prefetched %d datasets in %.1f ms (%s)", len(names), (time.perf_counter() - start) * 1000,
+        ", ".join(f"{n}={t * 1000:.1f}ms" for n, t in timings.items()),
+    )
+    return results
+
+
+def get_prefetch_timings() -> dict[str, float]:
+    """Most recent prefetch wall time (seconds) of each dataset."""
+    with _stats_lock:
+        return dict(_prefetch_timings)
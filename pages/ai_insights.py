@@ -270,16 +270,14 @@ PRIORITY_COLORS = {
 # Main render
 # ---------------------------------------------------------------------------
 def render() -> None:
-    from data_loader import (
-        load_songstats_jakke, load_songstats_enjune, load_songs_all,
-        load_ig_insights, load_ig_yearly,
-    )
-
-    ss = load_songstats_jakke()
-    enjune = load_songstats_enjune()
-    songs = load_songs_all()
-    ig = load_ig_insights()
-    ig_yearly = load_ig_yearly()
+    from data_loader import prefetch
+
+    data = prefetch("songstats_jakke", "songstats_enjune", "songs_all", "ig_insights", "ig_yearly")
+    ss = data["songstats_jakke"]
+    enjune = data["songstats_enjune"]
+    songs = data["songs_all"]
+    ig = data["ig_insights"]
+    ig_yearly = data["ig_yearly"]
 
     render_page_title(
         "AI Insights",
@@ -1,6 +1,8 @@
 """Catalog — Unified song library with metadata, revenue, and health."""
 from __future__ import annotations
 
+from html import escape
+
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
@@ -14,49 +16,18 @@ from theme import (
 
 
 def render() -> None:
-    from data_loader import load_songs_all, load_catalog, load_songstats_jakke, load_songstats_enjune
-    from services.revenue_estimator import estimate_revenue, RATES, PLATFORM_SPLIT, get_jake_split
+    from data_loader import (
+        load_missing_releases, load_songs_all, load_songstats_jakke, load_track_links, load_unified_catalog,
+    )
+    from services.revenue_estimator import estimate_revenue, estimate_revenue_batch
 
     songs = load_songs_all()
-    catalog_raw = load_catalog()
     ss = load_songstats_jakke()
-    enjune = load_songstats_enjune()
 
     render_page_title("Catalog", "Complete library — metadata, revenue estimates, rights, and release history", "#58a6ff")
 
-    # --- Build unified catalog ---
-    recordings = catalog_raw[catalog_raw["Type"] == "Recording"].copy()
-    recordings = recordings.rename(columns={"Title": "song", "Artist/Project": "project"})
-
-    unified = songs.merge(
-        recordings[["song", "project", "Writers", "ISRC", "ISWC", "Dolby Atmos"]],
-        on="song", how="left",
-    )
-    unified["Writers"] = unified["Writers"].fillna("—")
-    unified["ISRC"] = unified["ISRC"].fillna("—")
-    unified["ISWC"] = unified["ISWC"].fillna("—")
-    unified["Dolby Atmos"] = unified["Dolby Atmos"].fillna("No")
-    unified["project"] = unified["project"].fillna(unified["artist"])
-    unified["collaborators"] = unified["collaborators"].fillna("—")
-
-    # Revenue per track (Spotify streams → estimated cross-platform total)
-    unified["est_revenue"] = unified["streams"].apply(
-        lambda s: estimate_revenue(int(s / 0.60)).estimated_revenue if s > 0 else 0
-    )
-
-    # Splits
-    unified["jake_split"] = unified["song"].apply(get_jake_split)
-    unified["jake_revenue"] = unified["est_revenue"] * unified["jake_split"]
-
-    # Songstats popularity
-    track_pop = ss.get("track_popularity", {})
-    enjune_pop = enjune.get("track_popularity", {})
-    all_pop = {**enjune_pop, **track_pop}
-    unified["ss_popularity"] = unified["song"].map(all_pop).fillna(0).astype(int)
-
-    # Playlisted
+    unified = load_unified_catalog()
     playlisted = set(ss.get("currently_playlisted", []))
-    unified["Playlisted"] = unified["song"].apply(lambda s: "Yes" if s in playlisted else "")
 
     # --- KPIs ---
     total_revenue = unified["est_revenue"].sum()
@@ -125,8 +96,8 @@ def render() -> None:
         display["release_date"] = display["release_date"].dt.strftime("%Y-%m-%d").fillna("—")
         display["streams"] = display["streams"].apply(lambda x: f"{x:,}")
         display["est_revenue"] = display["est_revenue"].apply(lambda x: f"${x:,.2f}")
-        display["jake_split"] = display["jake_split"].apply(lambda x: f"{x:.0%}")
-        display["jake_revenue"] = display["jake_revenue"].apply(lambda x: f"${x:,.2f}")
+        display["jake_split"] = display["jake_split"].apply(lambda x: f"{x:.0%}" if pd.notna(x) else "—")
+        display["jake_revenue"] = display["jake_revenue"].apply(lambda x: f"${x:,.2f}" if pd.notna(x) else "—")
         display["ss_popularity"] = display["ss_popularity"].apply(lambda x: str(x) if x > 0 else "—")
         display["genre"] = display["genre"].fillna("—")
         display["collaborators"] = display["collaborators"].fillna("—")
@@ -178,8 +149,12 @@ def render() -> None:
             c1.metric("Streams", f"{track['streams']:,}")
             c2.metric("Popularity", str(track["ss_popularity"]) if track["ss_popularity"] > 0 else "—")
             c3.metric("Est. Revenue", f"${track['est_revenue']:,.2f}")
-            c4.metric("Jake's Share", f"${track['jake_revenue']:,.2f}")
-            c5.metric("Split", f"{track['jake_split']:.0%}")
+            if track["rights_known"]:
+                c4.metric("Jake's Share", f"${track['jake_revenue']:,.2f}")
+                c5.metric("Split", f"{track['jake_split']:.0%}")
+            else:
+                c4.metric("Jake's Share", "—")
+                c5.metric("Split", "Unknown", help="Not in data/rights_ledger.csv")
             c6.metric("Atmos", track["Dolby Atmos"])
 
             spacer(12)
@@ -200,12 +175,20 @@ def render() -> None:
                 st.markdown(f"**Playlist Status:** <span style='color:{status_color}'>{status_text}</span>", unsafe_allow_html=True)
 
                 if track["streams"] > 0:
-                    rev = estimate_revenue(int(track["streams"] / 0.60))
+                    rev = estimate_revenue(int(track["est_total_streams"]))
                     st.markdown("**Revenue by Platform (Est.):**")
                     for plat, data in sorted(rev.platform_breakdown.items(), key=lambda x: x[1]["revenue"], reverse=True):
                         if data["revenue"] > 0.50:
                             st.markdown(f"- {plat}: ${data['revenue']:,.2f} ({data['streams']:,} streams)")
 
+                links = load_track_links(track["ISRC"])
+                if links:
+                    st.markdown("**Listen on:** " + " · ".join(
+                        f"[{label}]({url})" for label, url in links.items() if url
+                    ))
+                elif track["ISRC"] != "—":
+                    st.caption("Streaming links are being resolved in the background.")
+
     # ══════════════════════════════════════════════════════════════════════════
     # TAB 2: Revenue — Charts and breakdowns
     # ══════════════════════════════════════════════════════════════════════════
@@ -226,15 +209,9 @@ def render() -> None:
 
         with right:
             section("Revenue by Platform (Estimated Split)")
-            total_streams = unified["streams"].sum()
-            platform_data = []
-            for platform, share in PLATFORM_SPLIT.items():
-                streams = int(total_streams * share)
-                rate = RATES.get(platform, RATES["Other"])
-                revenue = streams * rate
-                platform_data.append({"Platform": platform, "Revenue": revenue, "Streams": streams})
-
-            platform_df = pd.DataFrame(platform_data).sort_values("Revenue", ascending=False)
+            # Reported catalog streams split across platforms
+            platform_df = (estimate_revenue_batch([unified["streams"].sum()]).platform_totals()
+                           .sort_values("Revenue", ascending=False))
             colors = {
                 "Spotify": SPOTIFY_GREEN, "Apple Music": "#fc3c44", "YouTube Music": "#ff0000",
                 "Amazon Music": "#00a8e1", "Deezer": "#a238ff", "Tidal": "#000000", "Other": MUTED,
@@ -258,6 +235,11 @@ def render() -> None:
     # TAB 3: Health — Missing metadata
     # ══════════════════════════════════════════════════════════════════════════
     with tab_health:
+        filled_isrc = int(unified["isrc_from_mb"].sum())
+        filled_date = int(unified["date_from_mb"].sum())
+        if filled_isrc or filled_date:
+            st.caption(f"Filled from MusicBrainz: {filled_isrc} ISRC{'s' if filled_isrc != 1 else ''}, "
+                       f"{filled_date} release date{'s' if filled_date != 1 else ''}")
         col1, col2, col3 = st.columns(3, gap="large")
 
         with col1:
@@ -287,6 +269,22 @@ def render() -> None:
 <div style="background:#161b22;border:1px solid #21262d;border-radius:10px;padding:18px 20px">
 <div style="font-size:0.78rem;color:#8b949e;font-weight:600;text-transform:uppercase;letter-spacing:0.05em;margin-bottom:8px">No Dolby Atmos</div>
 {items}{extra}
+</div>""", unsafe_allow_html=True)
+
+        missing_releases = load_missing_releases()
+        if not missing_releases.empty:
+            spacer(12)
+            section("On Spotify, Not in Catalog")
+            # Names come from the Spotify API, so escape them before building markup
+            items = "".join(
+                f"<div style='color:#c9d1d9;font-size:0.85rem;padding:2px 0'>• <b>{escape(str(r['name']))}</b> "
+                f"({escape(str(r['artists']))}) <span style='color:#484f58'>{escape(str(r['release_date']))} · "
+                f"{escape(str(r['album_type']))}</span></div>"
+                for _, r in missing_releases.iterrows()
+            )
+            st.markdown(f"""
+<div style="background:#161b22;border:1px solid #21262d;border-radius:10px;padding:18px 20px">
+{items}
 </div>""", unsafe_allow_html=True)
 
         spacer(12)
@@ -17,7 +17,8 @@ TIER_LABELS = {1: "High Impact", 2: "Regular", 3: "One-off"}
 
 
 def render() -> None:
-    from data_loader import load_ig_collaborators, load_music_collaborators
+    from data_loader import load_ig_collaborators, load_music_collaborators, load_rights_ledger, load_unified_catalog
+    from services.rights_ledger import MASTER_WEIGHT, payouts, statements
 
     collabs = load_ig_collaborators()
     music_collabs = load_music_collaborators()
@@ -93,6 +94,42 @@ def render() -> None:
     mc_display.columns = ["Collaborator", "Tracks", "Role", "Total Streams", "Avg Streams/Track"]
     st.dataframe(mc_display, use_container_width=True, hide_index=True)
 
+    spacer(16)
+
+    # Royalty statements — every party on every track, from the rights ledger
+    section("Royalty Statements")
+    unified = load_unified_catalog()
+    rows = payouts(unified, load_rights_ledger())
+    summary = statements(rows)
+
+    left, right = st.columns([2, 3], gap="large")
+    with left:
+        summary_display = summary.copy()
+        for col in ("master_revenue", "publishing_revenue", "revenue"):
+            summary_display[col] = summary_display[col].apply(lambda x: f"${x:,.2f}")
+        summary_display.columns = ["Party", "Tracks", "Master", "Publishing", "Total"]
+        st.dataframe(summary_display, use_container_width=True, hide_index=True)
+        st.caption(f"Estimated streaming revenue split {MASTER_WEIGHT:.0%} master / {1 - MASTER_WEIGHT:.0%} publishing, "
+                   "then by each party's share in data/rights_ledger.csv.")
+
+    with right:
+        party = st.selectbox("Statement for", summary["party"].tolist(), key="collab_statement_party")
+        statement = rows[rows["party"] == party].sort_values("revenue", ascending=False)
+        statement_display = statement[[
+            "song", "role", "master_share", "publishing_share", "master_revenue", "publishing_revenue", "revenue",
+        ]].copy()
+        for col in ("master_share", "publishing_share"):
+            statement_display[col] = statement_display[col].apply(lambda x: f"{x:.0%}")
+        for col in ("master_revenue", "publishing_revenue", "revenue"):
+            statement_display[col] = statement_display[col].apply(lambda x: f"${x:,.2f}")
+        statement_display.columns = ["Song", "Role", "Master %", "Publishing %", "Master", "Publishing", "Total"]
+        st.dataframe(statement_display, use_container_width=True, hide_index=True, height=320)
+
+    unknown = unified.loc[~unified["rights_known"], "song"]
+    if len(unknown):
+        st.warning(f"{len(unknown)} track(s) missing from the rights ledger and left out of every statement: "
+                   f"{', '.join(unknown)}")
+
     spacer(12)
 
     # ─── INSTAGRAM COLLABORATORS ───
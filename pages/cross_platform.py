@@ -14,15 +14,22 @@ from theme import (
 
 
 def render() -> None:
-    from data_loader import load_songstats_jakke, load_songstats_enjune, load_ig_insights, load_songs_all
+    from data_loader import prefetch
     from services.config import get_all_api_status
-    from services.youtube_client import get_channel_stats, get_recent_videos, is_available as yt_available
-    from services.lastfm_client import get_artist_info, get_similar_artists, is_available as lastfm_available
-
-    ss = load_songstats_jakke()
-    enjune = load_songstats_enjune()
-    ig = load_ig_insights()
-    songs = load_songs_all()
+    from services.songstats_client import quota_status
+    from services.youtube_client import quota_status as yt_quota_status
+    from services.youtube_client import is_available as yt_available
+    from services.lastfm_client import is_available as lastfm_available
+    from services.singleflight import stats as coalescing_stats
+
+    data = prefetch(
+        "songstats_jakke", "songstats_enjune", "ig_insights", "songs_all",
+        "youtube_channel", "youtube_recent", "lastfm_jakke", "lastfm_similar",
+    )
+    ss = data["songstats_jakke"]
+    enjune = data["songstats_enjune"]
+    ig = data["ig_insights"]
+    songs = data["songs_all"]
 
     render_page_title("Cross-Platform", "Unified view across streaming, social, and video platforms", "#58a6ff")
 
@@ -101,7 +108,7 @@ def render() -> None:
     # --- YouTube (live data if configured) ---
     section("YouTube")
     if yt_available():
-        yt_stats = get_channel_stats()
+        yt_stats = data["youtube_channel"]
         if yt_stats:
             kpi_row([
                 {"label": "Subscribers", "value": f"{yt_stats['subscribers']:,}", "accent": "#ff0000"},
@@ -109,7 +116,7 @@ def render() -> None:
                 {"label": "Videos", "value": str(yt_stats["video_count"])},
             ])
             spacer(16)
-            videos = get_recent_videos(limit=5)
+            videos = data["youtube_recent"]
             if videos:
                 section("Recent Videos")
                 for v in videos:
@@ -134,7 +141,7 @@ YouTube data requires a free API key. Set <code>YOUTUBE_API_KEY</code> and <code
     # --- Last.fm (live data if configured) ---
     section("Last.fm")
     if lastfm_available():
-        jakke_lastfm = get_artist_info("Jakke")
+        jakke_lastfm = data["lastfm_jakke"]
         if jakke_lastfm:
             kpi_row([
                 {"label": "Last.fm Listeners", "value": f"{jakke_lastfm['listeners']:,}", "accent": "#d51007"},
@@ -143,7 +150,7 @@ YouTube data requires a free API key. Set <code>YOUTUBE_API_KEY</code> and <code
             ])
 
             spacer(16)
-            similar = get_similar_artists("Jakke", limit=8)
+            similar = data["lastfm_similar"]
             if similar:
                 section("Similar Artists (Last.fm)")
                 sim_df = pd.DataFrame(similar)
@@ -172,3 +179,27 @@ Last.fm data requires a free API key. Set <code>LASTFM_API_KEY</code> in secrets
     if pending:
         names = ", ".join(s.name for s in pending)
         st.caption(f"⚠️ {len(pending)} API connection{'s' if len(pending) != 1 else ''} pending ({names}) — Configure in Settings")
+    tripped = [s for s in connected if s.breaker in ("open", "half-open")]
+    if tripped:
+        names = ", ".join(f"{s.name} ({s.breaker})" for s in tripped)
+        st.caption(f"⛔ Upstream unavailable, serving cached/static data: {names}")
+    try:
+        quota = quota_status()
+    except Exception:
+        quota = None
+    if quota:
+        st.caption(
+            f"Songstats quota: {quota['remaining']:,} of {quota['limit']:,} hits left this month "
+            f"({quota['available_now']:,} available now) · resets {quota['resets_at']:%b %d}"
+        )
+    if yt_available():
+        try:
+            yt_quota = yt_quota_status()
+        except Exception:
+            yt_quota = None
+        if yt_quota:
+            st.caption(f"YouTube quota: {yt_quota['remaining']:,} of {yt_quota['limit']:,} units left today")
+    shared = {name: c["shared"] for name, c in coalescing_stats().items() if c["shared"]}
+    if shared:
+        detail = ", ".join(f"{name} {n:,}" for name, n in sorted(shared.items()))
+        st.caption(f"Duplicate API calls coalesced since start: {sum(shared.values()):,} ({detail})")
@@ -15,19 +15,19 @@ from theme import (
 
 
 def render() -> None:
-    from data_loader import (
-        load_songs_all, load_songs_recent, load_ig_insights,
-        load_ig_yearly, load_ig_content_type,
-        load_songstats_jakke, load_songstats_enjune,
-    )
+    from data_loader import prefetch, load_metric_delta
 
-    songs = load_songs_all()
-    recent = load_songs_recent()
-    ig = load_ig_insights()
-    yearly = load_ig_yearly()
-    content_type = load_ig_content_type()
-    ss = load_songstats_jakke()
-    enjune = load_songstats_enjune()
+    data = prefetch(
+        "unified_catalog", "songs_recent", "ig_insights", "ig_yearly",
+        "ig_content_type", "songstats_jakke", "songstats_enjune",
+    )
+    songs = data["unified_catalog"]
+    recent = data["songs_recent"]
+    ig = data["ig_insights"]
+    yearly = data["ig_yearly"]
+    content_type = data["ig_content_type"]
+    ss = data["songstats_jakke"]
+    enjune = data["songstats_enjune"]
     profile = load_artist_profile(st.session_state.get("active_artist", "jakke"))
 
     render_page_title("Dashboard", "At-a-glance health check across streaming, social, and catalog", "#f0c040")
@@ -68,9 +68,10 @@ def render() -> None:
         # --- KPI Row 1: Streaming ---
         top_song = songs.loc[songs["streams"].idxmax()]
         spotify_icon = get_platform_icon_html("spotify", 14)
+        listeners_7d = load_metric_delta(ss.get("artist", ""), "songstats", "spotify.monthly_listeners")
         kpi_row([
             {"label": "Cross-Platform Streams", "value": f"{ss['cross_platform']['total_streams']:,.0f}", "sub": f"Spotify: {ss['spotify']['total_streams']:,.0f}", "accent": SPOTIFY_GREEN, "icon_html": spotify_icon},
-            {"label": "Monthly Listeners", "value": f"{ss['spotify']['monthly_listeners']:,}", "accent": SPOTIFY_GREEN},
+            {"label": "Monthly Listeners", "value": f"{ss['spotify']['monthly_listeners']:,}", "delta": f"{listeners_7d:+,.0f} (7d)" if listeners_7d is not None else "", "accent": SPOTIFY_GREEN},
             {"label": "Playlists", "value": f"{ss['spotify']['current_playlists']}", "sub": f"Reach: {ss['spotify']['playlist_reach']:,.0f}", "accent": SPOTIFY_GREEN},
             {"label": "Top Song", "value": top_song["song"], "sub": f"{top_song['streams']:,.0f} streams", "accent": GOLD},
         ])
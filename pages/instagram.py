@@ -24,7 +24,7 @@ def _utc_to_et(hour_utc: int) -> int:
 def render() -> None:
     from data_loader import (
         load_ig_insights, load_ig_yearly, load_ig_monthly,
-        load_ig_top_posts, load_ig_content_type, load_ig_day_of_week,
+        load_ig_top_posts, load_ig_content_type, load_ig_day_of_week, load_ig_post_insights,
     )
 
     ig = load_ig_insights()
@@ -33,6 +33,7 @@ def render() -> None:
     top_posts = load_ig_top_posts()
     content_type = load_ig_content_type()
     dow = load_ig_day_of_week()
+    post_insights = load_ig_post_insights()
 
     # Calculate engagement rate
     followers = ig["account"]["followers"]
@@ -189,6 +190,33 @@ def render() -> None:
             apply_theme(fig_sc, height=300, yaxis_title="Avg Likes/Post")
             st.plotly_chart(fig_sc, use_container_width=True, key="ig_solo_collab", config=PLOTLY_CONFIG)
 
+        year_insights = post_insights[post_insights["timestamp"].dt.year == selected_year]
+        if not year_insights.empty:
+            spacer(12)
+            section("Per-Post Insights")
+            kpi_row([
+                {"label": "Avg Reach", "value": f"{year_insights['reach'].mean():,.0f}", "accent": IG_PINK},
+                {"label": "Saves", "value": f"{int(year_insights['saved'].sum()):,}"},
+                {"label": "Shares", "value": f"{int(year_insights['shares'].sum()):,}"},
+                {"label": "Reel Plays", "value": f"{int(year_insights['plays'].sum()):,}"},
+            ])
+            spacer(8)
+            per_post = year_insights.sort_values("reach", ascending=False).head(25)
+            per_post_display = pd.DataFrame({
+                "Date": per_post["timestamp"].dt.strftime("%Y-%m-%d"),
+                "Caption": per_post["caption"].str.split("\n").str[0].str.slice(0, 60),
+                "Reach": per_post["reach"],
+                "Likes": per_post["like_count"],
+                "Saves": per_post["saved"],
+                "Shares": per_post["shares"],
+                "Plays": per_post["plays"],
+                "Link": per_post["permalink"],
+            })
+            st.dataframe(
+                per_post_display, use_container_width=True, hide_index=True,
+                column_config={"Link": st.column_config.LinkColumn("Post", display_text="Open")},
+            )
+
     # ── TAB C: Top Posts ──
     with tab_top:
         section("Top 20 Posts — All Time")
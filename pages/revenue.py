@@ -1,6 +1,7 @@
 """Revenue — Streaming revenue estimates, splits, and projections."""
 from __future__ import annotations
 
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
@@ -14,12 +15,13 @@ from theme import (
 
 
 def render() -> None:
-    from data_loader import load_songs_all, load_songstats_jakke, load_songstats_enjune
-    from services.revenue_estimator import (
-        estimate_revenue, RATES, PLATFORM_SPLIT, get_jake_split,
+    from data_loader import (
+        load_rate_cards, load_royalty_actuals, load_songstats_jakke, load_songstats_enjune, load_unified_catalog,
     )
+    from services.revenue_estimator import estimate_revenue_batch, RATES
+    from services.rate_cards import price_streams
+    from services.revenue_projection import simulate_projection
 
-    songs = load_songs_all()
     ss = load_songstats_jakke()
     enjune = load_songstats_enjune()
 
@@ -30,21 +32,14 @@ def render() -> None:
     enjune_total = enjune["spotify"]["total_streams"]
     combined = jakke_cross + enjune_total
 
-    jakke_rev = estimate_revenue(jakke_cross)
-    enjune_rev = estimate_revenue(enjune_total)
-    combined_rev = estimate_revenue(combined)
+    estimates = estimate_revenue_batch([jakke_cross, enjune_total, combined])
+    jakke_rev, enjune_rev, combined_rev = (estimates.estimate(i) for i in range(3))
 
-    # Per-track revenue with splits
-    songs_rev = songs.copy()
-    songs_rev["est_total_streams"] = (songs_rev["streams"] / 0.60).astype(int)
-    songs_rev["est_revenue"] = songs_rev["est_total_streams"].apply(
-        lambda s: estimate_revenue(s).estimated_revenue
-    )
-    songs_rev["jake_split"] = songs_rev["song"].apply(get_jake_split)
-    songs_rev["jake_revenue"] = songs_rev["est_revenue"] * songs_rev["jake_split"]
+    # Per-track revenue with splits (shared unified catalog view)
+    songs_rev = load_unified_catalog()
 
     total_jake_revenue = songs_rev["jake_revenue"].sum()
-    total_est_revenue = songs_rev["est_revenue"].sum()
+    total_est_revenue = songs_rev.loc[songs_rev["rights_known"], "est_revenue"].sum()
     avg_split = total_jake_revenue / total_est_revenue if total_est_revenue > 0 else 1.0
 
     # --- KPIs ---
@@ -126,10 +121,70 @@ def render() -> None:
     rev_display["streams"] = rev_display["streams"].apply(lambda x: f"{x:,}")
     rev_display["est_total_streams"] = rev_display["est_total_streams"].apply(lambda x: f"{x:,}")
     rev_display["est_revenue"] = rev_display["est_revenue"].apply(lambda x: f"${x:,.2f}")
-    rev_display["jake_split"] = rev_display["jake_split"].apply(lambda x: f"{x:.0%}")
-    rev_display["jake_revenue"] = rev_display["jake_revenue"].apply(lambda x: f"${x:,.2f}")
+    rev_display["jake_split"] = rev_display["jake_split"].apply(lambda x: f"{x:.0%}" if pd.notna(x) else "—")
+    rev_display["jake_revenue"] = rev_display["jake_revenue"].apply(lambda x: f"${x:,.2f}" if pd.notna(x) else "—")
     rev_display.columns = ["Song", "Artist", "Spotify Streams", "Est. Total", "Total Rev", "Jake's %", "Jake's Share"]
     st.dataframe(rev_display, use_container_width=True, hide_index=True, height=400)
+    unknown = songs_rev.loc[~songs_rev["rights_known"], "song"]
+    if len(unknown):
+        st.warning(f"Not in the rights ledger (excluded from Jake's share): {', '.join(unknown)}")
+
+    spacer(12)
+
+    # --- Actuals from imported distributor statements ---
+    section("Actuals vs Estimates")
+    actuals = load_royalty_actuals()
+    if actuals.empty:
+        st.info("No distributor statements imported yet. Import statement CSVs with "
+                "`python -m services.royalty_import STATEMENT.csv` to compare actual payouts with estimates.")
+    else:
+        # Estimate for the same reported streams, at the rate card for each platform and
+        # territory in force that month
+        priced = price_streams(actuals[["platform", "territory", "streams"]].assign(date=actuals["month"]),
+                               load_rate_cards())
+        actuals = actuals.assign(estimated=priced["revenue"].to_numpy())
+        actual_total = actuals["revenue"].sum()
+        estimated_total = actuals["estimated"].sum()
+        diff = actual_total / estimated_total - 1 if estimated_total > 0 else 0.0
+        months_covered = actuals["month"].nunique()
+
+        kpi_row([
+            {"label": "Actual Revenue", "value": f"${actual_total:,.2f}",
+             "sub": f"{months_covered} month{'s' if months_covered != 1 else ''} of statements", "accent": SPOTIFY_GREEN},
+            {"label": "Estimated (same streams)", "value": f"${estimated_total:,.2f}", "accent": GOLD},
+            {"label": "Actual vs Estimate", "value": f"{diff:+.1%}", "accent": SPOTIFY_GREEN if diff >= 0 else AMBER},
+            {"label": "Actual Rate", "value": f"${actual_total / max(actuals['streams'].sum(), 1):.4f}",
+             "sub": "Per reported stream"},
+        ])
+        spacer(12)
+
+        left3, right3 = st.columns(2, gap="large")
+        with left3:
+            section("Monthly Actual vs Estimated")
+            monthly = actuals.groupby("month")[["revenue", "estimated"]].sum().reset_index()
+            fig_act = go.Figure()
+            fig_act.add_trace(go.Bar(x=monthly["month"], y=monthly["revenue"], name="Actual", marker_color=SPOTIFY_GREEN,
+                                     hovertemplate="%{x}<br>Actual <b>$%{y:,.2f}</b><extra></extra>"))
+            fig_act.add_trace(go.Bar(x=monthly["month"], y=monthly["estimated"], name="Estimated", marker_color=GOLD,
+                                     hovertemplate="%{x}<br>Estimated <b>$%{y:,.2f}</b><extra></extra>"))
+            apply_theme(fig_act, height=340, xaxis_title="", yaxis_title="Revenue ($)", barmode="group")
+            fig_act.update_yaxes(tickprefix="$", tickformat=",")
+            st.plotly_chart(fig_act, use_container_width=True, key="rev_actuals_monthly", config=PLOTLY_CONFIG)
+
+        with right3:
+            section("Actuals by Track")
+            by_track = actuals.groupby("isrc")[["streams", "revenue", "estimated"]].sum().reset_index()
+            titles = songs_rev.loc[songs_rev["ISRC"] != "—"].drop_duplicates("ISRC").set_index("ISRC")["song"]
+            by_track["song"] = by_track["isrc"].map(titles).fillna(by_track["isrc"])
+            by_track = by_track.sort_values("revenue", ascending=False)
+            by_track["diff"] = by_track["revenue"] / by_track["estimated"].where(by_track["estimated"] > 0) - 1
+            track_display = by_track[["song", "streams", "revenue", "estimated", "diff"]].copy()
+            track_display["streams"] = track_display["streams"].apply(lambda x: f"{x:,}")
+            track_display["revenue"] = track_display["revenue"].apply(lambda x: f"${x:,.2f}")
+            track_display["estimated"] = track_display["estimated"].apply(lambda x: f"${x:,.2f}")
+            track_display["diff"] = track_display["diff"].apply(lambda x: f"{x:+.1%}" if pd.notna(x) else "—")
+            track_display.columns = ["Track", "Reported Streams", "Actual", "Estimated", "Diff"]
+            st.dataframe(track_display, use_container_width=True, hide_index=True, height=340)
 
     spacer(12)
 
@@ -137,50 +192,58 @@ def render() -> None:
     section("Revenue Projection Tool")
     st.markdown("""
 <div style="background:#161b22;border:1px solid #21262d;border-radius:10px;padding:14px 18px;margin-bottom:16px">
-    <span style="color:#8b949e;font-size:0.82rem">Adjust sliders to model future revenue. Projections apply Jake's average split ({avg_split:.0%}) to new streams.</span>
+    <span style="color:#8b949e;font-size:0.82rem">Adjust sliders to model future revenue. Projections apply Jake's average split ({avg_split:.0%}) to new streams. The shaded band is the P10–P90 range over 20,000 simulated scenarios with uncertain per-stream rates, platform mix and growth.</span>
 </div>
     """.format(avg_split=avg_split), unsafe_allow_html=True)
 
-    col_s1, col_s2 = st.columns(2)
+    col_s1, col_s2, col_s3 = st.columns(3)
     with col_s1:
         monthly_streams = st.slider("Monthly Spotify Streams", min_value=10000, max_value=500000, value=50000, step=5000, key="rev_monthly")
     with col_s2:
         months = st.slider("Projection Months", min_value=3, max_value=36, value=12, step=3, key="rev_months")
+    with col_s3:
+        growth_pct = st.slider("Monthly Growth (%)", min_value=-10.0, max_value=10.0, value=0.0, step=0.5, key="rev_growth")
 
-    # Build projection
-    projection_data = []
-    cumulative_streams = combined
-    cumulative_revenue = combined_rev.estimated_revenue
-
-    for m in range(1, months + 1):
-        monthly_cross = int(monthly_streams / 0.60)
-        monthly_rev = estimate_revenue(monthly_cross).estimated_revenue
-        monthly_jake = monthly_rev * avg_split
-        cumulative_streams += monthly_cross
-        cumulative_revenue += monthly_rev
-        projection_data.append({
-            "Month": m,
-            "Monthly Streams": monthly_cross,
-            "Monthly Revenue": monthly_rev,
-            "Jake's Monthly": monthly_jake,
-            "Cumulative Streams": cumulative_streams,
-            "Cumulative Revenue": cumulative_revenue,
-        })
-
-    proj_df = pd.DataFrame(projection_data)
+    # Build projection — one batch estimate over all months, compounding the expected growth
+    month_idx = np.arange(1, months + 1)
+    monthly_cross = (int(monthly_streams / 0.60) * (1 + growth_pct / 100) ** month_idx).astype(np.int64)
+    monthly_rev = estimate_revenue_batch(monthly_cross).estimated_revenue
+    proj_df = pd.DataFrame({
+        "Month": month_idx,
+        "Monthly Streams": monthly_cross,
+        "Monthly Revenue": monthly_rev,
+        "Jake's Monthly": monthly_rev * avg_split,
+        "Cumulative Streams": combined + np.cumsum(monthly_cross),
+        "Cumulative Revenue": combined_rev.estimated_revenue + np.cumsum(monthly_rev),
+    })
+    bands = simulate_projection(monthly_streams, months, growth=growth_pct / 100,
+                                start_revenue=combined_rev.estimated_revenue, seed=0).cumulative
 
     left2, right2 = st.columns(2, gap="large")
 
     with left2:
         section("Cumulative Revenue Projection")
         fig_proj = go.Figure()
+        fig_proj.add_trace(go.Scatter(
+            x=bands["Month"], y=bands["P90"], mode="lines", line=dict(width=0),
+            name="P90", hovertemplate="P90 $%{y:,.0f}<extra></extra>",
+        ))
+        fig_proj.add_trace(go.Scatter(
+            x=bands["Month"], y=bands["P10"], mode="lines", line=dict(width=0),
+            fill="tonexty", fillcolor="rgba(240,192,64,0.15)",
+            name="P10", hovertemplate="P10 $%{y:,.0f}<extra></extra>",
+        ))
+        fig_proj.add_trace(go.Scatter(
+            x=bands["Month"], y=bands["P50"], mode="lines", line=dict(color=GOLD, width=1, dash="dot"),
+            name="P50", hovertemplate="P50 $%{y:,.0f}<extra></extra>",
+        ))
         fig_proj.add_trace(go.Scatter(
             x=proj_df["Month"], y=proj_df["Cumulative Revenue"],
-            mode="lines+markers", line=dict(color=GOLD, width=3),
-            marker=dict(size=6), fill="tozeroy", fillcolor="rgba(240,192,64,0.08)",
-            hovertemplate="Month %{x}<br><b>$%{y:,.0f}</b><extra></extra>",
+            mode="lines+markers", line=dict(color=GOLD, width=3), marker=dict(size=6),
+            name="Estimate", hovertemplate="Month %{x}<br><b>$%{y:,.0f}</b><extra></extra>",
         ))
-        apply_theme(fig_proj, height=340, xaxis_title="Month", yaxis_title="Cumulative Revenue ($)")
+        apply_theme(fig_proj, height=340, xaxis_title="Month", yaxis_title="Cumulative Revenue ($)",
+                    showlegend=False, hovermode="x unified")
         fig_proj.update_yaxes(tickprefix="$", tickformat=",")
         st.plotly_chart(fig_proj, use_container_width=True, key="rev_projection", config=PLOTLY_CONFIG)
 
@@ -197,8 +260,20 @@ def render() -> None:
         spacer(12)
         kpi_row([
             {"label": "Final Total Streams", "value": f"{final['Cumulative Streams']:,.0f}", "accent": SPOTIFY_GREEN},
-            {"label": "Final Total Revenue", "value": f"${final['Cumulative Revenue']:,.0f}", "accent": GOLD},
+            {"label": "Final Total Revenue", "value": f"${final['Cumulative Revenue']:,.0f}", "accent": GOLD,
+             "sub": f"P10–P90 ${bands['P10'].iloc[-1]:,.0f}–${bands['P90'].iloc[-1]:,.0f}"},
         ])
 
     spacer(12)
-    st.caption("Revenue estimates use industry-average per-stream rates. Splits are default assumptions (50/50 for co-writes) — adjust in revenue_estimator.py. Actual payouts vary by territory, subscription type, and distributor terms.")
+
+    # --- Rate cards ---
+    section("Per-Stream Rates by Territory")
+    tier = st.selectbox("Tier", ["premium", "free"], format_func=str.title, key="rev_rate_tier")
+    rate_matrix = load_rate_cards().matrix(tier)[[p for p in RATES if p != "Other"]]
+    st.dataframe(
+        rate_matrix.rename_axis("Territory").style.format("${:.4f}", na_rep="—"),
+        use_container_width=True, height=420,
+    )
+
+    spacer(12)
+    st.caption("Revenue estimates use industry-average per-stream rates. Splits come from the rights ledger — edit data/rights_ledger.csv. Actual payouts vary by territory, subscription type, and distributor terms.")
@@ -1,7 +1,7 @@
 """Streaming — Deep dive into streaming performance."""
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import plotly.express as px
 import plotly.graph_objects as go
@@ -16,11 +16,12 @@ from theme import (
 
 
 def render() -> None:
-    from data_loader import load_songs_all, load_songs_recent, load_songstats_jakke
+    from data_loader import load_lastfm_track_stats, load_songs_all, load_songs_recent, load_songstats_jakke
 
     songs = load_songs_all()
     recent = load_songs_recent()
     ss = load_songstats_jakke()
+    lastfm = load_lastfm_track_stats()
 
     render_page_title("Streaming", "Deep dive into streaming performance across all songs", "#1DB954")
 
@@ -50,8 +51,6 @@ def render() -> None:
 
     # Apply time range filter
     if time_range != "All" and "release_date" in filtered.columns:
-        import pandas as pd
-        from datetime import datetime, timedelta
         now = pd.Timestamp(datetime.now())
         range_map = {"1m": 30, "3m": 90, "6m": 180, "YTD": (now - pd.Timestamp(f"{now.year}-01-01")).days, "1y": 365}
         days = range_map.get(time_range, 99999)
@@ -163,6 +162,28 @@ def render() -> None:
 
     spacer(16)
 
+    # --- Last.fm vs Spotify per track (filled by the background Last.fm job) ---
+    if not lastfm.empty:
+        section("Last.fm vs Spotify")
+        lf = filtered.assign(artist=filtered["artist"].astype(str)).merge(
+            lastfm.rename(columns={"entity": "song", "listeners": "lastfm_listeners", "playcount": "scrobbles"}),
+            on=["artist", "song"], how="inner",
+        )
+        lf = lf[lf["scrobbles"] > 0]
+        if not lf.empty:
+            fig_lf = px.scatter(
+                lf, x="streams", y="scrobbles", size="lastfm_listeners", hover_name="song",
+                log_x=True, log_y=True, color_discrete_sequence=[ACCENT_BLUE],
+            )
+            apply_theme(fig_lf, height=380, xaxis_title="Spotify Streams", yaxis_title="Last.fm Scrobbles")
+            fig_lf.update_traces(hovertemplate="%{hovertext}<br>Spotify <b>%{x:,.0f}</b><br>Last.fm <b>%{y:,.0f}</b> scrobbles<extra></extra>")
+            st.plotly_chart(fig_lf, use_container_width=True, key="stream_lastfm", config=PLOTLY_CONFIG)
+            ratio = (lf["scrobbles"].sum() / lf["streams"].sum()) if lf["streams"].sum() else 0
+            st.caption(f"{len(lf)} tracks matched on Last.fm · {ratio:.2%} of Spotify streams are scrobbled")
+        else:
+            st.caption("No Last.fm scrobbles for songs in current filter.")
+        spacer(16)
+
     # --- Song detail expanders ---
     section("Song Details — Top 10")
     recent_lookup = dict(zip(recent["Song Name"], recent["Streams"]))
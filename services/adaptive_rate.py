@@ -0,0 +1,130 @@
+"""Adaptive per-host request rate (AIMD) with Retry-After support.
+
+Every request the shared transport sends goes through the controller for its
+host. The controller spaces requests at its current rate and adapts it from
+the responses: each success raises the rate additively (about ADDITIVE_STEP
+req/s per second of traffic), each 429/503 halves it. A Retry-After header, or
+a rate-limit header reporting zero remaining requests, blocks the host until
+the given time for every thread in the process. Fixed limits an upstream
+publishes (services.rate_limit) still apply on top; this finds the rate the
+upstream actually sustains for everyone else.
+
+The transport retries 429/503 with Retry-After or jittered exponential backoff
+while the call's deadline allows. A request whose slot would come after the
+deadline is not sent and raises RateLimited, which clients treat like any
+other upstream error.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+INITIAL_RATE = 10.0  # req/s for a host we haven't heard back from yet
+MIN_RATE = 0.2
+MAX_RATE = 50.0
+ADDITIVE_STEP = 1.0  # req/s gained per second of successful traffic
+DECREASE_FACTOR = 0.5
+BACKOFF_BASE = 0.5  # seconds; doubled per retry, full jitter
+BACKOFF_CAP = 30.0
+RETRY_STATUSES = {429, 503}
+
+# (remaining, reset) header pairs, most specific first
+_RATE_LIMIT_HEADERS = [
+    ("X-RateLimit-Remaining", "X-RateLimit-Reset"),
+    ("RateLimit-Remaining", "RateLimit-Reset"),
+    ("X-Rate-Limit-Remaining", "X-Rate-Limit-Reset"),
+]
+
+
+class RateLimited(Exception):
+    """The host is rate limited for longer than the caller's deadline allows."""
+
+    def __init__(self, host: str, wait: float) -> None:
+        super().__init__(f"{host} rate limited for another {wait:.1f}s")
+        self.host = host
+        self.wait = wait
+
+
+def _seconds_until(value: str, now: float) -> float | None:
+    """Parse a Retry-After / reset value: delta seconds, epoch seconds or an HTTP date."""
+    try:
+        number = float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+        except (TypeError, ValueError):
+            return None
+    # Reset headers are sometimes epoch timestamps rather than deltas
+    return max(0.0, number - now) if number > 1e9 else max(0.0, number)
+
+
+class HostController:
+    """AIMD request pacing for one host, shared by every thread in the process."""
+
+    def __init__(self, host: str) -> None:
+        self.host = host
+        self.rate = INITIAL_RATE
+        self._lock = threading.Lock()
+        self._next_at = 0.0  # time.monotonic() of the next free slot
+        self._blocked_until = 0.0
+        self.throttled = 0
+
+    def acquire(self, deadline: float) -> None:
+        """Wait for this host's next slot; RateLimited if it comes after `deadline`."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_at, self._blocked_until)
+            if slot > deadline:
+                raise RateLimited(self.host, slot - now)
+            self._next_at = slot + 1 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+    def observe(self, resp: requests.Response, attempt: int) -> float | None:
+        """Adapt to a response. Returns the delay before a retry, or None if it shouldn't be retried."""
+        now = time.monotonic()
+        wall = time.time()
+        with self._lock:
+            block = None
+            for remaining, reset in _RATE_LIMIT_HEADERS:
+                if resp.headers.get(remaining, "").strip() == "0" and resp.headers.get(reset):
+                    block = _seconds_until(resp.headers[reset], wall)
+                    break
+            if resp.status_code in RETRY_STATUSES:
+                self.throttled += 1
+                self.rate = max(MIN_RATE, self.rate * DECREASE_FACTOR)
+                retry_after = resp.headers.get("Retry-After")
+                if retry_after:
+                    block = _seconds_until(retry_after, wall)
+            elif resp.status_code < 400:
+                self.rate = min(MAX_RATE, self.rate + ADDITIVE_STEP / self.rate)
+            if block:
+                self._blocked_until = max(self._blocked_until, now + block)
+
+        if resp.status_code not in RETRY_STATUSES:
+            return None
+        if block is not None:
+            return block
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+_controllers: dict[str, HostController] = {}
+_controllers_lock = threading.Lock()
+
+
+def controller(host: str) -> HostController:
+    with _controllers_lock:
+        if host not in _controllers:
+            _controllers[host] = HostController(host)
+        return _controllers[host]
+
+
+def stats() -> dict[str, dict[str, float]]:
+    """{host: {"rate": req/s, "throttled": 429/503 count}} for hosts seen by this process."""
+    with _controllers_lock:
+        controllers = list(_controllers.values())
+    return {c.host: {"rate": round(c.rate, 2), "throttled": c.throttled} for c in controllers}
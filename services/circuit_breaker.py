@@ -0,0 +1,177 @@
+"""Per-service circuit breakers so a dead upstream fails fast.
+
+Each service client owns one CircuitBreaker and passes it to transport.get.
+The breaker watches network outcomes (connection errors, timeouts and 5xx;
+cache hits and 4xx don't count) over a sliding time window and opens once the
+failure rate crosses the threshold. While open, requests raise
+CircuitOpenError immediately — the transport serves a stale cached copy when
+there is one, and the client functions fall back to static data as they do
+for any other error — instead of every cache miss waiting out the timeout.
+
+After the cooldown a background probe checks whether the host answers at all
+(any non-5xx response to a HEAD request, which costs no API quota). On success
+the breaker goes half-open and lets a few trial requests through (at most
+half_open_successes in flight; the rest still fail fast): that many successes
+close it, one failure reopens it with a doubled cooldown.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+TRIAL_TIMEOUT = 60  # seconds before a half-open trial that never reported back frees its slot
+
+_breakers: dict[str, "CircuitBreaker"] = {}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one upstream service.
+
+    Args:
+        name: Service key, e.g. "songstats" (shown in the API status list).
+        probe_url: URL to HEAD while open; None lets the first request after
+            the cooldown through as the probe instead.
+        failure_rate: Fraction of failed requests in the window that opens it.
+        min_requests: Requests needed in the window before the rate counts.
+        window: Sliding window for the failure rate, in seconds.
+        cooldown: Seconds open before the first probe; doubles on each failed
+            probe up to max_cooldown.
+        half_open_successes: Successes needed in half-open state to close.
+    """
+
+    def __init__(self, name: str, probe_url: str | None = None, *, failure_rate: float = 0.5,
+                 min_requests: int = 4, window: float = 120, cooldown: float = 30,
+                 max_cooldown: float = 600, half_open_successes: int = 2) -> None:
+        self.name = name
+        self.probe_url = probe_url
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.half_open_successes = half_open_successes
+
+        self._lock = threading.Lock()
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._state = CLOSED
+        self._cooldown = cooldown
+        self._opened_at = 0.0
+        self._successes = 0
+        self._trials: deque[float] = deque()  # start times of half-open trial requests in flight
+        self._probing = False
+        _breakers[name] = self
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def retry_at(self) -> float | None:
+        """When the next probe is due while open, else None."""
+        with self._lock:
+            return self._opened_at + self._cooldown if self._state == OPEN else None
+
+    def before(self) -> None:
+        """Raise CircuitOpenError if requests to this service should not be sent."""
+        now = time.time()
+        with self._lock:
+            if self._state == OPEN and self.probe_url is None and now >= self._opened_at + self._cooldown:
+                self._half_open()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN:
+                while self._trials and self._trials[0] < now - TRIAL_TIMEOUT:
+                    self._trials.popleft()  # caller never recorded an outcome (e.g. served from cache)
+                if len(self._trials) < self.half_open_successes:
+                    self._trials.append(now)
+                    return
+        raise CircuitOpenError(f"{self.name} circuit is open")
+
+    def record(self, ok: bool) -> None:
+        """Record the outcome of one network request."""
+        now = time.time()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if self._trials:
+                    self._trials.popleft()
+                if not ok:
+                    self._open(now, backoff=True)
+                    return
+                self._successes += 1
+                if self._successes >= self.half_open_successes:
+                    self._state = CLOSED
+                    self._cooldown = self.base_cooldown
+                    self._outcomes.clear()
+                    logger.info("%s circuit closed", self.name)
+                return
+            if self._state == OPEN:
+                return  # a request that was already in flight when the breaker opened
+
+            self._outcomes.append((now, ok))
+            while self._outcomes and self._outcomes[0][0] < now - self.window:
+                self._outcomes.popleft()
+            failures = sum(1 for _, success in self._outcomes if not success)
+            if len(self._outcomes) >= self.min_requests and failures / len(self._outcomes) >= self.failure_rate:
+                self._open(now)
+
+    def _open(self, now: float, backoff: bool = False) -> None:
+        if backoff:
+            self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+        self._state = OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        logger.warning("%s circuit open for %ss", self.name, round(self._cooldown))
+        if self.probe_url and not self._probing:
+            self._probing = True
+            threading.Thread(target=self._probe_loop, name=f"probe-{self.name}", daemon=True).start()
+
+    def _half_open(self) -> None:
+        self._state = HALF_OPEN
+        self._successes = 0
+        self._trials.clear()
+        logger.info("%s circuit half-open", self.name)
+
+    def _probe_loop(self) -> None:
+        """Sleep out the cooldown, then HEAD the probe URL until the host answers."""
+        from services.transport import get_session
+
+        while True:
+            with self._lock:
+                delay = self._opened_at + self._cooldown - time.time()
+            if delay > 0:
+                time.sleep(delay)
+                continue
+            try:
+                up = get_session().head(self.probe_url, timeout=5).status_code < 500
+            except requests.RequestException:
+                up = False
+            with self._lock:
+                if self._state != OPEN:
+                    self._probing = False
+                    return
+                if up:
+                    self._half_open()
+                    self._probing = False
+                    return
+                self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+                self._opened_at = time.time()
+            logger.info("%s probe failed, next in %ss", self.name, round(self._cooldown))
+
+
+def states() -> dict[str, str]:
+    """{service: state} for every breaker created in this process."""
+    return {name: b.state for name, b in _breakers.items()}
+
+
+def get(name: str) -> CircuitBreaker | None:
+    return _breakers.get(name)
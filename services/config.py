@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from pathlib import Path
 
 import streamlit as st
 
@@ -27,25 +28,33 @@ class APIStatus:
     configured: bool
     live: bool = False
     error: str = ""
+    breaker: str = ""  # circuit breaker state ("closed", "open", "half-open"); "" if none
 
 
 def get_all_api_status() -> list[APIStatus]:
-    """Return configuration status of all API integrations."""
+    """Return configuration and circuit breaker status of all API integrations.
+
+    Breaker state is reported for clients that have been imported in this process.
+    """
+    from services.circuit_breaker import states
+
     apis = [
-        ("Songstats (RapidAPI)", "SONGSTATS_API_KEY"),
-        ("Spotify", "SPOTIFY_CLIENT_ID"),
-        ("Instagram Graph API", "INSTAGRAM_ACCESS_TOKEN"),
-        ("YouTube Data API", "YOUTUBE_API_KEY"),
-        ("Last.fm", "LASTFM_API_KEY"),
-        ("MusicBrainz", "_always_free_"),
-        ("Odesli/Songlink", "_always_free_"),
+        ("Songstats (RapidAPI)", "SONGSTATS_API_KEY", "songstats"),
+        ("Spotify", "SPOTIFY_CLIENT_ID", "spotify"),
+        ("Instagram Graph API", "INSTAGRAM_ACCESS_TOKEN", "instagram"),
+        ("YouTube Data API", "YOUTUBE_API_KEY", "youtube"),
+        ("Last.fm", "LASTFM_API_KEY", "lastfm"),
+        ("MusicBrainz", "_always_free_", "musicbrainz"),
+        ("Odesli/Songlink", "_always_free_", "odesli"),
     ]
+    breakers = states()
     results = []
-    for name, key in apis:
+    for name, key, service in apis:
+        breaker = breakers.get(service, "")
         if key.startswith("_"):
-            results.append(APIStatus(name=name, configured=True, live=True))
+            results.append(APIStatus(name=name, configured=True, live=True, breaker=breaker))
         else:
-            results.append(APIStatus(name=name, configured=is_configured(key)))
+            results.append(APIStatus(name=name, configured=is_configured(key), breaker=breaker))
     return results
 
 
@@ -56,3 +65,7 @@ ILU_SPOTIFY_ID = get_secret("ILU_SPOTIFY_ID", "")
 JAKKE_YOUTUBE_CHANNEL = get_secret("JAKKE_YOUTUBE_CHANNEL", "")
 JAKKE_LASTFM_ARTIST = get_secret("JAKKE_LASTFM_ARTIST", "Jakke")
 ENJUNE_LASTFM_ARTIST = get_secret("ENJUNE_LASTFM_ARTIST", "Enjune")
+
+# Local on-disk stores (compiled snapshots, databases) — generated, not committed
+DATA_DIR = Path(__file__).parent.parent / "data"
+STORE_DIR = Path(get_secret("DATA_STORE_DIR", "") or DATA_DIR / "store")
@@ -0,0 +1,33 @@
+"""SQLite helpers for the local stores under STORE_DIR.
+
+Every store gets its own database file. Connections are cached per thread and
+opened in WAL mode with a busy timeout, so Streamlit sessions, background jobs
+and separate worker processes on one host can read and write the same file.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from services.config import STORE_DIR
+
+_local = threading.local()
+
+
+def connect(name: str, schema: str = "") -> sqlite3.Connection:
+    """Return this thread's connection to STORE_DIR/<name>.db.
+
+    `schema` is an idempotent DDL script (CREATE ... IF NOT EXISTS) run once per
+    connection.
+    """
+    conns: dict[str, sqlite3.Connection] = _local.__dict__.setdefault("conns", {})
+    conn = conns.get(name)
+    if conn is None:
+        STORE_DIR.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(STORE_DIR / f"{name}.db", timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if schema:
+            conn.executescript(schema)
+        conns[name] = conn
+    return conn
@@ -0,0 +1,149 @@
+"""Persistent HTTP response cache shared by all service clients.
+
+Successful GET responses are stored in STORE_DIR/http_cache.db keyed on the
+normalized URL, query params and request headers. Within its TTL an entry is
+served without touching the network; after that the transport revalidates it
+with If-None-Match / If-Modified-Since when the upstream sent an ETag or
+Last-Modified, and a 304 refreshes the entry instead of re-downloading it.
+SQLite in WAL mode makes the cache safe to share between Streamlit workers and
+restarts on one host.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from services.db import connect
+
+logger = logging.getLogger(__name__)
+
+# Query params that carry credentials — hashed into the key, never stored in clear
+SECRET_PARAMS = {"access_token", "api_key", "key"}
+# Entries not refreshed for this long are purged (by the app's background
+# refresher); until then a stale copy can still stand in when an upstream fails
+MAX_AGE = 7 * 24 * 3600
+# Response headers that describe the wire encoding rather than the stored body
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key           TEXT PRIMARY KEY,
+    url           TEXT NOT NULL,
+    status        INTEGER NOT NULL,
+    headers       TEXT NOT NULL,
+    body          BLOB NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    stored_at     REAL NOT NULL
+);
+"""
+
+
+def _conn():
+    return connect("http_cache", _SCHEMA)
+
+
+@dataclass
+class CachedResponse:
+    key: str
+    url: str
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    etag: str | None
+    last_modified: str | None
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self) -> requests.Response:
+        """Rebuild a requests.Response so callers can't tell it came from cache
+        (apart from `resp.from_cache`)."""
+        resp = requests.Response()
+        resp.status_code = self.status
+        resp.reason = "OK"
+        resp.url = self.url
+        resp.headers = CaseInsensitiveDict(self.headers)
+        resp._content = self.body
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers) or "utf-8"
+        resp.from_cache = True
+        return resp
+
+
+def normalize(url: str, params: dict[str, Any] | None = None,
+              headers: dict[str, str] | None = None) -> tuple[str, str]:
+    """Return (cache key, display URL). The display URL omits secret params."""
+    parts = urlsplit(url)
+    base = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, ""))
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None)
+    material = json.dumps([base, items, sorted((headers or {}).items())])
+    key = hashlib.sha256(material.encode()).hexdigest()
+    shown = "&".join(f"{k}={v}" for k, v in items if k not in SECRET_PARAMS)
+    return key, f"{base}?{shown}" if shown else base
+
+
+def lookup(key: str) -> CachedResponse | None:
+    try:
+        row = _conn().execute(
+            "SELECT key, url, status, headers, body, etag, last_modified, stored_at "
+            "FROM responses WHERE key = ?", (key,),
+        ).fetchone()
+    except Exception as e:
+        logger.warning("HTTP cache read failed: %s", e)
+        return None
+    if not row:
+        return None
+    return CachedResponse(row[0], row[1], row[2], json.loads(row[3]), row[4], row[5], row[6], row[7])
+
+
+def store(key: str, url: str, resp: requests.Response) -> None:
+    """Store a 200 response unless the upstream forbids it (Cache-Control: no-store)."""
+    if resp.status_code != 200 or "no-store" in resp.headers.get("Cache-Control", ""):
+        return
+    headers = {k: v for k, v in resp.headers.items() if k.lower() not in _DROP_HEADERS}
+    try:
+        conn = _conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, resp.status_code, json.dumps(headers), resp.content,
+                 resp.headers.get("ETag"), resp.headers.get("Last-Modified"), time.time()),
+            )
+    except Exception as e:
+        logger.warning("HTTP cache write failed: %s", e)
+
+
+def touch(key: str) -> None:
+    """Mark an entry fresh again after a 304 Not Modified."""
+    try:
+        conn = _conn()
+        with conn:
+            conn.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+    except Exception as e:
+        logger.warning("HTTP cache update failed: %s", e)
+
+
+def purge(older_than: float) -> int:
+    """Delete entries not refreshed in `older_than` seconds. Returns rows removed."""
+    conn = _conn()
+    with conn:
+        cur = conn.execute("DELETE FROM responses WHERE stored_at < ?", (time.time() - older_than,))
+    return cur.rowcount
@@ -11,15 +11,22 @@ import logging
 from pathlib import Path
 from typing import Any
 
-import requests
 import streamlit as st
 
+from services import transport
+from services.circuit_breaker import CircuitBreaker
 from services.config import get_secret
+from services.metrics_store import record
+from services.singleflight import coalesce
 
 logger = logging.getLogger(__name__)
 
 DATA_DIR = Path(__file__).parent.parent / "data"
-GRAPH_URL = "https://graph.facebook.com/v19.0"
+GRAPH_URL = get_secret("INSTAGRAM_GRAPH_URL") or "https://graph.facebook.com/v19.0"
+# Shared response cache TTL — a little under the hourly refresh so each refresh revalidates
+CACHE_TTL = 3000
+# Shared with instagram_sync / instagram_insights, which call the same host
+breaker = CircuitBreaker("instagram", probe_url=GRAPH_URL.rsplit("/", 1)[0])
 
 
 def _load_static(filename: str) -> Any:
@@ -35,13 +42,15 @@ def _load_static(filename: str) -> Any:
     return {} if filename.endswith(".json") else None
 
 
+@coalesce("instagram")
 def _api_get(endpoint: str, params: dict | None = None) -> dict[str, Any]:
     """Make authenticated GET to Instagram Graph API."""
     token = get_secret("INSTAGRAM_ACCESS_TOKEN")
     base_params = {"access_token": token}
     if params:
         base_params.update(params)
-    resp = requests.get(f"{GRAPH_URL}/{endpoint}", params=base_params, timeout=15)
+    resp = transport.get(f"{GRAPH_URL}/{endpoint}", params=base_params, timeout=15, cache_ttl=CACHE_TTL,
+                         breaker=breaker)
     resp.raise_for_status()
     return resp.json()
 
@@ -69,46 +78,55 @@ def get_account_info() -> dict[str, Any]:
         return static.get("account", {})
 
 
+@coalesce("instagram")
+def fetch_insights_30d() -> dict[str, Any] | None:
+    """Fetch live 30-day insights (uncached). None if not configured; raises on API errors."""
+    ig_user_id = get_secret("INSTAGRAM_USER_ID")
+    if not is_available():
+        return None
+
+    # Fetch account-level insights
+    metrics = "impressions,reach,accounts_engaged,profile_views"
+    data = _api_get(f"{ig_user_id}/insights", {
+        "metric": metrics,
+        "period": "days_28",
+    })
+
+    # Parse into our expected format
+    values = {}
+    for item in data.get("data", []):
+        name = item.get("name", "")
+        vals = item.get("values", [{}])
+        values[name] = vals[0].get("value", 0) if vals else 0
+
+    account = get_account_info()
+
+    result = {
+        "account": account,
+        "overview": {
+            "views_30d": values.get("impressions", 0),
+            "accounts_reached": values.get("reach", 0),
+            "interactions": values.get("accounts_engaged", 0),
+            "accounts_engaged": values.get("accounts_engaged", 0),
+            "profile_visits": values.get("profile_views", 0),
+            "external_link_taps": 0,
+        },
+        "_source": "api",
+    }
+    record(account.get("username") or ig_user_id, "instagram",
+           {"account": account, "overview": result["overview"]})
+    return result
+
+
 @st.cache_data(ttl=3600)
 def get_insights_30d() -> dict[str, Any]:
     """Get 30-day insights overview (views, reach, interactions, etc.)."""
-    token = get_secret("INSTAGRAM_ACCESS_TOKEN")
-    ig_user_id = get_secret("INSTAGRAM_USER_ID")
-    if not token or not ig_user_id:
-        return _load_static("instagram_jakke_insights_30d.json")
-
     try:
-        # Fetch account-level insights
-        metrics = "impressions,reach,accounts_engaged,profile_views"
-        data = _api_get(f"{ig_user_id}/insights", {
-            "metric": metrics,
-            "period": "days_28",
-        })
-
-        # Parse into our expected format
-        values = {}
-        for item in data.get("data", []):
-            name = item.get("name", "")
-            vals = item.get("values", [{}])
-            values[name] = vals[0].get("value", 0) if vals else 0
-
-        account = get_account_info()
-
-        return {
-            "account": account,
-            "overview": {
-                "views_30d": values.get("impressions", 0),
-                "accounts_reached": values.get("reach", 0),
-                "interactions": values.get("accounts_engaged", 0),
-                "accounts_engaged": values.get("accounts_engaged", 0),
-                "profile_visits": values.get("profile_views", 0),
-                "external_link_taps": 0,
-            },
-            "_source": "api",
-        }
+        data = fetch_insights_30d()
     except Exception as e:
         logger.warning("Instagram insights failed, using static: %s", e)
-        return _load_static("instagram_jakke_insights_30d.json")
+        data = None
+    return data or _load_static("instagram_jakke_insights_30d.json")
 
 
 @st.cache_data(ttl=3600)
@@ -0,0 +1,224 @@
+"""Bulk per-post Instagram insights via Graph API batch requests.
+
+Packs up to BATCH_SIZE `/{media-id}/insights` calls into one POST to the Graph
+batch endpoint and keeps a few batches in flight. Every response's
+X-App-Usage / X-Business-Use-Case-Usage headers are checked, and all workers
+pause together once usage nears the limit or the API reports throttling.
+Results land in the post store (services.instagram_sync, table
+post_insights) next to the posts they describe.
+
+Usage:  python -m services.instagram_insights
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pandas as pd
+import requests
+
+from services import transport
+from services.config import get_secret
+from services.instagram_client import GRAPH_URL, breaker, is_available
+from services.instagram_sync import _conn
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50  # Graph API maximum per batch request
+CONCURRENT_BATCHES = 3
+RECENT_DAYS = 30  # posts this young are re-fetched daily; older ones once
+USAGE_SOFT_LIMIT = 75  # % of any usage counter at which workers slow down
+THROTTLE_CODES = {4, 17, 32, 613, 80002}  # Graph error codes meaning "rate limited"
+MAX_RETRIES = 5  # throttled attempts per batch before giving up until the next run
+
+_FEED_METRICS = "reach,saved,shares,total_interactions"
+_REEL_METRICS = "reach,saved,shares,total_interactions,plays"
+_API_VERSION = GRAPH_URL.rsplit("/", 1)[1]
+
+
+class _Backoff:
+    """Shared pause for all workers, driven by usage headers and throttle errors."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._until = 0.0
+        self._strikes = 0
+
+    def wait(self) -> None:
+        delay = self._until - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._until = max(self._until, time.time() + seconds)
+
+    def observe(self, resp: requests.Response) -> None:
+        """Slow down as usage counters climb (they're percentages of the hourly limit)."""
+        usage = 0
+        for header in ("X-App-Usage", "X-Business-Use-Case-Usage"):
+            raw = resp.headers.get(header)
+            if not raw:
+                continue
+            try:
+                parsed = json.loads(raw)
+            except ValueError:
+                continue
+            # Business use case usage is {business_id: [{...}]}; app usage is a flat dict
+            buckets = [b for v in parsed.values() for b in v] if header.startswith("X-B") else [parsed]
+            for bucket in buckets:
+                for key in ("call_count", "total_time", "total_cputime"):
+                    usage = max(usage, bucket.get(key, 0))
+                if bucket.get("estimated_time_to_regain_access"):  # minutes
+                    self.pause(bucket["estimated_time_to_regain_access"] * 60)
+        if usage >= USAGE_SOFT_LIMIT:
+            # Linear ramp: 75% -> 15s, 100% -> 60s+
+            self.pause(15 + (usage - USAGE_SOFT_LIMIT) * 1.8)
+            logger.info("Graph API usage at %s%%, pausing workers", usage)
+
+    def throttled(self) -> None:
+        with self._lock:
+            self._strikes += 1
+            delay = min(60 * 2 ** (self._strikes - 1), 900)
+            self._until = max(self._until, time.time() + delay)
+        logger.warning("Graph API throttled, backing off %ss", delay)
+
+    def ok(self) -> None:
+        with self._lock:
+            self._strikes = 0
+
+
+def pending_media(now: float | None = None) -> list[tuple[str, str]]:
+    """(media_id, product_type) for posts missing insights or due a refresh."""
+    now = now or time.time()
+    recent = (pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=RECENT_DAYS)).strftime("%Y-%m-%dT%H:%M:%S")
+    return _conn().execute(
+        "SELECT p.media_id, p.product_type FROM posts p LEFT JOIN post_insights i USING (media_id) "
+        "WHERE i.media_id IS NULL OR (p.timestamp >= ? AND i.fetched_at < ?) "
+        "ORDER BY p.timestamp DESC",
+        (recent, now - 86400),
+    ).fetchall()
+
+
+def _error_code(resp: requests.Response) -> int | None:
+    try:
+        return resp.json().get("error", {}).get("code")
+    except ValueError:
+        return None
+
+
+def _parse(body: dict[str, Any]) -> dict[str, int]:
+    values = {}
+    for item in body.get("data", []):
+        vals = item.get("values") or [{}]
+        values[item.get("name", "")] = vals[0].get("value", 0)
+    return values
+
+
+def _save(rows: list[tuple]) -> None:
+    conn = _conn()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO post_insights (media_id, reach, saved, shares, plays, "
+            "total_interactions, error, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+
+def _run_batch(batch: list[tuple[str, str]], backoff: _Backoff) -> tuple[int, int]:
+    """Send one batch; retry the whole batch while throttled. Returns (ok, failed)."""
+    requests_json = json.dumps([
+        {"method": "GET", "relative_url": f"{_API_VERSION}/{media_id}/insights?metric="
+         + (_REEL_METRICS if product_type == "REELS" else _FEED_METRICS)}
+        for media_id, product_type in batch
+    ])
+    for _ in range(MAX_RETRIES):
+        backoff.wait()
+        resp = transport.post(GRAPH_URL.rsplit("/", 1)[0], data={
+            "access_token": get_secret("INSTAGRAM_ACCESS_TOKEN"),
+            "batch": requests_json,
+            "include_headers": "false",
+        }, timeout=60, breaker=breaker)
+        backoff.observe(resp)
+        if resp.status_code == 429 or (resp.status_code >= 400 and _error_code(resp) in THROTTLE_CODES):
+            backoff.throttled()
+            continue
+        resp.raise_for_status()
+        backoff.ok()
+        break
+    else:
+        raise RuntimeError(f"Graph API still throttled after {MAX_RETRIES} attempts")
+
+    now = time.time()
+    rows, ok, failed = [], 0, 0
+    for (media_id, _), result in zip(batch, resp.json()):
+        body = json.loads(result["body"]) if result and result.get("body") else {}
+        if result and result.get("code") == 200:
+            v = _parse(body)
+            rows.append((media_id, v.get("reach"), v.get("saved"), v.get("shares"), v.get("plays"),
+                         v.get("total_interactions"), None, now))
+            ok += 1
+        else:
+            # Timed-out (null) and throttled items are retried next run; other errors are
+            # kept with their message so they aren't retried every hour
+            error = body.get("error", {})
+            if error.get("code") in THROTTLE_CODES:
+                backoff.throttled()
+            elif result:
+                rows.append((media_id, None, None, None, None, None, error.get("message", "error"), now))
+            failed += 1
+    _save(rows)
+    return ok, failed
+
+
+def fetch_pending(limit: int | None = None) -> dict[str, Any] | None:
+    """Fetch insights for every post that needs them. None if Instagram is not configured."""
+    if not is_available():
+        return None
+    pending = pending_media()[:limit]
+    batches = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+    backoff = _Backoff()
+    start = time.time()
+    ok = failed = 0
+    with ThreadPoolExecutor(max_workers=CONCURRENT_BATCHES, thread_name_prefix="ig-insights") as pool:
+        for batch_ok, batch_failed in pool.map(lambda b: _run_batch(b, backoff), batches):
+            ok += batch_ok
+            failed += batch_failed
+    summary = {"media": len(pending), "batches": len(batches), "ok": ok, "failed": failed,
+               "seconds": round(time.time() - start, 2)}
+    logger.info("Instagram post insights: %s", summary)
+    return summary
+
+
+def load_post_insights() -> pd.DataFrame:
+    """Posts joined with their insights (posts without insights are omitted)."""
+    df = pd.read_sql_query(
+        "SELECT p.media_id, p.shortcode, p.timestamp, p.media_type, p.product_type, p.caption, "
+        "p.like_count, p.comments_count, p.permalink, i.reach, i.saved, i.shares, i.plays, "
+        "i.total_interactions FROM posts p JOIN post_insights i USING (media_id) WHERE i.error IS NULL",
+        _conn(),
+    )
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, format="ISO8601")
+    return df
+
+
+def fingerprint() -> tuple[int, float]:
+    count, last = _conn().execute(
+        "SELECT COUNT(*), COALESCE(MAX(fetched_at), 0) FROM post_insights WHERE error IS NULL"
+    ).fetchone()
+    return count, last
+
+
+def main() -> None:
+    if not is_available():
+        raise SystemExit("INSTAGRAM_ACCESS_TOKEN and INSTAGRAM_USER_ID are required")
+    logging.basicConfig(level=logging.INFO)
+    print(fetch_pending())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Incremental Instagram media sync and derived aggregates.
+
+Follows the Graph API `paging.next` cursors over the account's media (100
+posts per page) and upserts every post into STORE_DIR/instagram.db. Later runs
+stop at the first page of posts that are already stored and older than
+REFRESH_DAYS, since older posts rarely move, and rewrite only rows whose like or
+comment counts changed. A full walk runs every FULL_SYNC_EVERY so old posts
+stay current too.
+
+The historical views (yearly, monthly, top posts, day of week, content type)
+are recomputed from the stored posts with groupbys, in the same shape as the
+hand-exported ig_*.csv files they replace.
+
+Usage:  python -m services.instagram_sync [--full]
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from typing import Any
+
+import pandas as pd
+
+from services import transport
+from services.config import get_secret
+from services.db import connect
+from services.instagram_client import GRAPH_URL, breaker, is_available
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100
+REFRESH_DAYS = 30  # posts younger than this are re-read on every incremental run
+FULL_SYNC_EVERY = 7 * 86400  # seconds between full walks
+MEDIA_FIELDS = "id,shortcode,caption,media_type,media_product_type,timestamp,like_count,comments_count,permalink"
+TOP_POSTS = 20
+DISPLAY_TZ = "America/New_York"  # day-of-week is bucketed in the audience's local time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    media_id       TEXT PRIMARY KEY,
+    shortcode      TEXT NOT NULL DEFAULT '',
+    timestamp      TEXT NOT NULL,
+    media_type     TEXT NOT NULL,
+    product_type   TEXT NOT NULL DEFAULT '',
+    caption        TEXT NOT NULL DEFAULT '',
+    like_count     INTEGER NOT NULL DEFAULT 0,
+    comments_count INTEGER NOT NULL DEFAULT 0,
+    permalink      TEXT NOT NULL DEFAULT '',
+    changed_at     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS post_insights (
+    media_id           TEXT PRIMARY KEY,
+    reach              INTEGER,
+    saved              INTEGER,
+    shares             INTEGER,
+    plays              INTEGER,
+    total_interactions INTEGER,
+    error              TEXT,
+    fetched_at         REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key   TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+# Graph API media_type -> labels used by the exported CSVs
+_TYPE_LABELS = {"VIDEO": "Video", "IMAGE": "Photo", "CAROUSEL_ALBUM": "Carousel"}
+_CONTENT_TYPE_LABELS = {"VIDEO": "Video/Reel", "IMAGE": "Photo", "CAROUSEL_ALBUM": "Carousel"}
+
+
+def _conn():
+    return connect("instagram", _SCHEMA)
+
+
+def _state(key: str) -> float:
+    row = _conn().execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else 0.0
+
+
+def _upsert(posts: list[dict], now: float) -> int:
+    """Insert new posts and update changed ones. Returns rows written."""
+    conn = _conn()
+    with conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT INTO posts (media_id, shortcode, timestamp, media_type, product_type, caption, "
+            "like_count, comments_count, permalink, changed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (media_id) DO UPDATE SET like_count = excluded.like_count, "
+            "comments_count = excluded.comments_count, caption = excluded.caption, "
+            "changed_at = excluded.changed_at "
+            "WHERE like_count != excluded.like_count OR comments_count != excluded.comments_count "
+            "OR caption != excluded.caption",
+            [
+                (p["id"], p.get("shortcode", ""), p["timestamp"], p.get("media_type", ""),
+                 p.get("media_product_type", ""), p.get("caption", ""), p.get("like_count", 0),
+                 p.get("comments_count", 0), p.get("permalink", ""), now)
+                for p in posts
+            ],
+        )
+        return conn.total_changes - before
+
+
+def sync_media(full: bool = False) -> dict[str, Any] | None:
+    """Sync the account's media. None if Instagram is not configured.
+
+    A run is full when asked for, when the store is empty, or when the last
+    full walk is older than FULL_SYNC_EVERY.
+    """
+    if not is_available():
+        return None
+    now = time.time()
+    full = full or now - _state("last_full_sync") > FULL_SYNC_EVERY
+    known = {row[0] for row in _conn().execute("SELECT media_id FROM posts")}
+    cutoff = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=REFRESH_DAYS)
+
+    resp = transport.get(f"{GRAPH_URL}/{get_secret('INSTAGRAM_USER_ID')}/media", params={
+        "access_token": get_secret("INSTAGRAM_ACCESS_TOKEN"),
+        "fields": MEDIA_FIELDS,
+        "limit": PAGE_SIZE,
+    }, breaker=breaker)
+    pages = seen = written = 0
+    while True:
+        resp.raise_for_status()
+        page = resp.json()
+        posts = page.get("data", [])
+        pages += 1
+        seen += len(posts)
+        written += _upsert(posts, now)
+        settled = posts and all(
+            p["id"] in known and pd.Timestamp(p["timestamp"]) < cutoff for p in posts
+        )
+        next_url = page.get("paging", {}).get("next")
+        if not next_url or (settled and not full):
+            break
+        resp = transport.get(next_url, breaker=breaker)  # cursor and token are already in the URL
+
+    conn = _conn()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('last_sync', ?)", (now,))
+        if full:
+            conn.execute("INSERT OR REPLACE INTO sync_state VALUES ('last_full_sync', ?)", (now,))
+    summary = {"full": full, "pages": pages, "posts_seen": seen, "posts_written": written}
+    logger.info("Instagram media sync: %s", summary)
+    return summary
+
+
+def fingerprint() -> tuple[int, float]:
+    """(posts stored, last change) — moves only when a sync wrote something."""
+    count, last = _conn().execute("SELECT COUNT(*), COALESCE(MAX(changed_at), 0) FROM posts").fetchone()
+    return count, last
+
+
+def load_posts() -> pd.DataFrame:
+    posts = pd.read_sql_query(
+        "SELECT media_id, shortcode, timestamp, media_type, caption, like_count, comments_count FROM posts",
+        _conn(),
+    )
+    posts["timestamp"] = pd.to_datetime(posts["timestamp"], utc=True, format="ISO8601")
+    return posts
+
+
+def aggregates(posts: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Recompute the ig_* datasets from raw posts (same columns as the CSV exports)."""
+    posts = posts.sort_values("timestamp")
+    year = posts["timestamp"].dt.year.astype("int64")
+    month = posts["timestamp"].dt.tz_localize(None).dt.to_period("M").dt.to_timestamp()
+
+    by_year = posts.groupby(year)
+    top_idx = by_year["like_count"].idxmax()
+    type_counts = pd.crosstab(year, posts["media_type"]).reindex(
+        columns=["IMAGE", "VIDEO", "CAROUSEL_ALBUM"], fill_value=0,
+    )
+    yearly = pd.DataFrame({
+        "posts": by_year.size(),
+        "total_likes": by_year["like_count"].sum(),
+        "avg_likes": by_year["like_count"].mean().round().astype("int64"),
+        "top_likes": by_year["like_count"].max(),
+        "top_code": posts.loc[top_idx, "shortcode"].set_axis(top_idx.index),
+        "comments": by_year["comments_count"].sum(),
+        "photos": type_counts["IMAGE"],
+        "videos": type_counts["VIDEO"],
+        "carousels": type_counts["CAROUSEL_ALBUM"],
+    }).rename_axis("year").reset_index().sort_values("year", ascending=False, ignore_index=True)
+
+    by_month = posts.groupby(month)
+    monthly = pd.DataFrame({
+        "posts": by_month.size(),
+        "likes": by_month["like_count"].sum(),
+        "avg_likes": by_month["like_count"].mean().round().astype("int64"),
+    }).rename_axis("month").reset_index().sort_values("month", ascending=False, ignore_index=True)
+
+    top = posts.nlargest(TOP_POSTS, "like_count")
+    top_posts = pd.DataFrame({
+        "rank": range(1, len(top) + 1),
+        "date": top["timestamp"].dt.tz_localize(None).dt.normalize(),
+        "likes": top["like_count"],
+        "comments": top["comments_count"],
+        "type": pd.Categorical(top["media_type"].map(_TYPE_LABELS).fillna("Photo")),
+        "shortcode": top["shortcode"],
+        "collaborator": pd.NA,  # not exposed by the media edge
+        "caption_preview": top["caption"].str.split("\n").str[0].str.slice(0, 60),
+    }).reset_index(drop=True)
+
+    local = posts["timestamp"].dt.tz_convert(DISPLAY_TZ)
+    by_day = posts.groupby(local.dt.strftime("%a"))
+    day_of_week = pd.DataFrame({
+        "posts": by_day.size(),
+        "avg_likes": by_day["like_count"].mean().round().astype("int64"),
+    }).rename_axis("day").reset_index().sort_values("avg_likes", ascending=False, ignore_index=True)
+
+    by_type = posts.groupby(posts["media_type"].map(_CONTENT_TYPE_LABELS).fillna("Photo"))
+    content_type = pd.DataFrame({
+        "posts": by_type.size(),
+        "total_likes": by_type["like_count"].sum(),
+        "avg_likes": by_type["like_count"].mean().round().astype("int64"),
+    }).rename_axis("type").reset_index().sort_values("avg_likes", ascending=False, ignore_index=True)
+    content_type["type"] = pd.Categorical(content_type["type"])
+
+    return {
+        "ig_yearly": yearly,
+        "ig_monthly": monthly,
+        "ig_top_posts": top_posts,
+        "ig_day_of_week": day_of_week,
+        "ig_content_type": content_type,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync Instagram media and rebuild aggregates.")
+    parser.add_argument("--full", action="store_true", help="walk every page, not just new posts")
+    args = parser.parse_args()
+    if not is_available():
+        parser.error("INSTAGRAM_ACCESS_TOKEN and INSTAGRAM_USER_ID are required")
+    logging.basicConfig(level=logging.INFO)
+    print(sync_media(full=args.full))
+    for name, df in aggregates(load_posts()).items():
+        print(f"{name}: {len(df)} rows")
+
+
+if __name__ == "__main__":
+    main()
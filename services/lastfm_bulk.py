@@ -0,0 +1,76 @@
+"""Bulk Last.fm track stats for the whole catalog.
+
+Fetches `track.getinfo` for every song in jakke_songs_all.csv on a bounded
+worker pool. Requests pass through the client's host-wide limiter (5 req/s
+with a burst of 5), so the pool stays within Last.fm's limit however many
+processes run it. Listeners and playcount are appended to the metrics store
+with source "lastfm" and entity = song title, next to the artist-level series.
+
+Usage:  python -m services.lastfm_bulk [--workers N]
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from services.lastfm_client import fetch_track_info, is_available
+from services.metrics_store import record_rows
+from services.snapshot_store import load_dataset
+
+logger = logging.getLogger(__name__)
+
+WORKERS = 8
+
+
+def _fetch(artist: str, track: str) -> tuple[str, str, dict[str, Any] | None, str | None]:
+    try:
+        return artist, track, fetch_track_info(artist, track), None
+    except Exception as e:
+        return artist, track, None, str(e)
+
+
+def refresh_catalog(workers: int = WORKERS) -> dict[str, Any] | None:
+    """Fetch and record Last.fm stats for every catalog song. None if not configured."""
+    if not is_available():
+        return None
+    songs = load_dataset("songs_all")
+    pairs = list(dict.fromkeys(zip(songs["artist"].astype(str), songs["song"])))
+    start = time.time()
+    ts = int(start)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lastfm-bulk") as pool:
+        results = list(pool.map(lambda p: _fetch(*p), pairs))
+
+    rows = []
+    missing, failed = 0, 0
+    for artist, track, info, error in results:
+        if error:
+            failed += 1
+            logger.warning("Last.fm track.getinfo failed for %s — %s: %s", artist, track, error)
+        elif info is None:
+            missing += 1
+        else:
+            rows += [(artist, "lastfm", track, "listeners", ts, float(info["listeners"])),
+                     (artist, "lastfm", track, "playcount", ts, float(info["playcount"]))]
+    record_rows(rows)
+    summary = {"tracks": len(pairs), "recorded": len(rows) // 2, "not_found": missing,
+               "failed": failed, "seconds": round(time.time() - start, 2)}
+    logger.info("Last.fm catalog refresh: %s", summary)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fetch Last.fm stats for every catalog track.")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+    if not is_available():
+        parser.error("LASTFM_API_KEY is required")
+    logging.basicConfig(level=logging.INFO)
+    print(refresh_catalog(args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,16 +9,24 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-import requests
 import streamlit as st
 
+from services import transport
+from services.circuit_breaker import CircuitBreaker
 from services.config import get_secret
+from services.metrics_store import record
+from services.rate_limit import SharedRateLimiter
+from services.singleflight import coalesce
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://ws.audioscrobbler.com/2.0/"
+BASE_URL = get_secret("LASTFM_BASE_URL") or "https://ws.audioscrobbler.com/2.0/"
+# Last.fm asks for no more than 5 req/s per key; shared by every thread and process
+rate_limiter = SharedRateLimiter("lastfm", interval=0.2, burst=5)
+breaker = CircuitBreaker("lastfm", probe_url=BASE_URL)
 
 
+@coalesce("lastfm")
 def _api_get(method: str, params: dict | None = None) -> dict[str, Any]:
     """Make GET request to Last.fm API."""
     base_params = {
@@ -28,7 +36,8 @@ def _api_get(method: str, params: dict | None = None) -> dict[str, Any]:
     }
     if params:
         base_params.update(params)
-    resp = requests.get(BASE_URL, params=base_params, timeout=15)
+    resp = transport.get(BASE_URL, params=base_params, timeout=15, cache_ttl=3600,
+                         throttle=rate_limiter.wait, breaker=breaker)
     resp.raise_for_status()
     return resp.json()
 
@@ -49,7 +58,7 @@ def get_artist_info(artist: str) -> dict[str, Any] | None:
             {"name": s["name"], "match": s.get("match", "")}
             for s in artist_data.get("similar", {}).get("artist", [])
         ]
-        return {
+        result = {
             "name": artist_data.get("name", ""),
             "listeners": int(stats.get("listeners", 0)),
             "playcount": int(stats.get("playcount", 0)),
@@ -58,6 +67,8 @@ def get_artist_info(artist: str) -> dict[str, Any] | None:
             "bio_summary": artist_data.get("bio", {}).get("summary", ""),
             "url": artist_data.get("url", ""),
         }
+        record(artist, "lastfm", {"listeners": result["listeners"], "playcount": result["playcount"]})
+        return result
     except Exception as e:
         logger.warning("Last.fm artist info failed: %s", e)
         return None
@@ -110,25 +121,30 @@ def get_similar_artists(artist: str, limit: int = 10) -> list[dict]:
         return []
 
 
+def fetch_track_info(artist: str, track: str) -> dict[str, Any] | None:
+    """Track-level info (uncached). None if not configured or unknown; raises on API errors."""
+    if not get_secret("LASTFM_API_KEY"):
+        return None
+    data = _api_get("track.getinfo", {"artist": artist, "track": track, "autocorrect": 1})
+    if "track" not in data:  # Last.fm reports "Track not found" as an error payload
+        return None
+    t = data["track"]
+    tags = [tag["name"] for tag in t.get("toptags", {}).get("tag", [])]
+    return {
+        "name": t.get("name", ""),
+        "artist": t.get("artist", {}).get("name", ""),
+        "listeners": int(t.get("listeners", 0)),
+        "playcount": int(t.get("playcount", 0)),
+        "tags": tags,
+        "url": t.get("url", ""),
+    }
+
+
 @st.cache_data(ttl=3600)
 def get_track_info(artist: str, track: str) -> dict[str, Any] | None:
     """Get track-level info (listeners, playcount, tags)."""
-    api_key = get_secret("LASTFM_API_KEY")
-    if not api_key:
-        return None
-
     try:
-        data = _api_get("track.getinfo", {"artist": artist, "track": track})
-        t = data.get("track", {})
-        tags = [tag["name"] for tag in t.get("toptags", {}).get("tag", [])]
-        return {
-            "name": t.get("name", ""),
-            "artist": t.get("artist", {}).get("name", ""),
-            "listeners": int(t.get("listeners", 0)),
-            "playcount": int(t.get("playcount", 0)),
-            "tags": tags,
-            "url": t.get("url", ""),
-        }
+        return fetch_track_info(artist, track)
     except Exception as e:
         logger.warning("Last.fm track info failed: %s", e)
         return None
@@ -0,0 +1,162 @@
+"""Append-only time-series store for platform metrics.
+
+Every successful upstream fetch (Songstats, Instagram, YouTube, Last.fm) appends
+its numeric values here, one row per (artist, source, entity, metric, timestamp).
+`entity` is empty for artist-level metrics and names a sub-entity (e.g. a track
+title) otherwise. The primary key doubles as the clustered index, so history
+and delta queries for one series are range scans regardless of table size.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Iterable
+
+import pandas as pd
+
+from services.db import connect
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    artist TEXT NOT NULL,
+    source TEXT NOT NULL,
+    entity TEXT NOT NULL DEFAULT '',
+    metric TEXT NOT NULL,
+    ts     INTEGER NOT NULL,  -- unix seconds, UTC
+    value  REAL NOT NULL,
+    PRIMARY KEY (artist, source, entity, metric, ts)
+) WITHOUT ROWID;
+"""
+
+
+def _conn():
+    return connect("metrics", _SCHEMA)
+
+
+def _to_ts(when: datetime | float | int | None) -> int:
+    if when is None:
+        return int(time.time())
+    if isinstance(when, datetime):
+        return int(when.timestamp())
+    return int(when)
+
+
+def flatten_metrics(data: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    """Flatten nested dicts to {"a.b": value}, keeping only numeric leaves."""
+    flat: dict[str, float] = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_metrics(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def record(artist: str, source: str, metrics: dict[str, Any], *,
+           entity: str = "", when: datetime | float | None = None) -> int:
+    """Append one sample per numeric metric. Returns the number of rows written.
+
+    Never raises — a failed history write must not break the fetch that produced it.
+    """
+    rows = [
+        (artist, source, entity, metric, _to_ts(when), value)
+        for metric, value in flatten_metrics(metrics).items()
+    ]
+    return record_rows(rows)
+
+
+def record_rows(rows: Iterable[tuple[str, str, str, str, int, float]]) -> int:
+    """Bulk append (artist, source, entity, metric, ts, value) rows in one transaction."""
+    rows = list(rows)
+    if not rows:
+        return 0
+    try:
+        conn = _conn()
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO samples VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+    except Exception as e:
+        logger.warning("Metrics history write failed: %s", e)
+        return 0
+
+
+def history(artist: str, source: str, metric: str, *, entity: str = "",
+            start: datetime | None = None, end: datetime | None = None,
+            bucket: timedelta | None = None) -> pd.DataFrame:
+    """Return a series as a DataFrame with columns `ts` (UTC datetime) and `value`.
+
+    With `bucket`, keeps the last sample in each bucket (e.g. daily closes from
+    hourly data) so long ranges stay cheap to chart.
+    """
+    params: list[Any] = [artist, source, entity, metric, _to_ts(start or 0), _to_ts(end)]
+    where = "artist = ? AND source = ? AND entity = ? AND metric = ? AND ts BETWEEN ? AND ?"
+    if bucket:
+        # SQLite returns the bare `value` column from the row holding MAX(ts)
+        sql = f"SELECT MAX(ts), value FROM samples WHERE {where} GROUP BY ts / ? ORDER BY 1"
+        params.append(max(1, int(bucket.total_seconds())))
+    else:
+        sql = f"SELECT ts, value FROM samples WHERE {where} ORDER BY ts"
+
+    rows = _conn().execute(sql, params).fetchall()
+    df = pd.DataFrame(rows, columns=["ts", "value"])
+    df["ts"] = pd.to_datetime(df["ts"], unit="s", utc=True)
+    return df
+
+
+def latest(artist: str, source: str, *, entity: str = "") -> dict[str, float]:
+    """Most recent value of every metric recorded for (artist, source, entity)."""
+    rows = _conn().execute(
+        """
+        SELECT metric, value FROM samples AS s
+        WHERE artist = ? AND source = ? AND entity = ?
+          AND ts = (SELECT MAX(ts) FROM samples
+                    WHERE artist = s.artist AND source = s.source
+                      AND entity = s.entity AND metric = s.metric)
+        """,
+        (artist, source, entity),
+    ).fetchall()
+    return dict(rows)
+
+
+def latest_by_entity(source: str, *, artist: str | None = None) -> pd.DataFrame:
+    """Latest value of every entity-level series for `source`, one row per
+    (artist, entity) and one column per metric."""
+    where = "source = ? AND entity != ''" + (" AND artist = ?" if artist else "")
+    rows = _conn().execute(
+        f"""
+        SELECT artist, entity, metric, value FROM samples AS s
+        WHERE {where}
+          AND ts = (SELECT MAX(ts) FROM samples
+                    WHERE artist = s.artist AND source = s.source
+                      AND entity = s.entity AND metric = s.metric)
+        """,
+        (source, artist) if artist else (source,),
+    ).fetchall()
+    df = pd.DataFrame(rows, columns=["artist", "entity", "metric", "value"])
+    return df.pivot(index=["artist", "entity"], columns="metric", values="value").reset_index().rename_axis(columns=None)
+
+
+def delta(artist: str, source: str, metric: str, window: timedelta, *,
+          entity: str = "") -> float | None:
+    """Change in a metric between its latest sample and the last sample at least
+    `window` older. None if there is not enough history yet."""
+    conn = _conn()
+    key = (artist, source, entity, metric)
+    row = conn.execute(
+        "SELECT ts, value FROM samples WHERE artist = ? AND source = ? AND entity = ? AND metric = ? "
+        "ORDER BY ts DESC LIMIT 1",
+        key,
+    ).fetchone()
+    if not row:
+        return None
+    cutoff = row[0] - int(window.total_seconds())
+    prev = conn.execute(
+        "SELECT value FROM samples WHERE artist = ? AND source = ? AND entity = ? AND metric = ? "
+        "AND ts <= ? ORDER BY ts DESC LIMIT 1",
+        (*key, cutoff),
+    ).fetchone()
+    return row[1] - prev[0] if prev else None
@@ -7,39 +7,35 @@ Docs: https://musicbrainz.org/doc/MusicBrainz_API
 from __future__ import annotations
 
 import logging
-import time
 from typing import Any
 
-import requests
 import streamlit as st
 
+from services import transport
+from services.circuit_breaker import CircuitBreaker
+from services.config import get_secret
+from services.rate_limit import SharedRateLimiter
+from services.singleflight import coalesce
+
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://musicbrainz.org/ws/2"
+BASE_URL = get_secret("MUSICBRAINZ_BASE_URL") or "https://musicbrainz.org/ws/2"
 HEADERS = {"User-Agent": "MusicCommandCenter/2.0 (jake@radanimal.co)", "Accept": "application/json"}
 
-# Simple rate limiter
-_last_request_time = 0.0
-
-
-def _rate_limit() -> None:
-    """Enforce 1 request/second rate limit."""
-    global _last_request_time
-    now = time.time()
-    elapsed = now - _last_request_time
-    if elapsed < 1.1:
-        time.sleep(1.1 - elapsed)
-    _last_request_time = time.time()
+# 1 req/s per client IP — shared by every thread and process on this host
+rate_limiter = SharedRateLimiter("musicbrainz", interval=1.1)
+breaker = CircuitBreaker("musicbrainz", probe_url=BASE_URL)
 
 
+@coalesce("musicbrainz")
 def _api_get(endpoint: str, params: dict | None = None) -> dict[str, Any]:
-    """Make GET request to MusicBrainz API."""
-    _rate_limit()
+    """Make GET request to MusicBrainz API (rate limited only when not served from cache)."""
     url = f"{BASE_URL}/{endpoint}"
     base_params = {"fmt": "json"}
     if params:
         base_params.update(params)
-    resp = requests.get(url, params=base_params, headers=HEADERS, timeout=15)
+    resp = transport.get(url, params=base_params, headers=HEADERS, timeout=15, cache_ttl=86400,
+                         throttle=rate_limiter.wait, breaker=breaker)
     resp.raise_for_status()
     return resp.json()
 
@@ -0,0 +1,193 @@
+"""Batch MusicBrainz enrichment for the whole catalog.
+
+Resolves every song in jakke_songs_all.csv and every recording in
+musicteam_catalog.csv to a MusicBrainz recording, with its ISRC and first
+release date. Tracks that already have an ISRC are looked up by ISRC; the rest
+are searched by title and artist. Each outcome (matched / no match / error) is
+written to STORE_DIR/musicbrainz.db as soon as it is known, so a track is never
+looked up twice and an interrupted run resumes where it stopped. Requests go
+through the client's host-wide 1 req/s limiter.
+
+Usage:  python -m services.musicbrainz_enrich [--limit N]
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import threading
+import time
+from typing import Any
+
+import pandas as pd
+import requests
+
+from services.adaptive_rate import RateLimited
+from services.circuit_breaker import CircuitOpenError
+from services.db import connect
+from services.musicbrainz_client import _api_get
+from services.snapshot_store import load_dataset
+
+logger = logging.getLogger(__name__)
+
+MIN_SCORE = 90  # search score (0-100) required to accept a match
+MAX_ATTEMPTS = 3  # transient failures before a track is left alone
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    title        TEXT NOT NULL,
+    artist       TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    mbid         TEXT,
+    isrc         TEXT,
+    release_date TEXT,
+    score        INTEGER,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    looked_up_at REAL NOT NULL,
+    PRIMARY KEY (title, artist)
+);
+"""
+
+
+def _conn():
+    return connect("musicbrainz", _SCHEMA)
+
+
+def catalog_tracks() -> list[tuple[str, str, str]]:
+    """(title, artist, known ISRC or "") for every song and catalog recording."""
+    songs = load_dataset("songs_all")
+    catalog = load_dataset("catalog")
+    recordings = catalog[catalog["Type"] == "Recording"]
+    isrcs = dict(zip(recordings["Title"], recordings["ISRC"].fillna("")))
+
+    tracks: dict[tuple[str, str], str] = {}
+    for title, artist in zip(songs["song"], songs["artist"].astype(str)):
+        tracks[(title, artist)] = isrcs.get(title, "")
+    known_titles = set(songs["song"])
+    for title, artist, isrc in zip(recordings["Title"], recordings["Artist/Project"], recordings["ISRC"].fillna("")):
+        if title not in known_titles:
+            tracks.setdefault((title, str(artist)), isrc)
+    return [(title, artist, isrc) for (title, artist), isrc in tracks.items()]
+
+
+def _pending(tracks: list[tuple[str, str, str]]) -> list[tuple[str, str, str]]:
+    done = {
+        (title, artist)
+        for title, artist in _conn().execute(
+            "SELECT title, artist FROM recordings WHERE status != 'error' OR attempts >= ?", (MAX_ATTEMPTS,)
+        )
+    }
+    return [t for t in tracks if (t[0], t[1]) not in done]
+
+
+def _release_date(rec: dict[str, Any]) -> str:
+    if rec.get("first-release-date"):
+        return rec["first-release-date"]
+    dates = [r.get("date", "") for r in rec.get("releases", []) if r.get("date")]
+    return min(dates, default="")
+
+
+def resolve(title: str, artist: str, isrc: str = "") -> dict[str, Any] | None:
+    """Best MusicBrainz recording for a track, or None if nothing matches well enough."""
+    if isrc:
+        try:
+            recordings = _api_get(f"isrc/{isrc}", {"inc": "releases"}).get("recordings", [])
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+            recordings = []  # ISRC unknown to MusicBrainz — fall back to search
+        if recordings:
+            rec = recordings[0]
+            return {"mbid": rec.get("id", ""), "isrc": isrc, "release_date": _release_date(rec), "score": 100}
+
+    query = f'recording:"{title}" AND artist:"{artist}"'
+    candidates = [
+        r for r in _api_get("recording", {"query": query, "limit": 5}).get("recordings", [])
+        if r.get("score", 0) >= MIN_SCORE
+    ]
+    if not candidates:
+        return None
+    # Prefer a confident match that carries an ISRC
+    rec = max(candidates, key=lambda r: (bool(r.get("isrcs")), r.get("score", 0)))
+    return {
+        "mbid": rec.get("id", ""),
+        "isrc": isrc or (rec.get("isrcs") or [""])[0],
+        "release_date": _release_date(rec),
+        "score": rec.get("score", 0),
+    }
+
+
+def _save(title: str, artist: str, status: str, match: dict[str, Any] | None = None) -> None:
+    match = match or {}
+    conn = _conn()
+    with conn:
+        conn.execute(
+            "INSERT INTO recordings (title, artist, status, mbid, isrc, release_date, score, attempts, looked_up_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?) "
+            "ON CONFLICT (title, artist) DO UPDATE SET status = excluded.status, mbid = excluded.mbid, "
+            "isrc = excluded.isrc, release_date = excluded.release_date, score = excluded.score, "
+            "attempts = attempts + 1, looked_up_at = excluded.looked_up_at",
+            (title, artist, status, match.get("mbid"), match.get("isrc") or None,
+             match.get("release_date") or None, match.get("score"), time.time()),
+        )
+
+
+def run(limit: int | None = None, stop: threading.Event | None = None) -> dict[str, int]:
+    """Enrich every track not yet resolved. Safe to interrupt and re-run.
+
+    Stops early (without recording anything for the current track) if
+    MusicBrainz is unreachable, so an offline run doesn't burn retry attempts.
+    """
+    pending = _pending(catalog_tracks())
+    if limit:
+        pending = pending[:limit]
+    summary = {"pending": len(pending), "matched": 0, "no_match": 0, "error": 0}
+    for title, artist, isrc in pending:
+        if stop is not None and stop.is_set():
+            break
+        try:
+            match = resolve(title, artist, isrc)
+        except (requests.ConnectionError, requests.Timeout, CircuitOpenError, RateLimited) as e:
+            logger.warning("MusicBrainz unreachable or rate limited, stopping enrichment: %s", e)
+            break
+        except Exception as e:
+            logger.warning("MusicBrainz enrichment failed for %s — %s: %s", title, artist, e)
+            _save(title, artist, "error")
+            summary["error"] += 1
+            continue
+        status = "matched" if match else "no_match"
+        _save(title, artist, status, match)
+        summary[status] += 1
+    return summary
+
+
+def start_background() -> threading.Thread:
+    """Run the job once on a daemon thread (the shared limiter keeps it polite)."""
+    thread = threading.Thread(target=run, name="musicbrainz-enrich", daemon=True)
+    thread.start()
+    return thread
+
+
+def fingerprint() -> tuple[int, float]:
+    """(rows, last lookup time) — changes whenever the job records a result."""
+    count, last = _conn().execute("SELECT COUNT(*), COALESCE(MAX(looked_up_at), 0) FROM recordings").fetchone()
+    return count, last
+
+
+def load_results() -> pd.DataFrame:
+    """Matched recordings: title, artist, mbid, isrc, release_date."""
+    return pd.read_sql_query(
+        "SELECT title, artist, mbid, isrc, release_date FROM recordings WHERE status = 'matched'",
+        _conn(),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resolve the catalog against MusicBrainz.")
+    parser.add_argument("--limit", type=int, default=None, help="max tracks to look up this run")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(run(limit=args.limit))
+
+
+if __name__ == "__main__":
+    main()
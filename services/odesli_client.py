@@ -9,14 +9,66 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-import requests
 import streamlit as st
 
+from services import transport
+from services.circuit_breaker import CircuitBreaker
 from services.config import get_secret
+from services.rate_limit import SharedRateLimiter
+from services.singleflight import coalesce
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://api.song.link/v1-alpha.1/links"
+BASE_URL = get_secret("ODESLI_BASE_URL") or "https://api.song.link/v1-alpha.1/links"
+PLATFORM_LABELS = {
+    "spotify": "Spotify",
+    "appleMusic": "Apple Music",
+    "youtube": "YouTube",
+    "youtubeMusic": "YouTube Music",
+    "deezer": "Deezer",
+    "tidal": "Tidal",
+    "amazonMusic": "Amazon Music",
+    "soundcloud": "SoundCloud",
+    "pandora": "Pandora",
+}
+
+# 10 req/min anonymous; keyed access is faster (set the rate your key allows)
+REQUESTS_PER_MINUTE = int(get_secret("ODESLI_REQUESTS_PER_MINUTE") or (60 if get_secret("ODESLI_API_KEY") else 10))
+rate_limiter = SharedRateLimiter("odesli", interval=60 / REQUESTS_PER_MINUTE)
+breaker = CircuitBreaker("odesli", probe_url=BASE_URL)
+
+
+def _params(params: dict[str, str]) -> dict[str, str]:
+    api_key = get_secret("ODESLI_API_KEY")
+    return {**params, "key": api_key} if api_key else params
+
+
+def _labeled_links(data: dict[str, Any]) -> dict[str, str]:
+    links_by_platform = data.get("linksByPlatform", {})
+    result = {
+        label: links_by_platform[key].get("url", "")
+        for key, label in PLATFORM_LABELS.items()
+        if key in links_by_platform
+    }
+    # Also include the page URL (universal link page)
+    result["Universal Link"] = data.get("pageUrl", "")
+    return result
+
+
+@coalesce("odesli")
+def fetch_links(url: str) -> dict[str, str] | None:
+    """Links for a platform track URL (uncached, rate limited).
+
+    Odesli's `id` parameter takes a platform's own track ID, not an ISRC, so
+    callers map ISRCs to a Spotify URL first (services.spotify_crawler.track_urls).
+    None when Odesli doesn't know the track; raises on other API errors.
+    """
+    resp = transport.get(BASE_URL, params=_params({"url": url}), timeout=15, cache_ttl=86400,
+                         throttle=rate_limiter.wait, breaker=breaker)
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    return _labeled_links(resp.json())
 
 
 @st.cache_data(ttl=86400)
@@ -28,39 +80,11 @@ def get_universal_links(url: str) -> dict[str, Any] | None:
     if not url:
         return None
 
-    params: dict[str, str] = {"url": url}
-    api_key = get_secret("ODESLI_API_KEY")
-    if api_key:
-        params["key"] = api_key
-
     try:
-        resp = requests.get(BASE_URL, params=params, timeout=15)
+        resp = transport.get(BASE_URL, params=_params({"url": url}), timeout=15, cache_ttl=86400,
+                             throttle=rate_limiter.wait, breaker=breaker)
         resp.raise_for_status()
-        data = resp.json()
-
-        # Extract platform links
-        links_by_platform = data.get("linksByPlatform", {})
-        result: dict[str, str] = {}
-        platform_map = {
-            "spotify": "Spotify",
-            "appleMusic": "Apple Music",
-            "youtube": "YouTube",
-            "youtubeMusic": "YouTube Music",
-            "deezer": "Deezer",
-            "tidal": "Tidal",
-            "amazonMusic": "Amazon Music",
-            "soundcloud": "SoundCloud",
-            "pandora": "Pandora",
-        }
-
-        for key, label in platform_map.items():
-            if key in links_by_platform:
-                result[label] = links_by_platform[key].get("url", "")
-
-        # Also include the page URL (universal link page)
-        result["Universal Link"] = data.get("pageUrl", "")
-
-        return result
+        return _labeled_links(resp.json())
     except Exception as e:
         logger.warning("Odesli lookup failed for %s: %s", url, e)
         return None
@@ -74,13 +98,11 @@ def get_links_by_isrc(isrc: str) -> dict[str, Any] | None:
 
     # Odesli doesn't directly support ISRC, but we can construct a Spotify search URL
     # For now, use the entity lookup approach
-    params: dict[str, str] = {"platform": "spotify", "type": "song", "id": isrc}
-    api_key = get_secret("ODESLI_API_KEY")
-    if api_key:
-        params["key"] = api_key
+    params = _params({"platform": "spotify", "type": "song", "id": isrc})
 
     try:
-        resp = requests.get(BASE_URL, params=params, timeout=15)
+        resp = transport.get(BASE_URL, params=params, timeout=15, cache_ttl=86400,
+                             throttle=rate_limiter.wait, breaker=breaker)
         if resp.status_code == 404:
             return None
         resp.raise_for_status()
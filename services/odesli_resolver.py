@@ -0,0 +1,223 @@
+"""Background bulk resolver for Odesli "listen on" links.
+
+Targets (ISRCs or Spotify track URLs) are queued in STORE_DIR/odesli.db and a
+single worker thread drains the queue through the client's host-wide limiter
+(10 req/min anonymous, faster with ODESLI_API_KEY). Odesli looks tracks up by
+platform URL, so an ISRC is only queued once the Spotify crawler
+(services.spotify_crawler) has stored a track URL for it. Resolved links stay in the
+same table, so views read them with one primary-key lookup and no network
+call. The queue is persistent: anything not resolved when the process exits is
+picked up by the next one.
+
+Usage:  python -m services.odesli_resolver [TARGET ...]   (default: whole catalog)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import threading
+import time
+from typing import Iterable
+
+import requests
+
+from services.adaptive_rate import RateLimited
+from services.circuit_breaker import CircuitOpenError
+from services.db import connect
+from services.odesli_client import fetch_links
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+CLAIM_TIMEOUT = 300  # seconds before another process may take over a claimed target
+BACKOFF = 60  # seconds to pause after a 429 or a network failure
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    target      TEXT PRIMARY KEY,
+    status      TEXT NOT NULL DEFAULT 'pending',
+    links       TEXT,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    queued_at   REAL NOT NULL,
+    claimed_at  REAL,
+    resolved_at REAL
+);
+CREATE INDEX IF NOT EXISTS links_pending ON links (status, queued_at);
+"""
+
+
+def _conn():
+    return connect("odesli", _SCHEMA)
+
+
+def get_links(target: str) -> dict[str, str] | None:
+    """Stored links for an ISRC or Spotify URL; None if not (yet) resolved."""
+    if not target or target == "—":
+        return None
+    row = _conn().execute(
+        "SELECT links FROM links WHERE target = ? AND status = 'resolved'", (target,)
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def status_counts() -> dict[str, int]:
+    return dict(_conn().execute("SELECT status, COUNT(*) FROM links GROUP BY status").fetchall())
+
+
+def _is_url(target: str) -> bool:
+    return target.startswith(("http://", "https://"))
+
+
+def spotify_urls(targets: Iterable[str]) -> dict[str, str]:
+    """{target: Spotify URL to look up} for URL targets and ISRCs the crawler has mapped."""
+    from services.spotify_crawler import track_urls
+
+    targets = [t for t in targets if t and t != "—"]
+    urls = {t: t for t in targets if _is_url(t)}
+    urls.update(track_urls(t for t in targets if not _is_url(t)))
+    return urls
+
+
+def catalog_targets() -> list[str]:
+    """ISRCs of every catalog recording plus those filled in by MusicBrainz."""
+    from services.musicbrainz_enrich import load_results
+    from services.snapshot_store import load_dataset
+
+    catalog = load_dataset("catalog")
+    isrcs = set(catalog.loc[catalog["Type"] == "Recording", "ISRC"].dropna())
+    isrcs.update(load_results()["isrc"].dropna())
+    return sorted(isrcs)
+
+
+class BulkResolver:
+    """Persistent work queue plus one worker thread."""
+
+    def __init__(self) -> None:
+        self._wake = threading.Event()
+        self._queued: set[str] = set()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, targets: Iterable[str]) -> int:
+        """Queue targets not seen before (cheap to call on every rerun). Returns rows added.
+
+        ISRCs without a crawled Spotify URL are skipped (and reconsidered on the
+        next call), since Odesli can't look them up.
+        """
+        with self._lock:
+            unseen = [t for t in targets if t and t != "—" and t not in self._queued]
+        new = list(spotify_urls(unseen))
+        with self._lock:
+            self._queued.update(new)
+        if not new:
+            return 0
+        conn = _conn()
+        with conn:
+            cur = conn.executemany(
+                "INSERT OR IGNORE INTO links (target, queued_at) VALUES (?, ?)",
+                [(t, time.time()) for t in new],
+            )
+        self._wake.set()
+        return cur.rowcount
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="odesli-resolver", daemon=True)
+                self._thread.start()
+
+    def drain(self) -> dict[str, int]:
+        """Resolve everything pending in the calling thread (used by the CLI)."""
+        summary = {"resolved": 0, "not_found": 0, "error": 0}
+        while (target := self._claim()) is not None:
+            outcome = self._resolve(target)
+            if outcome == "backoff":
+                time.sleep(BACKOFF)
+            else:
+                summary[outcome] += 1
+        return summary
+
+    def _run(self) -> None:
+        while True:
+            target = self._claim()
+            if target is None:
+                self._wake.wait(timeout=600)
+                self._wake.clear()
+                continue
+            if self._resolve(target) == "backoff":
+                time.sleep(BACKOFF)
+
+    def _claim(self) -> str | None:
+        """Take the oldest pending target, unless another process holds it.
+
+        Picking and claiming are one UPDATE statement, which SQLite runs under
+        its write lock, so two processes can't claim the same target.
+        """
+        conn = _conn()
+        now = time.time()
+        with conn:
+            row = conn.execute(
+                "UPDATE links SET claimed_at = ? WHERE target = ("
+                "SELECT target FROM links WHERE status IN ('pending', 'error') AND attempts < ? "
+                "AND (claimed_at IS NULL OR claimed_at < ?) ORDER BY queued_at LIMIT 1"
+                ") RETURNING target",
+                (now, MAX_ATTEMPTS, now - CLAIM_TIMEOUT),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _resolve(self, target: str) -> str:
+        url = spotify_urls([target]).get(target)
+        if url is None:
+            return self._finish(target, "error", None, LookupError("no Spotify URL for this ISRC"))
+        try:
+            links = fetch_links(url)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 429:
+                logger.info("Odesli rate limited, backing off %ss", BACKOFF)
+                self._release(target)
+                return "backoff"
+            return self._finish(target, "error", None, e)
+        except RateLimited as e:
+            logger.info("Odesli rate limited, backing off %ss: %s", BACKOFF, e)
+            self._release(target)
+            return "backoff"
+        except (requests.ConnectionError, requests.Timeout, CircuitOpenError) as e:
+            logger.warning("Odesli unreachable, backing off %ss: %s", BACKOFF, e)
+            self._release(target)
+            return "backoff"
+        except Exception as e:
+            return self._finish(target, "error", None, e)
+        return self._finish(target, "resolved" if links else "not_found", links)
+
+    def _release(self, target: str) -> None:
+        conn = _conn()
+        with conn:
+            conn.execute("UPDATE links SET claimed_at = NULL WHERE target = ?", (target,))
+
+    def _finish(self, target: str, status: str, links: dict | None, error: Exception | None = None) -> str:
+        if error is not None:
+            logger.warning("Odesli lookup failed for %s: %s", target, error)
+        conn = _conn()
+        with conn:
+            conn.execute(
+                "UPDATE links SET status = ?, links = ?, attempts = attempts + 1, claimed_at = NULL, "
+                "resolved_at = ? WHERE target = ?",
+                (status, json.dumps(links) if links else None, time.time(), target),
+            )
+        return status
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resolve Odesli links for the catalog (or given targets).")
+    parser.add_argument("targets", nargs="*", help="ISRCs or Spotify track URLs")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    resolver = BulkResolver()
+    print(f"queued {resolver.enqueue(args.targets or catalog_targets())} new target(s)")
+    print(resolver.drain())
+    print(status_counts())
+
+
+if __name__ == "__main__":
+    main()
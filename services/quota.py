@@ -0,0 +1,151 @@
+"""Persistent quota ledger and request budgeter for quota-limited APIs.
+
+Hits are counted per (service, billing period, endpoint) in STORE_DIR/quota.db,
+so every process and restart on the host shares one ledger. With `spread`
+enabled the budgeter releases the allowance evenly over the billing period
+(plus a small burst), instead of letting a busy day burn the whole month.
+Callers that exceed the budget get QuotaExhausted; the transport turns that
+into the last cached response when one exists.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Iterator
+
+from services.db import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota_hits (
+    service  TEXT NOT NULL,
+    period   TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    hits     INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (service, period, endpoint)
+);
+"""
+
+
+class QuotaExhausted(Exception):
+    """Raised when a request would exceed the service's budget."""
+
+
+def _conn():
+    return connect("quota", _SCHEMA)
+
+
+class QuotaBudget:
+    """Budget of `limit` units per calendar month or day.
+
+    Args:
+        service: Ledger key, e.g. "songstats".
+        limit: Units available per period.
+        period: "month" or "day".
+        concurrency: Max in-flight requests per process (None = unlimited).
+        spread: Release the allowance linearly over the period.
+        burst: Units available up front when spreading (default 2% of limit).
+        tz: Timezone in which the period resets (default UTC).
+    """
+
+    def __init__(self, service: str, limit: int, *, period: str = "month",
+                 concurrency: int | None = None, spread: bool = True,
+                 burst: int | None = None, tz: tzinfo = timezone.utc) -> None:
+        self.service = service
+        self.limit = limit
+        self.period = period
+        self.spread = spread
+        self.burst = burst if burst is not None else max(1, math.ceil(limit * 0.02))
+        self.tz = tz
+        self._slots = threading.BoundedSemaphore(concurrency) if concurrency else None
+
+    # -- period arithmetic --------------------------------------------------
+
+    def _bounds(self, now: datetime | None = None) -> tuple[str, datetime, datetime]:
+        now = (now or datetime.now(timezone.utc)).astimezone(self.tz)
+        if self.period == "day":
+            start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            return start.strftime("%Y-%m-%d"), start, start + timedelta(days=1)
+        start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        end = (start + timedelta(days=32)).replace(day=1)
+        return start.strftime("%Y-%m"), start, end
+
+    def allowance(self, now: datetime | None = None) -> int:
+        """Units usable so far in the current period."""
+        if not self.spread:
+            return self.limit
+        _, start, end = self._bounds(now)
+        now = (now or datetime.now(timezone.utc)).astimezone(self.tz)
+        elapsed = (now - start) / (end - start)
+        return min(self.limit, math.floor(self.limit * elapsed) + self.burst)
+
+    # -- ledger ---------------------------------------------------------------
+
+    def used(self) -> int:
+        key, _, _ = self._bounds()
+        row = _conn().execute(
+            "SELECT COALESCE(SUM(hits), 0) FROM quota_hits WHERE service = ? AND period = ?",
+            (self.service, key),
+        ).fetchone()
+        return row[0]
+
+    def usage_by_endpoint(self) -> dict[str, int]:
+        key, _, _ = self._bounds()
+        rows = _conn().execute(
+            "SELECT endpoint, hits FROM quota_hits WHERE service = ? AND period = ? ORDER BY hits DESC",
+            (self.service, key),
+        ).fetchall()
+        return dict(rows)
+
+    def spend(self, endpoint: str, cost: int = 1) -> None:
+        """Record `cost` units against the budget, or raise QuotaExhausted.
+
+        The check and increment run in one IMMEDIATE transaction, so concurrent
+        processes cannot overspend.
+        """
+        key, _, _ = self._bounds()
+        conn = _conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            used = conn.execute(
+                "SELECT COALESCE(SUM(hits), 0) FROM quota_hits WHERE service = ? AND period = ?",
+                (self.service, key),
+            ).fetchone()[0]
+            allowed = self.allowance()
+            if used + cost > allowed:
+                raise QuotaExhausted(
+                    f"{self.service} budget exhausted ({used}/{self.limit} used, {allowed} released so far)"
+                )
+            conn.execute(
+                "INSERT INTO quota_hits (service, period, endpoint, hits) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (service, period, endpoint) DO UPDATE SET hits = hits + excluded.hits",
+                (self.service, key, endpoint, cost),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one of the per-process concurrency slots for the duration of a request."""
+        if self._slots is None:
+            yield
+            return
+        with self._slots:
+            yield
+
+    def status(self) -> dict:
+        """Snapshot for display: used, remaining, released allowance and reset time."""
+        _, _, end = self._bounds()
+        used = self.used()
+        return {
+            "service": self.service,
+            "limit": self.limit,
+            "used": used,
+            "remaining": max(0, self.limit - used),
+            "available_now": max(0, self.allowance() - used),
+            "resets_at": end,
+            "by_endpoint": self.usage_by_endpoint(),
+        }
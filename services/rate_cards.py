@@ -0,0 +1,172 @@
+"""Per-territory, per-tier rate cards as a dense indexed table.
+
+data/rate_cards.csv holds one per-stream rate per (platform, territory, tier,
+effective_from). It is compiled into a 4-D float array indexed by
+(platform, territory, tier, period), with one pd.Index per key axis. A batch of
+rows is priced by turning each key column into integer codes (hashing only the
+distinct values when the column is categorical), finding the period with
+np.searchsorted and reading the rates with one fancy-indexing gather, so
+millions of (track, territory, platform) rows never go through a Python dict.
+
+Gaps are filled when the table is built, in this order:
+
+- a rate stays in force until a later effective_from replaces it;
+- territories without a card use the platform's "ROW" (rest of world) card
+  for the same tier.
+
+Whatever is still missing is a tier or territory the platform doesn't offer
+(Apple Music and Tidal have no free tier, Pandora is US-only) and stays NaN
+rather than borrowing another platform's rate. Platform names the table
+doesn't know at all are priced with the "Other" card. Dates before a card's
+first effective_from use that first card. Tiers are "premium" and "free"
+(ad-supported).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from services.revenue_estimator import PLATFORM_SPLIT, RATES, RevenueMatrix, estimate_revenue_batch
+
+REST_OF_WORLD = "ROW"
+OTHER_PLATFORM = "Other"
+DEFAULT_TIER = "premium"
+
+
+@dataclass
+class RateCardTable:
+    """Dense rate lookup: rates[platform, territory, tier, period]."""
+    platforms: pd.Index
+    territories: pd.Index
+    tiers: pd.Index
+    periods: np.ndarray  # sorted effective_from dates (datetime64[ns])
+    rates: np.ndarray  # float64, NaN where the platform doesn't offer the tier/territory
+
+    @classmethod
+    def from_frame(cls, cards: pd.DataFrame) -> "RateCardTable":
+        """Build from rows of platform, territory, tier, effective_from, rate."""
+        platforms = pd.Index(sorted(set(cards["platform"].astype(str)) | {OTHER_PLATFORM}))
+        territories = pd.Index(sorted(set(cards["territory"].astype(str)) | {REST_OF_WORLD}))
+        tiers = pd.Index(sorted(cards["tier"].astype(str).unique()))
+        dates = pd.to_datetime(cards["effective_from"])
+        periods = np.sort(dates.unique().to_numpy())
+
+        rates = np.full((len(platforms), len(territories), len(tiers), len(periods)), np.nan)
+        rates[
+            platforms.get_indexer(cards["platform"].astype(str)),
+            territories.get_indexer(cards["territory"].astype(str)),
+            tiers.get_indexer(cards["tier"].astype(str)),
+            np.searchsorted(periods, dates.to_numpy()),
+        ] = cards["rate"].to_numpy(dtype=np.float64)
+
+        # Carry each rate forward until it is replaced
+        for d in range(1, len(periods)):
+            rates[..., d] = np.where(np.isnan(rates[..., d]), rates[..., d - 1], rates[..., d])
+        row = territories.get_loc(REST_OF_WORLD)
+        rates = np.where(np.isnan(rates), rates[:, row:row + 1], rates)
+        return cls(platforms, territories, tiers, periods, rates)
+
+    @staticmethod
+    def _codes(values, index: pd.Index, fallback: str | None, n: int) -> np.ndarray:
+        """Positions of `values` (scalar or n values) in `index`; unknown ones map to `fallback`.
+
+        Only distinct values are looked up: categorical columns use their
+        categories directly, anything else is factorized first.
+        """
+        if np.ndim(values) == 0:
+            cat = pd.Categorical([values])
+            scalar = True
+        else:
+            cat = values.array if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype) \
+                else pd.Categorical(values)
+            scalar = False
+        codes = index.get_indexer(cat.categories.astype(str))[cat.codes]
+        codes[cat.codes < 0] = -1
+        unknown = codes < 0
+        if unknown.any():
+            if fallback is None:
+                missing = sorted(set(np.asarray(cat, dtype=object)[unknown].astype(str)))
+                raise KeyError(f"No rate cards for {missing[:5]}")
+            codes[unknown] = index.get_loc(fallback)
+        return np.full(n, codes[0]) if scalar else codes
+
+    def lookup(self, platform, territory, tier=DEFAULT_TIER, date=None) -> np.ndarray:
+        """Per-stream rates for aligned arrays/Series of keys; scalars broadcast.
+
+        `date` defaults to today. Unknown territories use ROW and unknown
+        platforms Other; an unknown tier raises KeyError. NaN where the
+        platform doesn't offer the tier or territory.
+        """
+        n = max((len(k) for k in (platform, territory, tier, date) if np.ndim(k)), default=1)
+        p = self._codes(platform, self.platforms, OTHER_PLATFORM, n)
+        t = self._codes(territory, self.territories, REST_OF_WORLD, n)
+        k = self._codes(tier, self.tiers, None, n)
+        return self.rates[p, t, k, self._period_codes(date, n)]
+
+    def platform_rates(self, platforms: list[str], territory, tier=DEFAULT_TIER, date=None) -> np.ndarray:
+        """(rows, platforms) rates: every platform for each territory/tier/date row."""
+        n = max((len(k) for k in (territory, tier, date) if np.ndim(k)), default=1)
+        p = self._codes(platforms, self.platforms, OTHER_PLATFORM, len(platforms))
+        t = self._codes(territory, self.territories, REST_OF_WORLD, n)
+        k = self._codes(tier, self.tiers, None, n)
+        d = self._period_codes(date, n)
+        return self.rates[p[None, :], t[:, None], k[:, None], d[:, None]]
+
+    def _period_codes(self, date, n: int) -> np.ndarray:
+        """Index of the card period in force on each date (today if None)."""
+        if date is None or np.ndim(date) == 0:
+            when = (pd.Timestamp.now().normalize() if date is None else pd.Timestamp(date)).to_datetime64()
+            d = np.full(n, np.searchsorted(self.periods, when, side="right") - 1)
+        else:
+            d = np.searchsorted(self.periods, pd.to_datetime(date).to_numpy(), side="right") - 1
+        return np.clip(d, 0, len(self.periods) - 1)
+
+    def rates_for(self, territory: str = REST_OF_WORLD, tier: str = DEFAULT_TIER, date=None) -> dict[str, float]:
+        """{platform: rate} for one territory/tier/date — a drop-in for RATES."""
+        platforms = [p for p in RATES if p in self.platforms]
+        return dict(zip(platforms, self.lookup(platforms, territory, tier, date).tolist()))
+
+    def matrix(self, tier: str = DEFAULT_TIER, date=None) -> pd.DataFrame:
+        """Rates in force on `date` as a territories x platforms table (NaN where not offered)."""
+        d = self._period_codes(date, 1)[0]
+        return pd.DataFrame(self.rates[:, :, self.tiers.get_loc(tier), d].T,
+                            index=self.territories, columns=self.platforms)
+
+
+def price_streams(streams: pd.DataFrame, table: RateCardTable) -> pd.DataFrame:
+    """Add `rate` and `revenue` columns to per-territory stream rows.
+
+    `streams` needs platform, territory and streams columns, and optionally tier
+    (default premium) and date (default today). Streams are truncated to whole
+    numbers as in estimate_revenue. Rows for a tier or territory the platform
+    doesn't offer get NaN rate and revenue.
+    """
+    rate = table.lookup(
+        streams["platform"],
+        streams["territory"],
+        streams["tier"] if "tier" in streams else DEFAULT_TIER,
+        streams["date"] if "date" in streams else None,
+    )
+    return streams.assign(rate=rate, revenue=np.trunc(streams["streams"].to_numpy(dtype=np.float64)) * rate)
+
+
+def estimate_by_territory(streams: pd.DataFrame, table: RateCardTable,
+                          platform_split: dict[str, float] | None = None) -> RevenueMatrix:
+    """Revenue for total streams broken down by territory (one row per track x territory).
+
+    `streams` needs territory and streams (cross-platform total) columns, and
+    optionally tier and date. Each row is split across platforms as in
+    estimate_revenue_batch and priced with its territory's rate cards; a
+    platform share the territory/tier isn't offered on earns nothing.
+    """
+    split = platform_split or PLATFORM_SPLIT
+    rates = table.platform_rates(
+        list(split),
+        streams["territory"],
+        streams["tier"] if "tier" in streams else DEFAULT_TIER,
+        streams["date"] if "date" in streams else None,
+    )
+    return estimate_revenue_batch(streams["streams"], split, rates=np.nan_to_num(rates, nan=0.0))
+
@@ -0,0 +1,64 @@
+"""Cross-process rate limiter for upstreams with a fixed request rate.
+
+Uses GCRA (generic cell rate algorithm): each limiter stores one "theoretical
+arrival time" in STORE_DIR/rate_limits.db. A caller reserves the next slot in
+a single IMMEDIATE transaction and then sleeps until its slot, so threads,
+Streamlit workers and batch jobs on one host share the budget without
+bursting past it, and no lock is held while sleeping.
+"""
+from __future__ import annotations
+
+import time
+
+from services.db import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS limits (
+    name TEXT PRIMARY KEY,
+    tat  REAL NOT NULL
+);
+"""
+
+
+def _conn():
+    return connect("rate_limits", _SCHEMA)
+
+
+class SharedRateLimiter:
+    """Allow one request per `interval` seconds for `name`, host-wide.
+
+    Args:
+        name: Limiter key shared by every process, e.g. "musicbrainz".
+        interval: Minimum spacing between requests, in seconds.
+        burst: Requests allowed back-to-back after an idle period.
+    """
+
+    def __init__(self, name: str, interval: float, burst: int = 1) -> None:
+        self.name = name
+        self.interval = interval
+        self.tolerance = interval * (burst - 1)
+
+    def reserve(self) -> float:
+        """Claim the next slot and return how long to wait for it (seconds)."""
+        conn = _conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute("SELECT tat FROM limits WHERE name = ?", (self.name,)).fetchone()
+            tat = max(row[0] if row else now, now)
+            start = max(now, tat - self.tolerance)
+            conn.execute(
+                "INSERT OR REPLACE INTO limits (name, tat) VALUES (?, ?)",
+                (self.name, tat + self.interval),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return start - now
+
+    def wait(self) -> None:
+        """Block until this caller may send its request."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
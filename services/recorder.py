@@ -0,0 +1,126 @@
+"""Record upstream responses as replayable fixtures.
+
+With HTTP_RECORD_DIR set, every response received by the shared transport
+session (and by the Spotify client's own sessions) is written to
+HTTP_RECORD_DIR/<host>/<key>.json, where the key is the method, host, path and
+query/form parameters with credentials removed. benchmarks.stub_server replays
+the fixtures offline.
+
+Credentials are stripped before anything touches disk: secret parameters are
+left out of the key and the stored request, every secret value seen in the
+request is replaced with "REDACTED" in the body, and token fields in JSON
+bodies are blanked. Responses are recorded only when they come from the
+network, so record against an empty store (DATA_STORE_DIR) to capture
+everything; 304s are skipped so they don't overwrite the full response.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+SECRET_PARAMS = {"access_token", "api_key", "key", "client_id", "client_secret", "appsecret_proof"}
+SECRET_HEADERS = {"authorization", "x-rapidapi-key"}
+SECRET_FIELDS = {"access_token", "refresh_token"}  # blanked in recorded JSON bodies
+REDACTED = "REDACTED"
+# Hop-by-hop or re-computed on replay
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection",
+                 "set-cookie", "date", "keep-alive"}
+
+_write_lock = threading.Lock()
+
+
+def request_key(method: str, host: str, path: str, params: Iterable[tuple[str, str]]) -> str:
+    """Stable fixture key for a request, ignoring credentials and parameter order."""
+    kept = sorted((k, v) for k, v in params if k not in SECRET_PARAMS)
+    raw = f"{method.upper()} {host}{path}?{urlencode(kept)}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def _request_params(req: requests.PreparedRequest) -> list[tuple[str, str]]:
+    params = parse_qsl(urlsplit(req.url).query, keep_blank_values=True)
+    if req.body and "x-www-form-urlencoded" in req.headers.get("Content-Type", ""):
+        body = req.body.decode() if isinstance(req.body, bytes) else req.body
+        params += parse_qsl(body, keep_blank_values=True)
+    return params
+
+
+def _redact(text: str, secrets: set[str]) -> str:
+    for secret in sorted(secrets, key=len, reverse=True):
+        text = text.replace(secret, REDACTED)
+    try:
+        body = json.loads(text)
+    except ValueError:
+        return text
+    if isinstance(body, dict) and SECRET_FIELDS & body.keys():
+        body.update({k: REDACTED for k in SECRET_FIELDS & body.keys()})
+        return json.dumps(body)
+    return text
+
+
+def record(resp: requests.Response, directory: Path) -> Path | None:
+    """Write one response as a fixture. Returns the path, or None if skipped."""
+    if resp.status_code == 304:
+        return None
+    req = resp.request
+    parts = urlsplit(req.url)
+    params = _request_params(req)
+    secrets = {v for k, v in params if k in SECRET_PARAMS and len(v) > 3}
+    secrets |= {v.split()[-1] for k, v in req.headers.items() if k.lower() in SECRET_HEADERS and v}
+
+    fixture: dict[str, Any] = {
+        "request": {
+            "method": req.method,
+            "host": parts.netloc,
+            "path": parts.path,
+            "params": [[k, v] for k, v in params if k not in SECRET_PARAMS],
+        },
+        "response": {
+            "status": resp.status_code,
+            "headers": {k: v for k, v in resp.headers.items() if k.lower() not in _DROP_HEADERS},
+        },
+    }
+    try:
+        fixture["response"]["body"] = _redact(resp.content.decode("utf-8"), secrets)
+    except UnicodeDecodeError:
+        fixture["response"]["body_b64"] = base64.b64encode(resp.content).decode()
+
+    key = request_key(req.method, parts.netloc, parts.path, params)
+    path = directory / re.sub(r"[^\w.-]", "_", parts.netloc) / f"{key}.json"
+    with _write_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(fixture, indent=1))
+    return path
+
+
+def attach(session: requests.Session, directory: str | Path) -> None:
+    """Record every response `session` receives into `directory`."""
+    directory = Path(directory)
+
+    def hook(resp: requests.Response, *args: Any, **kwargs: Any) -> None:
+        try:
+            record(resp, directory)
+        except Exception as e:  # recording must never break a real request
+            logger.warning("Could not record %s: %s", resp.url, e)
+
+    session.hooks["response"].append(hook)
+    logger.info("Recording upstream responses to %s", directory)
+
+
+def load(directory: str | Path) -> dict[str, dict[str, Any]]:
+    """All fixtures under `directory`, keyed by request_key."""
+    fixtures = {}
+    for path in Path(directory).glob("*/*.json"):
+        fixture = json.loads(path.read_text())
+        fixtures[path.stem] = fixture
+    return fixtures
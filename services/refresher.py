@@ -0,0 +1,144 @@
+"""Stale-while-revalidate refresher for API-backed datasets.
+
+Readers get the last good value immediately — never waiting on upstream HTTP.
+A daemon thread refreshes each registered dataset on its own interval and
+swaps in the new value when a fetch succeeds. Last good values are persisted
+under STORE_DIR so a fresh process (or another replica) starts from the most
+recent live data rather than the static fallback.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from services.config import STORE_DIR
+
+logger = logging.getLogger(__name__)
+
+LAST_GOOD_DIR = STORE_DIR / "last_good"
+RETRY_AFTER_FAILURE = 300  # seconds before retrying a failed refresh
+
+
+@dataclass
+class _Dataset:
+    name: str
+    fetch: Callable[[], Any]  # live value, or None when the source is not configured
+    fallback: Callable[[], Any]
+    interval: float
+    value: Any = None
+    refreshed_at: float | None = None  # when `value` was fetched live; None = fallback
+    next_at: float = 0.0
+    in_flight: bool = False
+
+
+class BackgroundRefresher:
+    """Serves cached values and refreshes them ahead of expiry on a background thread."""
+
+    def __init__(self, workers: int = 2) -> None:
+        self._datasets: dict[str, _Dataset] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="refresher")
+        self._thread: threading.Thread | None = None
+
+    def register(self, name: str, fetch: Callable[[], Any], fallback: Callable[[], Any],
+                 interval: float = 3600) -> None:
+        """Register a dataset. `fetch` runs only on the background thread."""
+        ds = _Dataset(name=name, fetch=fetch, fallback=fallback, interval=interval)
+        persisted = _read_last_good(name)
+        if persisted is not None:
+            ds.value, ds.refreshed_at = persisted
+            ds.next_at = ds.refreshed_at + interval
+        with self._lock:
+            self._datasets[name] = ds
+        self._ensure_running()
+
+    def get(self, name: str) -> tuple[Any, float | None]:
+        """Return (value, refreshed_at) without blocking on the network.
+
+        Until the first live refresh completes, the value is the static fallback
+        and refreshed_at is None.
+        """
+        ds = self._datasets[name]
+        if ds.value is None:
+            with self._lock:
+                if ds.value is None:
+                    ds.value = ds.fallback()
+        return ds.value, ds.refreshed_at
+
+    def refresh_now(self, name: str) -> None:
+        """Schedule an immediate background refresh."""
+        with self._lock:
+            self._datasets[name].next_at = 0.0
+        self._wake.set()
+
+    def _ensure_running(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="refresher-scheduler", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            now = time.time()
+            with self._lock:
+                due = [ds for ds in self._datasets.values() if not ds.in_flight and ds.next_at <= now]
+                for ds in due:
+                    ds.in_flight = True
+                pending = [ds.next_at for ds in self._datasets.values() if not ds.in_flight]
+            for ds in due:
+                self._pool.submit(self._refresh, ds)
+            wait = min(pending, default=now + 60) - now
+            self._wake.wait(timeout=max(1.0, wait))
+            self._wake.clear()
+
+    def _refresh(self, ds: _Dataset) -> None:
+        start = time.time()
+        try:
+            value = ds.fetch()
+        except Exception as e:
+            logger.warning("Background refresh of %s failed, serving last good value: %s", ds.name, e)
+            value = None
+            retry = min(ds.interval, RETRY_AFTER_FAILURE)
+        else:
+            retry = ds.interval
+        with self._lock:
+            if value is not None:
+                ds.value, ds.refreshed_at = value, start
+            ds.next_at = start + retry
+            ds.in_flight = False
+        if value is not None:
+            _write_last_good(ds.name, value, start)
+            logger.info("Refreshed %s in %.2fs", ds.name, time.time() - start)
+        self._wake.set()
+
+
+def _read_last_good(name: str) -> tuple[Any, float] | None:
+    path = LAST_GOOD_DIR / f"{name}.json"
+    try:
+        with open(path) as f:
+            payload = json.load(f)
+        return payload["value"], payload["refreshed_at"]
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable last-good value for %s: %s", name, e)
+        return None
+
+
+def _write_last_good(name: str, value: Any, refreshed_at: float) -> None:
+    path = LAST_GOOD_DIR / f"{name}.json"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"value": value, "refreshed_at": refreshed_at}, f)
+        os.replace(tmp, path)
+    except Exception as e:
+        logger.warning("Could not persist last-good value for %s: %s", name, e)
@@ -2,10 +2,16 @@
 
 Uses per-stream rates to estimate revenue across platforms.
 Rates are industry averages for independent artists (2025-2026).
+`estimate_revenue` handles one stream count; `estimate_revenue_batch` handles
+whole catalogs as NumPy arrays and gives identical numbers.
 """
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
 
 # Per-stream rates (USD) — industry averages for indie artists
 RATES = {
@@ -79,51 +85,108 @@ def estimate_revenue(total_streams: int, platform_split: dict[str, float] | None
     )
 
 
-# ---------------------------------------------------------------------------
-# Writer splits — default assumptions based on catalog data
-# Jake can manually adjust these percentages later.
-# Key: exact song name. Value: Jake Goble's ownership share (0.0–1.0).
-# ---------------------------------------------------------------------------
-JAKE_SPLITS: dict[str, float] = {
-    # Allen Blickle co-writes (50/50)
-    "Your Love's Not Wasted": 0.50,
-    "Sugar Tide": 0.50,
-    "Brick by Brick": 0.50,
-    "Delicate": 0.50,
-    "Drink You Slowly": 0.50,
-    "Late Night": 0.50,
-    "Hurricane": 0.50,
-    # Jake Goble + Trevor Coulter (50/50)
-    "Adriatic": 0.50,
-    "Whisper Of The Void": 0.50,
-    # Collaborator featured — Jake is primary writer (100%)
-    "Peace Of Mind": 1.0,       # Somelee = featured artist
-    "Karma Response": 1.0,      # Nuage = featured artist
-    "Waves": 1.0,               # Enjune = Jake's project
-    "Without Peace": 1.0,
-    "WAIT": 1.0,
-    "Shallow Mold": 1.0,        # matty co. = featured
-    "HOW DO YOU LOVE": 1.0,     # TÂCHES = featured
-    # Solo / self-released
-    "Waves (Acoustic)": 1.0,
-    "Burn": 1.0,
-    "Burn Me Up": 1.0,          # Enjune = Jake's project
-    "Release": 1.0,
-    "Father World (Mama Earth)": 1.0,
-    "Take Me With You": 1.0,
-    # Remixes — standard arrangement: Jake keeps master share (100%)
-    "Sugar Tide (Club Mix)": 1.0,
-    "Sugar Tide (Lofi Remix)": 1.0,
-    "Sugar Tide (Remix)": 1.0,
-    "Release (TRØVES Remix)": 1.0,
-    "Release (Curt Reynolds Remix)": 1.0,
-    "Burn Me Up (Jako Diaz Remix)": 1.0,
-}
+@dataclass
+class RevenueMatrix:
+    """Revenue estimates for many tracks: one row per track, one column per platform."""
+    platforms: list[str]
+    total_streams: np.ndarray  # (tracks,)
+    shares: np.ndarray  # (tracks, platforms)
+    rates: np.ndarray  # (platforms,), or (tracks, platforms) for per-track rate cards
+    streams: np.ndarray  # (tracks, platforms), truncated like int(total * share)
+    revenue: np.ndarray  # (tracks, platforms)
+    estimated_revenue: np.ndarray  # (tracks,)
+    blended_rate: np.ndarray  # (tracks,)
+
+    def __len__(self) -> int:
+        return len(self.total_streams)
+
+    def platform_totals(self) -> pd.DataFrame:
+        """Streams and revenue per platform summed over all tracks."""
+        streams = self.streams.sum(axis=0)
+        revenue = self.revenue.sum(axis=0)
+        if self.rates.ndim == 1:
+            rate = self.rates
+        else:  # effective rate across tracks
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rate = np.where(streams > 0, revenue / streams, 0.0)
+        return pd.DataFrame({"Platform": self.platforms, "Streams": streams, "Revenue": revenue, "Rate": rate})
+
+    def to_frame(self, index: Sequence | None = None) -> pd.DataFrame:
+        """Per-track revenue by platform, plus total and blended rate columns."""
+        df = pd.DataFrame(self.revenue, columns=self.platforms, index=index)
+        df["Total"] = self.estimated_revenue
+        df["Blended Rate"] = self.blended_rate
+        return df
+
+    def estimate(self, i: int) -> RevenueEstimate:
+        """Row `i` as a scalar RevenueEstimate."""
+        rates = self.rates if self.rates.ndim == 1 else self.rates[i]
+        return RevenueEstimate(
+            total_streams=int(self.total_streams[i]),
+            estimated_revenue=float(self.estimated_revenue[i]),
+            platform_breakdown={
+                p: {"streams": int(self.streams[i, j]), "revenue": float(self.revenue[i, j]),
+                    "rate": float(rates[j]), "share": float(self.shares[i, j])}
+                for j, p in enumerate(self.platforms)
+            },
+            blended_rate=float(self.blended_rate[i]),
+        )
+
+
+def estimate_revenue_batch(
+    total_streams: Sequence[int] | np.ndarray | pd.Series,
+    platform_split: Mapping[str, float] | pd.DataFrame | None = None,
+    rates: Mapping[str, float] | np.ndarray | None = None,
+) -> RevenueMatrix:
+    """Vectorized estimate_revenue over many stream counts.
 
+    Args:
+        total_streams: Total cross-platform streams per track.
+        platform_split: One split for every track (dict, default PLATFORM_SPLIT),
+            or a DataFrame with one row per track and one column per platform.
+        rates: Per-stream rates — a {platform: rate} dict (default RATES), or
+            a (tracks, platforms) array in split column order, e.g. from
+            services.rate_cards for each track's territory.
 
-def get_jake_split(song_name: str) -> float:
-    """Get Jake's ownership share for a song. Defaults to 1.0 if not listed."""
-    return JAKE_SPLITS.get(song_name, 1.0)
+    Returns:
+        RevenueMatrix whose rows equal estimate_revenue(total_streams[i], split)
+        exactly: streams are truncated per platform, and platform revenues are
+        added in the same order as the scalar loop.
+    """
+    totals = np.asarray(total_streams, dtype=np.int64)
+    if isinstance(platform_split, pd.DataFrame):
+        platforms = list(platform_split.columns)
+        shares = platform_split.to_numpy(dtype=np.float64)
+    else:
+        split = platform_split or PLATFORM_SPLIT
+        platforms = list(split)
+        shares = np.broadcast_to(np.fromiter(split.values(), dtype=np.float64), (len(totals), len(platforms)))
+    if isinstance(rates, np.ndarray):
+        rates = rates.astype(np.float64, copy=False)
+    else:
+        card = rates or RATES
+        rates = np.array([card.get(p, card.get("Other", RATES["Other"])) for p in platforms], dtype=np.float64)
+
+    streams = np.trunc(totals[:, None] * shares)
+    revenue = streams * rates
+    # Column by column rather than revenue.sum(axis=1), whose pairwise summation
+    # can differ from the scalar loop in the last bit
+    estimated = np.zeros(len(totals))
+    for j in range(len(platforms)):
+        estimated += revenue[:, j]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        blended = np.where(totals > 0, estimated / totals, 0.0)
+
+    return RevenueMatrix(
+        platforms=platforms,
+        total_streams=totals,
+        shares=shares,
+        rates=rates,
+        streams=streams.astype(np.int64),
+        revenue=revenue,
+        estimated_revenue=estimated,
+        blended_rate=blended,
+    )
 
 
 def estimate_track_revenue(spotify_streams: int) -> float:
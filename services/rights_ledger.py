@@ -0,0 +1,193 @@
+"""Multi-party rights ledger: who owns what share of every recording and work.
+
+data/rights_ledger.csv has one row per (recording, party) with the party's
+master (sound recording) and publishing (composition) shares. A recording is
+identified by its ISRC, or by its exact title while it has none; its work by
+its ISWC, or by the recording itself while it has none. Master shares belong
+to the recording and publishing shares to the work, so every recording of a
+work must list the same publishing shares, and a catalog track carrying a
+ledger ISWC (a remix or re-recording, say) takes that work's publishing split.
+Each recording's master shares and each work's publishing shares must sum to
+1; validate raises LedgerError otherwise, so a typo can't quietly hand out
+more (or less) than the whole track, and valid_part drops the offending
+recordings instead so the app keeps running and treats them as uncovered.
+
+Streaming revenue is divided between the two sides with MASTER_WEIGHT, then
+within each side by the parties' shares. MASTER_WEIGHT is the master side's
+fraction of streaming royalties (default 0.80, the usual label/distributor vs
+PRO/publisher split); set the MASTER_WEIGHT secret or env var to match the
+actual deals. Payouts for every party on every track come from one merge of
+the catalog with the ledger. Tracks the ledger doesn't cover are reported,
+not assumed to be 100% Jake's.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from services.config import get_secret
+
+JAKE = "Jake Goble"
+MASTER_WEIGHT = float(get_secret("MASTER_WEIGHT", "0.80"))  # master side's share; the rest is publishing
+if not 0 <= MASTER_WEIGHT <= 1:
+    raise ValueError(f"MASTER_WEIGHT must be between 0 and 1, got {MASTER_WEIGHT}")
+PUBLISHING_WEIGHT = 1 - MASTER_WEIGHT
+SHARE_COLUMNS = ("master_share", "publishing_share")
+_TOLERANCE = 1e-6
+
+
+class LedgerError(ValueError):
+    """The rights ledger is inconsistent (shares out of range or not summing to 100%).
+
+    `recordings` holds the keys of the offending recordings.
+    """
+
+    def __init__(self, message: str, recordings: set[str] | None = None) -> None:
+        super().__init__(message)
+        self.recordings = recordings or set()
+
+
+def _recording_key(ledger: pd.DataFrame) -> pd.Series:
+    isrc = ledger["isrc"].astype("string").str.strip()
+    return isrc.where(isrc.notna() & (isrc != ""), ledger["title"].astype(str)).astype(object)
+
+
+def validate(ledger: pd.DataFrame) -> pd.DataFrame:
+    """Check the ledger and add its `recording` (ISRC, else title) and `work` (ISWC, else recording) keys.
+
+    Raises LedgerError listing every offending recording.
+    """
+    ledger = ledger.copy()
+    ledger["recording"] = _recording_key(ledger)
+    iswc = ledger["iswc"].astype("string").str.strip()
+    ledger["work"] = iswc.where(iswc.notna() & (iswc != ""), ledger["recording"]).astype(object)
+
+    problems, invalid = [], set()
+    shares = ledger[list(SHARE_COLUMNS)]
+    out_of_range = ledger[(shares.isna() | (shares < 0) | (shares > 1)).any(axis=1)]
+    problems += [f"{t}: share outside 0–100%" for t in out_of_range["title"].unique()]
+    invalid.update(out_of_range["recording"])
+    duplicated = ledger[ledger.duplicated(["recording", "party"])]
+    problems += [f"{t}: party listed twice" for t in duplicated["title"].unique()]
+    invalid.update(duplicated["recording"])
+
+    masters = ledger.groupby("recording", sort=False).agg(title=("title", "first"), share=("master_share", "sum"))
+    bad = masters[(masters["share"] - 1).abs() > _TOLERANCE]
+    problems += [f"{t}: master_share sums to {s:.2%}" for t, s in zip(bad["title"], bad["share"])]
+    invalid.update(bad.index)
+
+    publishing = ledger.drop_duplicates(["work", "party", "publishing_share"])
+    conflicting = publishing.loc[publishing.duplicated(["work", "party"]), "work"].unique()
+    problems += [f"work {w}: recordings list different publishing shares" for w in conflicting]
+    works = publishing.drop_duplicates(["work", "party"]).groupby("work", sort=False).agg(
+        title=("title", "first"), share=("publishing_share", "sum"),
+    )
+    bad_works = works[(works["share"] - 1).abs() > _TOLERANCE]
+    problems += [f"{t}: publishing_share sums to {s:.2%}" for t, s in zip(bad_works["title"], bad_works["share"])]
+    invalid.update(ledger.loc[ledger["work"].isin([*conflicting, *bad_works.index]), "recording"])
+    if problems:
+        raise LedgerError("Invalid rights ledger — " + "; ".join(problems), invalid)
+    return ledger
+
+
+def valid_part(ledger: pd.DataFrame) -> tuple[pd.DataFrame, str]:
+    """(validated ledger without the offending recordings, error message or "").
+
+    For callers that should keep working on a partly broken ledger: the dropped
+    recordings then show up as not covered rather than with wrong splits.
+    """
+    try:
+        return validate(ledger), ""
+    except LedgerError as e:
+        keep = ~_recording_key(ledger).isin(e.recordings)
+        return validate(ledger[keep]), str(e)
+
+
+def match_recordings(tracks: pd.DataFrame, ledger: pd.DataFrame) -> pd.Series:
+    """Ledger recording key for each track (song, ISRC columns): by ISRC, then exact title.
+
+    NaN where the ledger has no entry for the track.
+    """
+    # Hash lookups on plain object arrays; Arrow-backed string isin/map loop in Python
+    recordings = pd.Index(ledger["recording"].to_numpy(dtype=object)).unique()
+    titles = ledger.drop_duplicates("title")
+    by_title = pd.Index(titles["title"].to_numpy(dtype=object))
+
+    isrc = tracks["ISRC"].to_numpy(dtype=object)
+    key = np.where(recordings.get_indexer(isrc) >= 0, isrc, None)
+    pos = by_title.get_indexer(tracks["song"].to_numpy(dtype=object))
+    title_key = titles["recording"].to_numpy(dtype=object)[pos]
+    key = np.where(pd.isna(key) & (pos >= 0), title_key, key)
+    return pd.Series(key, index=tracks.index, dtype=object)
+
+
+def match_works(tracks: pd.DataFrame, ledger: pd.DataFrame, recording: pd.Series) -> pd.Series:
+    """Ledger work key for each track whose recording is known: the track's own
+    ISWC when the ledger has that work, else the work of its recording."""
+    works = pd.Index(ledger["work"].to_numpy(dtype=object)).unique()
+    iswc = tracks["ISWC"].to_numpy(dtype=object) if "ISWC" in tracks else np.full(len(tracks), None, dtype=object)
+    own = np.where(works.get_indexer(iswc) >= 0, iswc, None)
+    by_recording = ledger.drop_duplicates("recording").set_index("recording")["work"]
+    key = np.where(pd.notna(own), own, recording.map(by_recording).to_numpy(dtype=object))
+    return pd.Series(np.where(recording.notna(), key, None), index=tracks.index, dtype=object)
+
+
+def _track_shares(tracks: pd.DataFrame, ledger: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+    """(one row per (track position, party) with role and both shares, recording key per track).
+
+    Master shares join on the recording, publishing shares on the work; a
+    party on only one side has 0 on the other.
+    """
+    recording = match_recordings(tracks, ledger)
+    keys = pd.DataFrame({
+        "track": np.arange(len(tracks)),
+        "recording": recording.to_numpy(),
+        "work": match_works(tracks, ledger, recording).to_numpy(),
+    })
+    master = keys.merge(ledger[["recording", "party", "role", "master_share"]], on="recording")
+    works = ledger.drop_duplicates(["work", "party"])[["work", "party", "role", "publishing_share"]]
+    publishing = keys.merge(works, on="work")
+    rows = master[["track", "party", "role", "master_share"]].merge(
+        publishing[["track", "party", "role", "publishing_share"]],
+        on=["track", "party"], how="outer", suffixes=("", "_work"),
+    )
+    rows["role"] = rows["role"].fillna(rows.pop("role_work"))
+    rows[list(SHARE_COLUMNS)] = rows[list(SHARE_COLUMNS)].fillna(0.0)
+    return rows.sort_values("track", kind="stable", ignore_index=True), recording
+
+
+def _effective_share(rows: pd.DataFrame) -> pd.Series:
+    return MASTER_WEIGHT * rows["master_share"] + PUBLISHING_WEIGHT * rows["publishing_share"]
+
+
+def party_share(tracks: pd.DataFrame, ledger: pd.DataFrame, party: str = JAKE) -> pd.Series:
+    """`party`'s share of each track's revenue: 0 if not on a known track, NaN for unknown tracks."""
+    rows, recording = _track_shares(tracks, ledger)
+    own = rows[rows["party"] == party]
+    share = np.where(recording.notna(), 0.0, np.nan)
+    share[own["track"].to_numpy()] = _effective_share(own).to_numpy()
+    return pd.Series(share, index=tracks.index)
+
+
+def payouts(tracks: pd.DataFrame, ledger: pd.DataFrame, revenue: str = "est_revenue") -> pd.DataFrame:
+    """One row per (track, party) on ledger-covered tracks, with master/publishing/total revenue."""
+    shares, _ = _track_shares(tracks, ledger)
+    info = tracks[["song", "artist", "ISRC", revenue]].reset_index(drop=True)
+    rows = info.iloc[shares["track"].to_numpy()].reset_index(drop=True).join(shares.drop(columns="track"))
+    amount = rows[revenue].to_numpy(dtype=np.float64)
+    rows["share"] = _effective_share(rows)
+    rows["master_revenue"] = amount * MASTER_WEIGHT * rows["master_share"].to_numpy()
+    rows["publishing_revenue"] = amount * PUBLISHING_WEIGHT * rows["publishing_share"].to_numpy()
+    rows["revenue"] = rows["master_revenue"] + rows["publishing_revenue"]
+    return rows.drop(columns=[revenue])
+
+
+def statements(rows: pd.DataFrame) -> pd.DataFrame:
+    """Per-party totals from payouts(): tracks, master, publishing and total revenue."""
+    return rows.groupby("party", observed=True).agg(
+        tracks=("song", "nunique"),
+        master_revenue=("master_revenue", "sum"),
+        publishing_revenue=("publishing_revenue", "sum"),
+        revenue=("revenue", "sum"),
+    ).sort_values("revenue", ascending=False).reset_index()
+
@@ -0,0 +1,271 @@
+"""Chunked import of distributor royalty statements into the local store.
+
+Statement exports run to millions of sale lines per period. The importer never
+loads a whole file: it reads CHUNK_ROWS lines at a time with only the columns it
+needs, reduces each chunk to one row per (isrc, platform, territory, month)
+with a vectorized groupby, and folds the compact partial sums together. With
+`workers`, chunks are aggregated on a process pool while the next ones are
+read; at most two chunks per worker are in flight, so memory stays bounded.
+
+The totals for a file are upserted into the "royalties" store (added to any
+existing totals for the same key) in one transaction, together with the file's
+SHA-1 in the imports table. Importing the same file again is a no-op, and a
+failed import leaves nothing behind.
+
+Column names differ by distributor; COLUMN_ALIASES maps the common ones
+(DistroKid- and TuneCore-style exports, plain snake_case) to isrc, platform,
+territory, month, streams and revenue (USD). Store names are mapped to the
+platform names in RATES so actuals line up with estimates.
+
+Usage:  python -m services.royalty_import STATEMENT.csv [...] [--workers N] [--chunk-rows N]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from services.db import connect
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = 250_000
+KEYS = ["isrc", "platform", "territory", "month"]
+VALUES = ["streams", "revenue"]
+_MISSING = {"platform": "Other", "territory": ""}  # used for blank cells; lines without isrc/month are dropped
+
+# Statement header (lower-cased) -> canonical column
+COLUMN_ALIASES = {
+    "isrc": "isrc",
+    "store": "platform", "store name": "platform", "service": "platform", "platform": "platform",
+    "country of sale": "territory", "country": "territory", "territory": "territory",
+    "sale month": "month", "sales period": "month", "period": "month", "month": "month",
+    "quantity": "streams", "units sold": "streams", "units": "streams", "streams": "streams",
+    "earnings (usd)": "revenue", "total earned": "revenue", "amount (usd)": "revenue",
+    "net revenue": "revenue", "revenue": "revenue",
+}
+
+# Store names as distributors report them -> platform names used in RATES
+PLATFORM_ALIASES = {
+    "spotify": "Spotify",
+    "apple music": "Apple Music", "itunes/apple music": "Apple Music",
+    "youtube music": "YouTube Music", "youtube (red)": "YouTube Music",
+    "youtube": "YouTube (video)", "youtube (ads)": "YouTube (video)", "youtube content id": "YouTube (video)",
+    "amazon music": "Amazon Music", "amazon unlimited": "Amazon Music", "amazon prime": "Amazon Music",
+    "deezer": "Deezer",
+    "tidal": "Tidal",
+    "pandora": "Pandora",
+    "soundcloud": "SoundCloud",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS royalties (
+    isrc      TEXT NOT NULL,
+    platform  TEXT NOT NULL,
+    territory TEXT NOT NULL,
+    month     TEXT NOT NULL,  -- YYYY-MM
+    streams   INTEGER NOT NULL,
+    revenue   REAL NOT NULL,  -- USD
+    PRIMARY KEY (isrc, platform, territory, month)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS imports (
+    sha1        TEXT PRIMARY KEY,
+    path        TEXT NOT NULL,
+    lines       INTEGER NOT NULL,
+    rows        INTEGER NOT NULL,
+    imported_at INTEGER NOT NULL  -- unix seconds
+);
+"""
+
+
+def _conn():
+    return connect("royalties", _SCHEMA)
+
+
+def file_sha1(path: str | Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        while block := f.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _columns(path: str | Path) -> dict[str, str]:
+    """{statement header: canonical name} for the columns the importer reads."""
+    header = pd.read_csv(path, nrows=0).columns
+    mapping = {}
+    for col in header:
+        canonical = COLUMN_ALIASES.get(col.strip().lower())
+        if canonical and canonical not in mapping.values():
+            mapping[col] = canonical
+    missing = set(KEYS + VALUES) - set(mapping.values())
+    if missing:
+        raise ValueError(f"{path}: no column for {', '.join(sorted(missing))} (header: {list(header)})")
+    return mapping
+
+
+def _clean(col: str, values: pd.Series) -> pd.Series:
+    """Normalize the distinct values of one key column."""
+    values = values.str.strip()
+    if col == "isrc":
+        return values.str.upper().str.replace("-", "", regex=False)
+    if col == "territory":
+        return values.str.upper()
+    if col == "platform":
+        return values.str.lower().map(PLATFORM_ALIASES).fillna(values)
+    # month: "2025-03", "2025-03-01", "March 2025"... -> "2025-03"
+    return pd.to_datetime(values, format="mixed", errors="coerce").dt.strftime("%Y-%m")
+
+
+def aggregate_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Sum one chunk of canonical sale lines by KEYS.
+
+    Key columns are cleaned on their distinct values only and grouped as
+    integer codes, so the per-line cost is one factorize per column plus the
+    groupby; labels are put back on the (much smaller) result.
+    """
+    codes, labels = {}, {}
+    for col in KEYS:
+        raw, uniques = pd.factorize(chunk[col])
+        distinct = _clean(col, pd.Series(uniques, dtype=object))
+        if col in _MISSING:  # blank cells take the fill label, appended as one more distinct value
+            distinct = pd.concat([distinct, pd.Series([_MISSING[col]], dtype=object)], ignore_index=True)
+            raw = np.where(raw >= 0, raw, len(uniques))
+        cleaned, labels[col] = pd.factorize(distinct)
+        # A chunk can be all blanks (e.g. a trailing totals line on its own): nothing to index
+        codes[col] = np.where(raw >= 0, cleaned[raw], -1) if len(cleaned) else np.full(len(raw), -1)
+    frame = pd.DataFrame(codes)
+    for col in VALUES:
+        frame[col] = pd.to_numeric(chunk[col], errors="coerce").fillna(0).to_numpy()
+    frame = frame[(frame["isrc"] >= 0) & (frame["month"] >= 0)]  # no ISRC or unparseable month
+    sums = frame.groupby(KEYS, sort=False)[VALUES].sum().reset_index()
+    for col in KEYS:
+        sums[col] = pd.Categorical.from_codes(sums[col].to_numpy(), pd.Index(labels[col], dtype=object))
+    return sums
+
+
+def _combine(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    """Fold partial sums; keys stay categorical so regrouping works on codes."""
+    if not parts:
+        return pd.DataFrame({col: pd.Categorical([]) for col in KEYS} | {col: [] for col in VALUES})
+    frame = pd.DataFrame({col: union_categoricals([p[col] for p in parts]) for col in KEYS})
+    for col in VALUES:
+        frame[col] = np.concatenate([p[col].to_numpy() for p in parts])
+    return frame.groupby(KEYS, sort=False, observed=True)[VALUES].sum().reset_index()
+
+
+def _chunks(path: str | Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    mapping = _columns(path)
+    reader = pd.read_csv(
+        path, usecols=list(mapping), chunksize=chunk_rows,
+        dtype={col: "category" for col, name in mapping.items() if name in KEYS},
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk.rename(columns=mapping)
+
+
+def aggregate_file(path: str | Path, *, workers: int = 0, chunk_rows: int = CHUNK_ROWS) -> tuple[pd.DataFrame, int]:
+    """(totals by KEYS, sale lines read) for one statement file.
+
+    With workers > 0, chunks are aggregated on a process pool.
+    """
+    lines = 0
+    parts: list[pd.DataFrame] = []
+    if workers <= 0:
+        for chunk in _chunks(path, chunk_rows):
+            lines += len(chunk)
+            parts.append(aggregate_chunk(chunk))
+            if len(parts) >= 16:  # fold as we go; partial sums stay small
+                parts = [_combine(parts)]
+        return _combine(parts), lines
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future] = deque()
+        for chunk in _chunks(path, chunk_rows):
+            lines += len(chunk)
+            pending.append(pool.submit(aggregate_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                parts.append(pending.popleft().result())
+            if len(parts) >= 16:
+                parts = [_combine(parts)]
+        parts += [f.result() for f in pending]
+    return _combine(parts), lines
+
+
+def import_statement(path: str | Path, *, workers: int = 0, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Import one statement file. Returns a summary; skipped=True if it was already imported."""
+    start = time.time()
+    sha1 = file_sha1(path)
+    conn = _conn()
+    if conn.execute("SELECT 1 FROM imports WHERE sha1 = ?", (sha1,)).fetchone():
+        logger.info("Already imported, skipping: %s", path)
+        return {"path": str(path), "skipped": True}
+
+    totals, lines = aggregate_file(path, workers=workers, chunk_rows=chunk_rows)
+    # Primary-key order keeps the upsert's B-tree writes sequential
+    rows = sorted(zip(*(totals[col].tolist() for col in KEYS),
+                      totals["streams"].round().astype("int64").tolist(), totals["revenue"].astype(float).tolist()))
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO royalties VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (isrc, platform, territory, month) DO UPDATE SET
+                streams = streams + excluded.streams,
+                revenue = revenue + excluded.revenue
+            """,
+            rows,
+        )
+        conn.execute("INSERT INTO imports VALUES (?, ?, ?, ?, ?)",
+                     (sha1, str(path), lines, len(totals), int(start)))
+    summary = {"path": str(path), "skipped": False, "lines": lines, "rows": len(totals),
+               "revenue": round(float(totals["revenue"].sum()), 2), "seconds": round(time.time() - start, 2)}
+    logger.info("Imported royalty statement: %s", summary)
+    return summary
+
+
+def import_statements(paths: Iterable[str | Path], **kwargs) -> list[dict]:
+    return [import_statement(p, **kwargs) for p in paths]
+
+
+def actuals(by: tuple[str, ...] = ("isrc", "month")) -> pd.DataFrame:
+    """Imported streams and revenue summed by `by` (any of isrc, platform, territory, month)."""
+    cols = [c for c in by if c in KEYS]
+    group = ", ".join(cols)
+    sql = f"SELECT {group}, SUM(streams), SUM(revenue) FROM royalties GROUP BY {group} ORDER BY {group}" if cols \
+        else "SELECT SUM(streams), SUM(revenue) FROM royalties"
+    rows = _conn().execute(sql).fetchall()
+    return pd.DataFrame(rows, columns=[*cols, "streams", "revenue"]).dropna(subset=["streams"])
+
+
+def imports() -> pd.DataFrame:
+    """Imported statement files, newest first."""
+    rows = _conn().execute(
+        "SELECT path, lines, rows, imported_at FROM imports ORDER BY imported_at DESC").fetchall()
+    df = pd.DataFrame(rows, columns=["path", "lines", "rows", "imported_at"])
+    df["imported_at"] = pd.to_datetime(df["imported_at"], unit="s", utc=True)
+    return df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import distributor royalty statements (CSV).")
+    parser.add_argument("paths", nargs="+", help="statement CSV files")
+    parser.add_argument("--workers", type=int, default=0, help="aggregate chunks on N processes (0 = in-process)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    for summary in import_statements(args.paths, workers=args.workers, chunk_rows=args.chunk_rows):
+        print(summary)
+
+
+if __name__ == "__main__":
+    main()
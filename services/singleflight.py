@@ -0,0 +1,125 @@
+"""Coalesce identical concurrent upstream calls (singleflight).
+
+When a cache TTL expires, every Streamlit session that reruns at that moment
+misses `st.cache_data` together and would hit the same upstream endpoint with
+the same arguments. Wrapping the fetch function with `coalesce(service)` makes
+the first caller (the leader) perform the request while later identical callers
+(followers) wait for it and share its result or exception. Nothing is cached:
+once the leader finishes, the next call goes upstream again.
+
+Shared results are the same object for every caller, so treat them as
+read-only. Counters per service are exposed by `stats()`.
+"""
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+from typing import Any, Callable, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class Group:
+    """In-flight calls for one service, keyed by function and arguments."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self.upstream = 0  # calls that went upstream (leaders)
+        self.shared = 0  # duplicate calls that waited on a leader instead
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.upstream += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            logger.debug("%s: joined in-flight call %r", self.name, key)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+_groups: dict[str, Group] = {}
+_groups_lock = threading.Lock()
+
+
+def group(name: str) -> Group:
+    """The shared group for `name`, created on first use."""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = Group(name)
+        return _groups[name]
+
+
+def _freeze(value: Any) -> Hashable:
+    """Hashable, order-insensitive form of call arguments (dicts, lists, sets)."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+def coalesce(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator: identical concurrent calls to the function share one execution.
+
+    The key is taken from the arguments before the call, so functions that
+    mutate their arguments (e.g. add an API key to `params`) are still keyed on
+    what the caller passed.
+    """
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        g = group(name)
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            key = (fn.__qualname__, _freeze(args), _freeze(kwargs))
+            return g.do(key, lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+def stats() -> dict[str, dict[str, int]]:
+    """{service: {"upstream": n, "shared": n, "in_flight": n}} since process start."""
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {g.name: {"upstream": g.upstream, "shared": g.shared, "in_flight": g.in_flight()}
+            for g in groups}
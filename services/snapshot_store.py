@@ -0,0 +1,201 @@
+"""Columnar snapshot store for the static CSV datasets.
+
+The CSVs in data/ stay the import source. Each one is compiled once into an
+uncompressed Arrow IPC (Feather v2) file with a typed schema — numeric dtypes,
+parsed dates, category dtypes for artist/genre/type — and loaders memory-map
+that file instead of re-parsing the CSV. A snapshot is recompiled automatically
+when its source CSV changes or SCHEMA_VERSION is bumped.
+
+Compile everything up front with:  python -m services.snapshot_store
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from services.config import DATA_DIR, STORE_DIR
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = STORE_DIR / "snapshots"
+SCHEMA_VERSION = 1
+
+
+@dataclass(frozen=True)
+class DatasetSchema:
+    """Typed schema for one CSV dataset."""
+    source: str  # CSV filename in data/
+    dtypes: dict[str, str] = field(default_factory=dict)
+    categories: tuple[str, ...] = ()
+    dates: dict[str, str | None] = field(default_factory=dict)  # column -> strptime format ("mixed", None = infer)
+
+
+SCHEMAS: dict[str, DatasetSchema] = {
+    "songs_all": DatasetSchema(
+        source="jakke_songs_all.csv",
+        dtypes={"listeners": "int64", "streams": "int64", "saves": "int64", "popularity": "float64"},
+        categories=("artist", "genre"),
+        dates={"release_date": "mixed"},
+    ),
+    "songs_recent": DatasetSchema(
+        source="jakke_top_songs_recent.csv",
+        dtypes={"Streams": "int64"},
+    ),
+    "catalog": DatasetSchema(
+        source="musicteam_catalog.csv",
+        categories=("Type",),
+    ),
+    "music_collaborators": DatasetSchema(
+        source="music_collaborators.csv",
+        dtypes={"tracks": "int64", "total_streams": "int64", "avg_streams": "int64"},
+    ),
+    "ig_yearly": DatasetSchema(
+        source="ig_yearly_stats.csv",
+        dtypes={"year": "int64", "posts": "int64", "total_likes": "int64", "top_likes": "int64"},
+    ),
+    "ig_monthly": DatasetSchema(
+        source="ig_monthly_stats.csv",
+        dtypes={"posts": "int64", "likes": "int64"},
+        dates={"month": None},
+    ),
+    "ig_top_posts": DatasetSchema(
+        source="ig_top_posts.csv",
+        dtypes={"rank": "int64", "likes": "int64", "comments": "int64"},
+        categories=("type",),
+        dates={"date": None},
+    ),
+    "ig_collaborators": DatasetSchema(
+        source="ig_collaborators.csv",
+        dtypes={"collabs": "int64", "total_likes": "int64"},
+    ),
+    "ig_content_type": DatasetSchema(
+        source="ig_content_type_performance.csv",
+        dtypes={"posts": "int64", "total_likes": "int64"},
+        categories=("type",),
+    ),
+    "ig_day_of_week": DatasetSchema(
+        source="ig_day_of_week.csv",
+        dtypes={"posts": "int64"},
+    ),
+    "rate_cards": DatasetSchema(
+        source="rate_cards.csv",
+        dtypes={"rate": "float64"},
+        categories=("platform", "territory", "tier"),
+        dates={"effective_from": "%Y-%m-%d"},
+    ),
+    "rights_ledger": DatasetSchema(
+        source="rights_ledger.csv",
+        dtypes={"isrc": "string", "iswc": "string", "master_share": "float64", "publishing_share": "float64"},
+        categories=("party", "role"),
+    ),
+}
+
+
+def _pyarrow():
+    """Import pyarrow lazily — the store degrades to plain CSV parsing without it."""
+    try:
+        import pyarrow
+        import pyarrow.feather  # noqa: F401
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def snapshot_path(name: str) -> Path:
+    return SNAPSHOT_DIR / f"{name}.arrow"
+
+
+def _source_meta(schema: DatasetSchema) -> dict[str, str]:
+    stat = (DATA_DIR / schema.source).stat()
+    return {
+        "schema_version": str(SCHEMA_VERSION),
+        "source_mtime_ns": str(stat.st_mtime_ns),
+        "source_size": str(stat.st_size),
+    }
+
+
+def read_csv(name: str) -> pd.DataFrame:
+    """Parse a dataset's source CSV and apply its typed schema."""
+    schema = SCHEMAS[name]
+    df = pd.read_csv(DATA_DIR / schema.source, dtype=schema.dtypes or None)
+    for col, fmt in schema.dates.items():
+        df[col] = pd.to_datetime(df[col], format=fmt, errors="coerce")
+    for col in schema.categories:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def compile_dataset(name: str) -> Path:
+    """Compile one CSV into its Arrow snapshot (atomic replace)."""
+    pa = _pyarrow()
+    if pa is None:
+        raise RuntimeError("pyarrow is required to compile snapshots — pip install pyarrow")
+
+    schema = SCHEMAS[name]
+    meta = _source_meta(schema)
+    table = pa.Table.from_pandas(read_csv(name), preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"mcc_snapshot": json.dumps(meta).encode(),
+    })
+
+    path = snapshot_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".arrow.{os.getpid()}.tmp")
+    pa.feather.write_feather(table, tmp, compression="uncompressed")
+    os.replace(tmp, path)
+    logger.info("Compiled snapshot %s (%d rows)", name, table.num_rows)
+    return path
+
+
+def is_fresh(name: str) -> bool:
+    """True if the snapshot exists and matches its source CSV and schema version."""
+    pa = _pyarrow()
+    path = snapshot_path(name)
+    if pa is None or not path.exists():
+        return False
+    try:
+        with pa.memory_map(str(path)) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+        stored = json.loads(metadata.get(b"mcc_snapshot", b"{}"))
+    except Exception as e:
+        logger.warning("Unreadable snapshot %s, will recompile: %s", name, e)
+        return False
+    return stored == _source_meta(SCHEMAS[name])
+
+
+def load_dataset(name: str) -> pd.DataFrame:
+    """Load a dataset from its memory-mapped snapshot, compiling it first if stale.
+
+    Falls back to parsing the CSV (same schema) if pyarrow is not installed or the
+    snapshot cannot be written.
+    """
+    pa = _pyarrow()
+    if pa is None:
+        return read_csv(name)
+
+    try:
+        if not is_fresh(name):
+            compile_dataset(name)
+        table = pa.feather.read_table(snapshot_path(name), memory_map=True)
+    except Exception as e:
+        logger.warning("Snapshot %s unavailable, parsing CSV: %s", name, e)
+        return read_csv(name)
+    # split_blocks avoids consolidating columns into one large copy
+    return table.to_pandas(split_blocks=True)
+
+
+def compile_all() -> list[Path]:
+    """Compile every dataset whose snapshot is missing or stale."""
+    return [compile_dataset(name) for name in SCHEMAS if not is_fresh(name)]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    compiled = compile_all()
+    print(f"{len(compiled)} snapshot(s) compiled into {SNAPSHOT_DIR}")
@@ -10,16 +10,32 @@ import logging
 from pathlib import Path
 from typing import Any
 
-import requests
 import streamlit as st
 
+from services import transport
+from services.circuit_breaker import CircuitBreaker
 from services.config import get_secret
+from services.metrics_store import record
+from services.quota import QuotaBudget
+from services.singleflight import coalesce
 
 logger = logging.getLogger(__name__)
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 RAPIDAPI_HOST = "songstats.p.rapidapi.com"
-BASE_URL = f"https://{RAPIDAPI_HOST}/artists"
+BASE_URL = get_secret("SONGSTATS_BASE_URL") or f"https://{RAPIDAPI_HOST}/artists"
+# Shared response cache TTL — a little under the hourly refresh so each refresh revalidates
+CACHE_TTL = 3000
+
+# Free-tier budget, spread over the month so a busy week can't starve the rest
+# of it. Every request that reaches RapidAPI is charged, including conditional
+# revalidations answered 304 (RapidAPI bills those too); only fresh cache hits are free.
+budget = QuotaBudget(
+    "songstats",
+    limit=int(get_secret("SONGSTATS_MONTHLY_HITS", "1000")),
+    concurrency=int(get_secret("SONGSTATS_CONCURRENCY", "10")),
+)
+breaker = CircuitBreaker("songstats", probe_url=BASE_URL)
 
 
 def _headers() -> dict[str, str]:
@@ -29,10 +45,19 @@ def _headers() -> dict[str, str]:
     }
 
 
+@coalesce("songstats")
 def _api_get(endpoint: str, params: dict | None = None) -> dict[str, Any]:
-    """Make authenticated GET to Songstats RapidAPI."""
+    """Make authenticated GET to Songstats RapidAPI.
+
+    Charges one hit per network request against `budget`. When the budget is
+    exhausted the last cached response is served; with no cached copy this
+    raises QuotaExhausted and callers fall back to static data.
+    """
     url = f"{BASE_URL}/{endpoint}"
-    resp = requests.get(url, headers=_headers(), params=params or {}, timeout=15)
+    with budget.slot():
+        resp = transport.get(url, headers=_headers(), params=params or {}, timeout=15,
+                             cache_ttl=CACHE_TTL, throttle=lambda: budget.spend(endpoint),
+                             breaker=breaker)
     resp.raise_for_status()
     return resp.json()
 
@@ -50,47 +75,56 @@ def _load_static(filename: str) -> dict[str, Any]:
 # Public API — each function returns data from API or static fallback
 # ---------------------------------------------------------------------------
 
+@coalesce("songstats")
+def fetch_artist_stats(spotify_id: str) -> dict[str, Any] | None:
+    """Fetch live artist stats (uncached). None if the API is not configured; raises on API errors."""
+    if not get_secret("SONGSTATS_API_KEY") or not spotify_id:
+        return None
+
+    # Fetch overview stats
+    info = _api_get("info", {"source": "spotify", "spotify_artist_id": spotify_id})
+    stats = _api_get("stats", {"source": "spotify", "spotify_artist_id": spotify_id})
+
+    # Normalize to match our static file format
+    spotify_stats = stats.get("stats", {}).get("spotify", {})
+    cross_platform = stats.get("stats", {}).get("cross_platform", {})
+
+    result = {
+        "artist": info.get("artist_name", ""),
+        "last_updated": "live",
+        "spotify": {
+            "total_streams": spotify_stats.get("streams_total", 0),
+            "monthly_listeners": spotify_stats.get("monthly_listeners_current", 0),
+            "followers": spotify_stats.get("followers_total", 0),
+            "popularity_score": spotify_stats.get("popularity", 0),
+            "current_playlists": spotify_stats.get("playlists_total", 0),
+            "playlist_reach": spotify_stats.get("playlist_reach", 0),
+        },
+        "cross_platform": {
+            "total_streams": cross_platform.get("streams_total", 0),
+            "total_playlists": cross_platform.get("playlists_total", 0),
+            "playlist_reach": cross_platform.get("playlist_reach", 0),
+        },
+        "track_popularity": stats.get("track_popularity", {}),
+        "_source": "api",
+    }
+    record(result["artist"] or spotify_id, "songstats",
+           {"spotify": result["spotify"], "cross_platform": result["cross_platform"]})
+    return result
+
+
 @st.cache_data(ttl=3600)
 def get_artist_stats(spotify_id: str = "", fallback_file: str = "songstats_jakke.json") -> dict[str, Any]:
     """Get comprehensive artist stats (streams, playlists, charts).
 
     Falls back to static JSON if API key not configured or request fails.
     """
-    api_key = get_secret("SONGSTATS_API_KEY")
-    if not api_key or not spotify_id:
-        return _load_static(fallback_file)
-
     try:
-        # Fetch overview stats
-        info = _api_get("info", {"source": "spotify", "spotify_artist_id": spotify_id})
-        stats = _api_get("stats", {"source": "spotify", "spotify_artist_id": spotify_id})
-
-        # Normalize to match our static file format
-        spotify_stats = stats.get("stats", {}).get("spotify", {})
-        cross_platform = stats.get("stats", {}).get("cross_platform", {})
-
-        return {
-            "artist": info.get("artist_name", ""),
-            "last_updated": "live",
-            "spotify": {
-                "total_streams": spotify_stats.get("streams_total", 0),
-                "monthly_listeners": spotify_stats.get("monthly_listeners_current", 0),
-                "followers": spotify_stats.get("followers_total", 0),
-                "popularity_score": spotify_stats.get("popularity", 0),
-                "current_playlists": spotify_stats.get("playlists_total", 0),
-                "playlist_reach": spotify_stats.get("playlist_reach", 0),
-            },
-            "cross_platform": {
-                "total_streams": cross_platform.get("streams_total", 0),
-                "total_playlists": cross_platform.get("playlists_total", 0),
-                "playlist_reach": cross_platform.get("playlist_reach", 0),
-            },
-            "track_popularity": stats.get("track_popularity", {}),
-            "_source": "api",
-        }
+        data = fetch_artist_stats(spotify_id)
     except Exception as e:
         logger.warning("Songstats API failed, using static fallback: %s", e)
-        return _load_static(fallback_file)
+        data = None
+    return data or _load_static(fallback_file)
 
 
 @st.cache_data(ttl=3600)
@@ -114,6 +148,16 @@ def get_artist_playlists(spotify_id: str = "", fallback_file: str = "songstats_j
         return data.get("top_playlists", [])
 
 
+def fetch_jakke_stats() -> dict[str, Any] | None:
+    """Live Jakke stats for the background refresher (uncached)."""
+    return fetch_artist_stats(get_secret("JAKKE_SPOTIFY_ID"))
+
+
+def fetch_enjune_stats() -> dict[str, Any] | None:
+    """Live Enjune stats for the background refresher (uncached)."""
+    return fetch_artist_stats(get_secret("ENJUNE_SPOTIFY_ID"))
+
+
 @st.cache_data(ttl=3600)
 def get_jakke_stats() -> dict[str, Any]:
     """Convenience: get Jakke stats."""
@@ -126,3 +170,8 @@ def get_enjune_stats() -> dict[str, Any]:
     """Convenience: get Enjune stats."""
     spotify_id = get_secret("ENJUNE_SPOTIFY_ID")
     return get_artist_stats(spotify_id, "songstats_enjune.json")
+
+
+def quota_status() -> dict[str, Any]:
+    """Current month's hit usage and remaining budget (see QuotaBudget.status)."""
+    return budget.status()
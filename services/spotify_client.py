@@ -6,20 +6,67 @@ Docs: https://developer.spotify.com/documentation/web-api
 """
 from __future__ import annotations
 
+import functools
 import logging
-from typing import Any
+import threading
+from typing import Any, Callable
 
+import requests
 import streamlit as st
 
+from services.circuit_breaker import CircuitBreaker
 from services.config import get_secret
 
 logger = logging.getLogger(__name__)
 
+# Overridable so the client can be pointed at a local stub (benchmarks.stub_server)
+API_URL = get_secret("SPOTIFY_API_URL") or "https://api.spotify.com/v1/"
+TOKEN_URL = get_secret("SPOTIFY_TOKEN_URL") or "https://accounts.spotify.com/api/token"
+breaker = CircuitBreaker("spotify", probe_url=API_URL)
+
+# One client per credential pair: the auth manager caches its access token in
+# memory and refreshes it only when it expires, and the client keeps one
+# pooled session, so repeated calls skip both the token request and handshakes.
+_client = None
+_client_key: tuple[str, str] | None = None
+_client_lock = threading.Lock()
+
+
+def _is_outage(e: Exception) -> bool:
+    """Whether a failed call counts against the breaker: network errors and 5xx.
+
+    spotipy retries 5xx itself and reports ones that outlast the retries as a
+    429 "Max Retries" error; the urllib3 reason still names the real status.
+    """
+    if isinstance(e, requests.RequestException):
+        return True
+    status = getattr(e, "http_status", None)
+    if status is None:
+        return False
+    return status >= 500 or "too many 5" in str(getattr(e, "reason", "") or "")
+
+
+def _with_breaker(call: Callable[..., Any]) -> Callable[..., Any]:
+    """Route spotipy's single request method through the Spotify breaker."""
+    @functools.wraps(call)
+    def guarded(*args: Any, **kwargs: Any) -> Any:
+        breaker.before()
+        try:
+            result = call(*args, **kwargs)
+        except Exception as e:
+            breaker.record(not _is_outage(e))
+            raise
+        breaker.record(True)
+        return result
+    return guarded
+
 
 def _get_client():
-    """Get authenticated spotipy client (client credentials flow)."""
+    """Get the shared authenticated spotipy client (client credentials flow)."""
+    global _client, _client_key
     try:
         import spotipy
+        from spotipy.cache_handler import MemoryCacheHandler
         from spotipy.oauth2 import SpotifyClientCredentials
     except ImportError:
         logger.warning("spotipy not installed — pip install spotipy")
@@ -30,12 +77,30 @@ def _get_client():
     if not client_id or not client_secret:
         return None
 
-    try:
-        auth = SpotifyClientCredentials(client_id=client_id, client_secret=client_secret)
-        return spotipy.Spotify(auth_manager=auth)
-    except Exception as e:
-        logger.warning("Spotify auth failed: %s", e)
-        return None
+    with _client_lock:
+        if _client is not None and _client_key == (client_id, client_secret):
+            return _client
+        try:
+            auth = SpotifyClientCredentials(client_id=client_id, client_secret=client_secret,
+                                            cache_handler=MemoryCacheHandler())
+            auth.OAUTH_TOKEN_URL = TOKEN_URL
+            client = spotipy.Spotify(auth_manager=auth, requests_timeout=15)
+            client.prefix = API_URL
+            # spotipy sends through its own session, not services.transport, so
+            # the breaker wraps its request method instead
+            client._internal_call = _with_breaker(client._internal_call)
+            if get_secret("HTTP_RECORD_DIR"):
+                # spotipy keeps its own sessions (with its retry policy) rather than
+                # using services.transport, so record on those directly
+                from services import recorder
+                recorder.attach(client._session, get_secret("HTTP_RECORD_DIR"))
+                recorder.attach(auth._session, get_secret("HTTP_RECORD_DIR"))
+            _client = client
+            _client_key = (client_id, client_secret)
+        except Exception as e:
+            logger.warning("Spotify auth failed: %s", e)
+            return None
+        return _client
 
 
 @st.cache_data(ttl=3600)
@@ -53,13 +118,17 @@ def get_artist(artist_id: str) -> dict[str, Any] | None:
 
 @st.cache_data(ttl=3600)
 def get_artist_albums(artist_id: str, limit: int = 50) -> list[dict]:
-    """Get artist's albums/singles/EPs."""
+    """Get all of an artist's albums/singles/EPs, `limit` per page."""
     sp = _get_client()
     if not sp or not artist_id:
         return []
     try:
-        results = sp.artist_albums(artist_id, album_type="album,single", limit=limit)
-        return results.get("items", [])
+        page = sp.artist_albums(artist_id, include_groups="album,single", limit=limit)
+        albums = []
+        while page:
+            albums.extend(page.get("items", []))
+            page = sp.next(page) if page.get("next") else None
+        return albums
     except Exception as e:
         logger.warning("Spotify get_artist_albums failed: %s", e)
         return []
@@ -0,0 +1,166 @@
+"""Shared HTTP transport for all service clients.
+
+One process-wide requests.Session with keep-alive connection pools per host, so
+repeated calls to RapidAPI, graph.facebook.com, googleapis, audioscrobbler,
+MusicBrainz and song.link reuse TCP+TLS connections instead of handshaking on
+every request. The underlying urllib3 pools are thread-safe; the session is
+created once and not mutated afterwards, so it is safe to share between
+Streamlit sessions and background workers.
+
+Pool sizes are configurable via HTTP_POOL_CONNECTIONS (number of hosts to keep
+pools for) and HTTP_POOL_MAXSIZE (connections kept per host). Setting
+HTTP_RECORD_DIR records every response as a fixture (services.recorder).
+
+Passing `cache_ttl` routes a GET through the persistent response cache
+(services.http_cache), which is shared across processes and restarts. Passing a
+`breaker` (services.circuit_breaker) records each network outcome and fails
+fast while the upstream is known to be down. Every request is paced by the
+adaptive controller for its host (services.adaptive_rate), and 429/503
+responses are retried with backoff until the call's `deadline`.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services import http_cache, recorder
+from services.adaptive_rate import RETRY_STATUSES, RateLimited, controller
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.config import get_secret
+from services.quota import QuotaExhausted
+
+DEFAULT_TIMEOUT = 15
+DEFAULT_DEADLINE = 30  # seconds per call, including 429/503 retries and pacing waits
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=int(get_secret("HTTP_POOL_CONNECTIONS", "10")),
+                    pool_maxsize=int(get_secret("HTTP_POOL_MAXSIZE", "10")),
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+                if get_secret("HTTP_RECORD_DIR"):
+                    recorder.attach(session, get_secret("HTTP_RECORD_DIR"))
+                _session = session
+    return _session
+
+
+def get(url: str, params: dict[str, Any] | None = None, headers: dict[str, str] | None = None,
+        timeout: float = DEFAULT_TIMEOUT, cache_ttl: float | None = None,
+        throttle: Callable[[], None] | None = None, breaker: CircuitBreaker | None = None,
+        deadline: float = DEFAULT_DEADLINE) -> requests.Response:
+    """GET through the shared pooled session.
+
+    With `cache_ttl` (seconds), a cached 200 younger than the TTL is returned
+    without a request; an older one is revalidated with a conditional GET.
+    Responses served from cache have `from_cache = True`. `throttle` is called
+    before each request that actually goes to the network, 429/503 retries
+    included (e.g. a rate limiter or quota budget). If it raises QuotaExhausted, `breaker` is open
+    (CircuitOpenError), the host is rate limited past `deadline` (RateLimited)
+    or the upstream still answers 429/503 after retries, a stale cached copy is
+    returned instead when there is one.
+    """
+    if cache_ttl is None:
+        if breaker:
+            breaker.before()
+        if throttle:
+            throttle()
+        return _send("GET", url, breaker, deadline, throttle, params=params, headers=headers, timeout=timeout)
+
+    key, display_url = http_cache.normalize(url, params, headers)
+    cached = http_cache.lookup(key)
+    if cached and cached.age < cache_ttl:
+        return cached.to_response()
+
+    request_headers = {**(headers or {}), **(cached.conditional_headers() if cached else {})}
+    try:
+        if breaker:
+            breaker.before()
+        if throttle:
+            throttle()
+    except (QuotaExhausted, CircuitOpenError):
+        if cached is None:
+            raise
+        return cached.to_response()
+    try:
+        resp = _send("GET", url, breaker, deadline, throttle, params=params, headers=request_headers,
+                     timeout=timeout)
+    except RateLimited:
+        if cached is None:
+            raise
+        return cached.to_response()
+    if resp.status_code in RETRY_STATUSES and cached:
+        return cached.to_response()
+    if resp.status_code == 304 and cached:
+        http_cache.touch(key)
+        return cached.to_response()
+    http_cache.store(key, display_url, resp)
+    resp.from_cache = False
+    return resp
+
+
+def post(url: str, data: dict[str, Any] | None = None, headers: dict[str, str] | None = None,
+         timeout: float = DEFAULT_TIMEOUT, throttle: Callable[[], None] | None = None,
+         breaker: CircuitBreaker | None = None, deadline: float = DEFAULT_DEADLINE) -> requests.Response:
+    """Form-encoded POST through the shared pooled session (never cached)."""
+    if breaker:
+        breaker.before()
+    if throttle:
+        throttle()
+    return _send("POST", url, breaker, deadline, throttle, data=data, headers=headers, timeout=timeout)
+
+
+def _send(method: str, url: str, breaker: CircuitBreaker | None, deadline: float,
+          throttle: Callable[[], None] | None = None, **kwargs: Any) -> requests.Response:
+    """Send a request paced by its host's controller, retrying 429/503 until `deadline` seconds.
+
+    Connection errors, timeouts and 5xx are reported to `breaker`. `throttle`
+    is called before every retry (the caller calls it for the first attempt),
+    so quota budgets and rate limiters count each request sent. Raises
+    RateLimited if the first attempt can't be sent in time; if a retry can't
+    (paced out, or `throttle` raises QuotaExhausted), the last 429/503
+    response is returned.
+    """
+    host = controller(urlsplit(url).netloc)
+    deadline_at = time.monotonic() + deadline
+    attempt = 0
+    retryable: requests.Response | None = None  # last 429/503 response, once there is one
+    while True:
+        try:
+            if retryable is not None and throttle:
+                throttle()
+            host.acquire(deadline_at)
+        except (RateLimited, QuotaExhausted):
+            if retryable is None:
+                raise
+            return retryable
+        try:
+            resp = get_session().request(method, url, **kwargs)
+        except requests.RequestException:
+            if breaker:
+                breaker.record(False)
+            raise
+        if breaker:
+            breaker.record(resp.status_code < 500)
+        delay = host.observe(resp, attempt)
+        if delay is None or time.monotonic() + delay >= deadline_at:
+            return resp
+        retryable = resp
+        attempt += 1
+        time.sleep(delay)
@@ -8,21 +8,41 @@ from __future__ import annotations
 
 import logging
 from typing import Any
+from zoneinfo import ZoneInfo
 
-import requests
 import streamlit as st
 
+from services import transport
+from services.circuit_breaker import CircuitBreaker
 from services.config import get_secret
+from services.metrics_store import record
+from services.quota import QuotaBudget
+from services.singleflight import coalesce
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://www.googleapis.com/youtube/v3"
+BASE_URL = get_secret("YOUTUBE_BASE_URL") or "https://www.googleapis.com/youtube/v3"
+SEARCH_COST = 100  # quota units per search.list; every other list call costs 1
 
+# Daily project quota, which resets at midnight Pacific time. Not spread: the
+# sync is cheap and bursty, the point is never to blow the daily cap.
+budget = QuotaBudget(
+    "youtube",
+    limit=int(get_secret("YOUTUBE_DAILY_UNITS", "10000")),
+    period="day",
+    spread=False,
+    tz=ZoneInfo("America/Los_Angeles"),
+)
+breaker = CircuitBreaker("youtube", probe_url=BASE_URL)
 
-def _api_get(endpoint: str, params: dict) -> dict[str, Any]:
-    """Make GET request to YouTube Data API."""
+
+@coalesce("youtube")
+def _api_get(endpoint: str, params: dict, cache_ttl: float = 3600) -> dict[str, Any]:
+    """Make GET request to YouTube Data API, charging network calls to `budget`."""
     params["key"] = get_secret("YOUTUBE_API_KEY")
-    resp = requests.get(f"{BASE_URL}/{endpoint}", params=params, timeout=15)
+    cost = SEARCH_COST if endpoint == "search" else 1
+    resp = transport.get(f"{BASE_URL}/{endpoint}", params=params, timeout=15, cache_ttl=cache_ttl,
+                         throttle=lambda: budget.spend(endpoint, cost), breaker=breaker)
     resp.raise_for_status()
     return resp.json()
 
@@ -43,7 +63,7 @@ def get_channel_stats(channel_id: str = "") -> dict[str, Any] | None:
         item = items[0]
         stats = item.get("statistics", {})
         snippet = item.get("snippet", {})
-        return {
+        result = {
             "title": snippet.get("title", ""),
             "subscribers": int(stats.get("subscriberCount", 0)),
             "total_views": int(stats.get("viewCount", 0)),
@@ -51,54 +71,30 @@ def get_channel_stats(channel_id: str = "") -> dict[str, Any] | None:
             "description": snippet.get("description", ""),
             "thumbnail": snippet.get("thumbnails", {}).get("default", {}).get("url", ""),
         }
+        record(result["title"] or channel_id, "youtube", result)
+        return result
     except Exception as e:
         logger.warning("YouTube channel stats failed: %s", e)
         return None
 
 
-@st.cache_data(ttl=3600)
+@st.cache_data(ttl=300)
 def get_recent_videos(channel_id: str = "", limit: int = 10) -> list[dict]:
-    """Get recent videos from a channel with view/like counts."""
+    """Get recent videos from a channel with view/like counts.
+
+    Reads the local store only; the incremental sync (services.youtube_sync)
+    runs on the app's background refresher, so a slow, failed or quota-limited
+    sync never blocks a page and the last synced data is served.
+    """
+    from services.youtube_sync import recent_videos
+
     api_key = get_secret("YOUTUBE_API_KEY")
     channel_id = channel_id or get_secret("JAKKE_YOUTUBE_CHANNEL")
     if not api_key or not channel_id:
         return []
 
     try:
-        # Search for recent uploads (costs 100 quota units)
-        search = _api_get("search", {
-            "part": "id",
-            "channelId": channel_id,
-            "order": "date",
-            "type": "video",
-            "maxResults": limit,
-        })
-        video_ids = [item["id"]["videoId"] for item in search.get("items", []) if "videoId" in item.get("id", {})]
-
-        if not video_ids:
-            return []
-
-        # Get full video details (costs 1 unit per call)
-        videos = _api_get("videos", {
-            "part": "snippet,statistics",
-            "id": ",".join(video_ids),
-        })
-
-        results = []
-        for v in videos.get("items", []):
-            stats = v.get("statistics", {})
-            snippet = v.get("snippet", {})
-            results.append({
-                "id": v["id"],
-                "title": snippet.get("title", ""),
-                "published": snippet.get("publishedAt", ""),
-                "views": int(stats.get("viewCount", 0)),
-                "likes": int(stats.get("likeCount", 0)),
-                "comments": int(stats.get("commentCount", 0)),
-                "thumbnail": snippet.get("thumbnails", {}).get("medium", {}).get("url", ""),
-                "url": f"https://youtube.com/watch?v={v['id']}",
-            })
-        return results
+        return recent_videos(channel_id, limit)
     except Exception as e:
         logger.warning("YouTube recent videos failed: %s", e)
         return []
@@ -117,7 +113,7 @@ def search_videos(query: str, limit: int = 5) -> list[dict]:
             "q": query,
             "type": "video",
             "maxResults": limit,
-        })
+        }, cache_ttl=7200)
         return [
             {
                 "id": item["id"]["videoId"],
@@ -137,3 +133,8 @@ def search_videos(query: str, limit: int = 5) -> list[dict]:
 def is_available() -> bool:
     """Check if YouTube API is configured."""
     return bool(get_secret("YOUTUBE_API_KEY"))
+
+
+def quota_status() -> dict[str, Any]:
+    """Today's unit usage and remaining daily quota (see QuotaBudget.status)."""
+    return budget.status()
@@ -0,0 +1,225 @@
+"""Incremental YouTube channel sync.
+
+Lists a channel's uploads through its uploads playlist (playlistItems, 1 unit
+per 50 videos) instead of search (100 units per call), stopping at the first
+page that reaches videos already synced. Statistics are then fetched with
+`videos` in batches of 50 IDs, only for new videos and those whose stats are
+older than `stats_max_age`. Everything lands in STORE_DIR/youtube.db, so the
+app reads recent videos locally. Units are charged to the daily YouTube budget
+(services.youtube_client.budget); if it runs out mid-sync the sync stops and
+whatever was fetched so far is kept.
+
+Usage:  python -m services.youtube_sync [CHANNEL_ID] [--stats-max-age HOURS]
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from typing import Any
+
+from services.config import get_secret
+from services.db import connect
+from services.quota import QuotaExhausted
+from services.youtube_client import _api_get
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50  # max IDs per videos.list / items per playlistItems page
+STATS_MAX_AGE = 6 * 3600  # seconds before a video's statistics are re-fetched
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    channel_id       TEXT PRIMARY KEY,
+    uploads_playlist TEXT NOT NULL,
+    synced_at        REAL
+);
+CREATE TABLE IF NOT EXISTS videos (
+    video_id   TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    published  TEXT NOT NULL DEFAULT '',
+    title      TEXT NOT NULL DEFAULT '',
+    thumbnail  TEXT NOT NULL DEFAULT '',
+    views      INTEGER NOT NULL DEFAULT 0,
+    likes      INTEGER NOT NULL DEFAULT 0,
+    comments   INTEGER NOT NULL DEFAULT 0,
+    stats_at   REAL
+);
+CREATE INDEX IF NOT EXISTS videos_by_channel ON videos (channel_id, published);
+-- Deleted or private videos: missing from `videos` responses, never fetched again
+CREATE TABLE IF NOT EXISTS gone_videos (
+    video_id TEXT PRIMARY KEY,
+    gone_at  REAL NOT NULL
+);
+"""
+
+
+def _conn():
+    return connect("youtube", _SCHEMA)
+
+
+def _uploads_playlist(channel_id: str) -> str:
+    row = _conn().execute(
+        "SELECT uploads_playlist FROM channels WHERE channel_id = ?", (channel_id,)
+    ).fetchone()
+    if row:
+        return row[0]
+    data = _api_get("channels", {"part": "contentDetails", "id": channel_id}, cache_ttl=86400)
+    items = data.get("items", [])
+    if not items:
+        raise ValueError(f"YouTube channel not found: {channel_id}")
+    playlist = items[0]["contentDetails"]["relatedPlaylists"]["uploads"]
+    conn = _conn()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO channels (channel_id, uploads_playlist) VALUES (?, ?)",
+            (channel_id, playlist),
+        )
+    return playlist
+
+
+def _list_new_uploads(channel_id: str, playlist: str, max_pages: int | None) -> list[tuple[str, str]]:
+    """Walk the uploads playlist newest-first until a page reaches known videos."""
+    conn = _conn()
+    new: list[tuple[str, str]] = []
+    token = None
+    pages = 0
+    while True:
+        params = {"part": "contentDetails", "playlistId": playlist, "maxResults": BATCH_SIZE}
+        if token:
+            params["pageToken"] = token
+        page = _api_get("playlistItems", params, cache_ttl=0)
+        pages += 1
+        ids = [(it["contentDetails"]["videoId"], it["contentDetails"].get("videoPublishedAt", ""))
+               for it in page.get("items", [])]
+        known = {row[0] for row in conn.execute(
+            f"SELECT video_id FROM videos WHERE video_id IN ({','.join('?' * len(ids))})",
+            [vid for vid, _ in ids],
+        )} if ids else set()
+        new.extend((vid, published) for vid, published in ids if vid not in known)
+        token = page.get("nextPageToken")
+        if known or not token or (max_pages and pages >= max_pages):
+            break
+    if new:
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO videos (video_id, channel_id, published) VALUES (?, ?, ?)",
+                [(vid, channel_id, published) for vid, published in new],
+            )
+    return new
+
+
+def _refresh_stats(video_ids: list[str]) -> int:
+    """Fetch snippet+statistics for `video_ids` in batches of 50. Returns videos updated.
+
+    IDs the API leaves out of the response (deleted or private videos) are
+    recorded in gone_videos and stamped with stats_at, so later syncs skip them.
+    """
+    conn = _conn()
+    updated = 0
+    for i in range(0, len(video_ids), BATCH_SIZE):
+        batch = video_ids[i:i + BATCH_SIZE]
+        data = _api_get("videos", {"part": "snippet,statistics", "id": ",".join(batch)}, cache_ttl=0)
+        now = time.time()
+        rows = []
+        for v in data.get("items", []):
+            stats = v.get("statistics", {})
+            snippet = v.get("snippet", {})
+            rows.append((
+                snippet.get("publishedAt", ""),
+                snippet.get("title", ""),
+                snippet.get("thumbnails", {}).get("medium", {}).get("url", ""),
+                int(stats.get("viewCount", 0)),
+                int(stats.get("likeCount", 0)),
+                int(stats.get("commentCount", 0)),
+                now,
+                v["id"],
+            ))
+        gone = set(batch) - {row[-1] for row in rows}
+        with conn:
+            conn.executemany(
+                "UPDATE videos SET published = ?, title = ?, thumbnail = ?, views = ?, likes = ?, "
+                "comments = ?, stats_at = ? WHERE video_id = ?",
+                rows,
+            )
+            conn.executemany("UPDATE videos SET stats_at = ? WHERE video_id = ?", [(now, vid) for vid in gone])
+            conn.executemany("INSERT OR REPLACE INTO gone_videos VALUES (?, ?)", [(vid, now) for vid in gone])
+        if gone:
+            logger.info("YouTube videos no longer available: %s", ", ".join(sorted(gone)))
+        updated += len(rows)
+    return updated
+
+
+def sync_channel(channel_id: str, *, stats_max_age: float = STATS_MAX_AGE,
+                 max_pages: int | None = None) -> dict[str, Any]:
+    """Bring the local copy of a channel's uploads up to date.
+
+    Returns a summary: new videos found, stats refreshed, and whether the sync
+    stopped early because the daily quota ran out.
+    """
+    summary = {"channel_id": channel_id, "new_videos": 0, "stats_refreshed": 0, "quota_exhausted": False}
+    try:
+        playlist = _uploads_playlist(channel_id)
+        summary["new_videos"] = len(_list_new_uploads(channel_id, playlist, max_pages))
+        due = [row[0] for row in _conn().execute(
+            "SELECT video_id FROM videos WHERE channel_id = ? AND (stats_at IS NULL OR stats_at < ?) "
+            "AND video_id NOT IN (SELECT video_id FROM gone_videos) "
+            "ORDER BY stats_at IS NOT NULL, stats_at, published DESC",
+            (channel_id, time.time() - stats_max_age),
+        )]
+        summary["stats_refreshed"] = _refresh_stats(due)
+    except QuotaExhausted as e:
+        logger.warning("YouTube sync of %s stopped early: %s", channel_id, e)
+        summary["quota_exhausted"] = True
+        return summary
+    conn = _conn()
+    with conn:
+        conn.execute("UPDATE channels SET synced_at = ? WHERE channel_id = ?", (time.time(), channel_id))
+    return summary
+
+
+def sync_default_channel() -> dict[str, Any] | None:
+    """Sync JAKKE_YOUTUBE_CHANNEL (run by the app's background refresher). None if YouTube is not configured."""
+    channel_id = get_secret("JAKKE_YOUTUBE_CHANNEL")
+    if not channel_id or not get_secret("YOUTUBE_API_KEY"):
+        return None
+    return sync_channel(channel_id)
+
+
+def recent_videos(channel_id: str, limit: int = 10) -> list[dict]:
+    """Most recent synced videos for a channel, newest first (local read only)."""
+    rows = _conn().execute(
+        "SELECT video_id, title, published, views, likes, comments, thumbnail FROM videos "
+        "WHERE channel_id = ? AND stats_at IS NOT NULL AND video_id NOT IN (SELECT video_id FROM gone_videos) "
+        "ORDER BY published DESC LIMIT ?",
+        (channel_id, limit),
+    ).fetchall()
+    return [
+        {
+            "id": vid,
+            "title": title,
+            "published": published,
+            "views": views,
+            "likes": likes,
+            "comments": comments,
+            "thumbnail": thumbnail,
+            "url": f"https://youtube.com/watch?v={vid}",
+        }
+        for vid, title, published, views, likes, comments, thumbnail in rows
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Incrementally sync a YouTube channel's uploads.")
+    parser.add_argument("channel_id", nargs="?", default=get_secret("JAKKE_YOUTUBE_CHANNEL"))
+    parser.add_argument("--stats-max-age", type=float, default=STATS_MAX_AGE / 3600, help="hours")
+    parser.add_argument("--max-pages", type=int, default=None)
+    args = parser.parse_args()
+    if not args.channel_id or not get_secret("YOUTUBE_API_KEY"):
+        parser.error("YOUTUBE_API_KEY and a channel ID (or JAKKE_YOUTUBE_CHANNEL) are required")
+    logging.basicConfig(level=logging.INFO)
+    print(sync_channel(args.channel_id, stats_max_age=args.stats_max_age * 3600, max_pages=args.max_pages))
+
+
+if __name__ == "__main__":
+    main()